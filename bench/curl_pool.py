@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Per-request latency of curl transport with and without
+a :class:`pymarketcap.curl.Session` pool of reusable handles,
+against a local HTTPS stand-in server."""
+
+import os
+import argparse
+import tempfile
+import statistics as st
+from time import perf_counter
+from subprocess import check_call, DEVNULL
+
+from tabulate import tabulate
+
+from pymarketcap.curl import get_to_memory, Session
+from pymarketcap.standin import StandinProcess
+
+BODY = b"<html>" + b"x" * (300 * 1024) + b"</html>"
+
+
+def self_signed_cert(directory):
+    """Generate a self signed certificate for ``127.0.0.1``
+    using the ``openssl`` command line tool.
+
+    Returns (tuple): Certificate and key file paths.
+    """
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    check_call(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+         "-keyout", key, "-out", cert, "-days", "1",
+         "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+        stdout=DEVNULL, stderr=DEVNULL
+    )
+    return cert, key
+
+
+def latencies(url, number, cainfo, pooled=True):
+    """Time ``number`` requests to ``url``, through one session if
+    ``pooled``, or else through a new session for each request, so
+    none of them reuses a handle or a connection."""
+    session = Session(cainfo=cainfo)
+    chunks = []
+    for _ in range(number):
+        if not pooled:
+            session = Session(cainfo=cainfo)
+        start = perf_counter()
+        get_to_memory(url, 15, False, b"", session)
+        chunks.append(perf_counter() - start)
+    return chunks
+
+
+def run(number, tls):
+    cert, key = None, None
+    if tls:
+        cert, key = self_signed_cert(
+            tempfile.mkdtemp(prefix="pymarketcap-bench-")
+        )
+    with StandinProcess(default=BODY, certfile=cert, keyfile=key) as server:
+        url = server.url.encode()
+        cainfo = cert.encode() if tls else b""
+
+        # Warm up the server threads
+        latencies(url, 2, cainfo)
+
+        before = latencies(url, number, cainfo, pooled=False)
+        after = latencies(url, number, cainfo)
+
+    table = []
+    for name, func in (("mean", st.mean), ("median", st.median),
+                       ("slowest", max), ("fastest", min)):
+        table.append([name.capitalize(),
+                      func(before) * 1000, func(after) * 1000])
+    print("\nPer-request latency (ms), %d requests to %s\n" % (
+        number, "HTTPS" if tls else "HTTP"))
+    print(tabulate(table, headers=["Ind", "New handle", "Pooled handle"],
+                   tablefmt="fancy_grid"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", "-n", type=int, default=200,
+                        help="Number of requests for each mode.")
+    parser.add_argument("--no-tls", action="store_true",
+                        help="Use plain HTTP instead of HTTPS.")
+    args = parser.parse_args()
+    run(args.number, not args.no_tls)
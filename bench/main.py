@@ -20,6 +20,10 @@ TEARDOWN_TIME_SLEEP = .7
 START_BENCHING_AT = 0
 RUN_ONLY = False #[]
 
+# Transport used by the benchs: recording responses
+# in a cassette or replaying them (see ``--record`` and ``--replay``)
+TRANSPORT = None
+
 # Basic configuration for results file
 RESULTS_FILE = os.path.join("bench", "last_results.json")
 SAVE_RESULTS = True
@@ -140,6 +144,9 @@ def run_benchmarks():
 
     print("\n%s Pymarketcap benchmarking suite ended %s\n" % (sep, sep))
 
+    if TRANSPORT is not None and TRANSPORT.name == "record":
+        TRANSPORT.save()
+
     def json_serial(obj):
         """JSON serializer for datetime objects"""
         if isinstance(obj, (datetime, date)):
@@ -160,7 +167,35 @@ def argparsing():
     parser.add_argument("--compare", "-c",
         help="Set previous filepath results file for compare against actual benchmarking results."
     )
+    parser.add_argument("--record",
+        help="Record every response in a cassette file to replay it later.")
+    parser.add_argument("--replay",
+        help="Serve responses from a cassette file instead of the network.")
+    parser.add_argument("--standin",
+        help="Serve responses from a cassette file through a local server.")
+    parser.add_argument("--latency", type=float, default=0,
+        help="Seconds of latency injected in each replayed response.")
     args = parser.parse_args()
+    if args.record or args.replay or args.standin:
+        from pymarketcap.transport import RecordingTransport, ReplayTransport
+        global TRANSPORT, TEARDOWN_TIME_SLEEP
+        if args.record:
+            TRANSPORT = RecordingTransport(args.record)
+        elif args.standin:
+            from pymarketcap.standin import StandinServer
+            server = StandinServer(args.standin, latency=args.latency)
+            server.start()
+            TRANSPORT = server.transport()
+            TEARDOWN_TIME_SLEEP = 0
+        else:
+            TRANSPORT = ReplayTransport(cassette=args.replay,
+                                        latency=args.latency)
+            TEARDOWN_TIME_SLEEP = 0
+        init = "from __main__ import TRANSPORT;" \
+            + "cmc = Pymarketcap(transport=TRANSPORT)"
+        for bench in BENCHS:
+            bench["setup"] = bench["setup"].replace(common_init, init)
+            bench["run"] = bench["run"].replace(common_init, init)
     if args.benchs:
         global RUN_ONLY
         RUN_ONLY = args.benchs.split(",")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Latency of :class:`pymarketcap.index.SearchIndex` queries over
+a few thousand synthetic cryptocurrencies, by prefix and with typos."""
+
+import random
+import string
+import argparse
+from time import perf_counter
+
+from tabulate import tabulate
+
+from pymarketcap.index import SearchIndex
+
+
+def currencies(number, seed=0):
+    rnd = random.Random(seed)
+    response = []
+    for _id in range(1, number + 1):
+        name = "".join(rnd.choice(string.ascii_lowercase)
+                       for _ in range(rnd.randint(4, 12))).capitalize()
+        response.append({"id": _id, "name": name,
+                         "symbol": name[:3].upper(),
+                         "website_slug": name.lower()})
+    return response
+
+
+def typo(word, rnd):
+    i = rnd.randrange(len(word))
+    return word[:i] + word[i + 1:]
+
+
+def run(number, queries):
+    data = currencies(number)
+    start = perf_counter()
+    index = SearchIndex(data, ("name", "symbol", "website_slug"))
+    built = perf_counter() - start
+
+    rnd = random.Random(1)
+    names = [currency["name"] for currency in rnd.sample(data, queries)]
+    table = []
+    for kind, texts in (("prefix", [name[:3] for name in names]),
+                        ("typo", [typo(name, rnd) for name in names])):
+        start = perf_counter()
+        for text in texts:
+            index.search(text)
+        elapsed = perf_counter() - start
+        table.append([kind, elapsed / queries * 1000])
+    print("\n%d currencies, index built in %.1f ms\n" % (number, built * 1000))
+    print(tabulate(table, headers=["Query", "Latency (ms)"],
+                   tablefmt="fancy_grid"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", "-n", type=int, default=3000,
+                        help="Number of currencies indexed.")
+    parser.add_argument("--queries", "-q", type=int, default=1000,
+                        help="Number of queries of each kind.")
+    args = parser.parse_args()
+    run(args.number, args.queries)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Throughput of a thread pool sharing a :class:`pymarketcap.Pymarketcap`
+instance, for 1, 2, 4, 8 and 16 threads, against a local HTTP stand-in
+server which takes some milliseconds to respond each request."""
+
+import argparse
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+
+from tabulate import tabulate
+
+from pymarketcap import Pymarketcap
+from pymarketcap.standin import StandinProcess
+
+THREADS = [1, 2, 4, 8, 16]
+
+BODY = b"<html>" + b"x" * (300 * 1024) + b"</html>"
+
+
+def run(number, delay):
+    table = []
+    with StandinProcess(default=BODY, latency=delay) as server:
+        cmc = Pymarketcap()
+        for num_threads in THREADS:
+            # Distinct urls, or concurrent requests would be coalesced
+            urls = [("%s?i=%d" % (server.url, i)).encode()
+                    for i in range(number)]
+            with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                start = perf_counter()
+                list(executor.map(cmc._get, urls))
+                elapsed = perf_counter() - start
+            table.append([num_threads, elapsed, number / elapsed])
+    print("\n%d requests, server delay of %d ms\n" % (number, delay * 1000))
+    print(tabulate(table, headers=["Threads", "Time (s)", "Requests/s"],
+                   tablefmt="fancy_grid"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", "-n", type=int, default=160,
+                        help="Number of requests for each number of threads.")
+    parser.add_argument("--delay", "-d", type=float, default=.02,
+                        help="Seconds waited by the server for each request.")
+    args = parser.parse_args()
+    run(args.number, args.delay)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Time taken by each transport backend of :class:`pymarketcap.Pymarketcap`
+to retrieve a batch of pages with ``_get`` one after another and with
+``_get_many`` in parallel, against a local HTTP stand-in server."""
+
+import argparse
+from time import perf_counter
+
+from tabulate import tabulate
+
+from pymarketcap import Pymarketcap
+from pymarketcap.standin import StandinProcess
+
+BODY = b"<html>" + b"x" * (300 * 1024) + b"</html>"
+
+
+def run(number, delay):
+    table = []
+    with StandinProcess(default=BODY, latency=delay) as server:
+        urls = [b"%s?page=%d" % (server.url.encode(), i)
+                for i in range(number)]
+        for name in ("curl", "curl-multi", "urllib"):
+            try:
+                cmc = Pymarketcap(transport=name)
+            except ImportError:   # Installed without curl
+                continue
+            start = perf_counter()
+            for url in urls:
+                cmc._get(url)
+            sequential = perf_counter() - start
+
+            start = perf_counter()
+            cmc._get_many(urls)
+            parallel = perf_counter() - start
+            table.append([name, sequential, parallel])
+    print("\n%d requests, server delay of %d ms\n" % (number, delay * 1000))
+    print(tabulate(table, headers=["Transport", "_get (s)", "_get_many (s)"],
+                   tablefmt="fancy_grid"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", "-n", type=int, default=40,
+                        help="Number of pages requested by each transport.")
+    parser.add_argument("--delay", "-d", type=float, default=.02,
+                        help="Seconds waited by the server for each request.")
+    args = parser.parse_args()
+    run(args.number, args.delay)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Microbenchmark of the curl transport write callback
+feeding it synthetic streams of chunks, as libcurl does
+when it receives big HTML pages."""
+
+import argparse
+import random
+import statistics as st
+from timeit import repeat
+
+from tabulate import tabulate
+
+from pymarketcap.curl import feed_write_memory
+
+# Body sizes of some scraped pages, in bytes
+PAGES = [
+    ("currency", 300 * 1024),
+    ("historical", 450 * 1024),
+    ("exchanges", 900 * 1024),
+]
+
+
+def synthetic_chunks(size, min_chunk=1024, max_chunk=16384):
+    """Split ``size`` bytes in chunks of random lengths, like
+    the reads from a socket."""
+    chunks = []
+    while size > 0:
+        length = min(size, random.randint(min_chunk, max_chunk))
+        chunks.append(b"x" * length)
+        size -= length
+    return chunks
+
+
+def run(number):
+    table = []
+    for name, size in PAGES:
+        chunks = synthetic_chunks(size)
+        for label, content_length in (("unknown", -1), ("known", size)):
+            _, reallocs = feed_write_memory(chunks, content_length)
+            times = repeat(lambda: feed_write_memory(chunks, content_length),
+                           number=1, repeat=number)
+            table.append([name, size // 1024, len(chunks), label,
+                          reallocs, st.median(times) * 1e6])
+    print(tabulate(table, headers=["Page", "KB", "Chunks", "Length",
+                                   "Reallocs", "Median (us)"],
+                   tablefmt="fancy_grid"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", "-n", type=int, default=200,
+                        help="Number of repetitions for each stream.")
+    run(parser.parse_args().number)
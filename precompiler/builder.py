@@ -98,15 +98,7 @@ class Builder:
             original_func = searcher.search(stream).group(1)
             return stream.replace(original_func, "", 1)
 
-        def restore_curl_import(stream):
-            return stream.replace("from pymarketcap.url import get_to_memory",
-                                  "from pymarketcap.curl import get_to_memory")
-
-        stream = return_ticker_badges(
-            restore_curl_import(
-                self.read_source()
-            )
-        )
+        stream = return_ticker_badges(self.read_source())
 
         self.write_source(stream)
 
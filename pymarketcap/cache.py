@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+
+"""Cache of the responses decoded by :class:`pymarketcap.Pymarketcap`
+and :class:`pymarketcap.AsyncPymarketcap`, kept in memory and on disk
+for a time which depends on the endpoint requested."""
+
+# Standard python modules
+import re
+import math
+import random
+from time import time, gmtime, strftime
+from threading import Lock, RLock, Thread
+from collections import OrderedDict
+
+# Internal python modules
+from pymarketcap.store import SegmentStore
+
+#: dict: Seconds responses of each family of urls are fresh.
+DEFAULT_TTLS = {
+    "ticker": 60,
+    "listings": 3600,
+    "quick_search": 3600,
+    "graphs": 300,
+    "historical": 3600,
+    "default": 300,
+}
+
+#: list: Families of the urls, by the first pattern they match.
+URL_FAMILIES = [
+    ("ticker", re.compile(r"^https?://api\.coinmarketcap\.com/v\d+/ticker")),
+    ("listings", re.compile(
+        r"^https?://api\.coinmarketcap\.com/v\d+/listings"
+    )),
+    ("quick_search", re.compile(
+        r"^https?://s2\.coinmarketcap\.com/generated/search/"
+    )),
+    ("graphs", re.compile(r"^https?://graphs2\.coinmarketcap\.com/")),
+    ("historical", re.compile(
+        r"^https?://coinmarketcap\.com/currencies/[^/]+/historical-data"
+    )),
+]
+
+GRAPHS_RANGE = re.compile(r"/(\d{9,})/(\d{9,})/?$")
+HISTORICAL_END = re.compile(r"[?&]end=(\d{8})")
+
+
+def url_family(url):
+    """Family of ``url``, which selects the time its responses
+    are cached: ``"ticker"``, ``"listings"``, ``"quick_search"``,
+    ``"graphs"``, ``"historical"`` or ``"default"``.
+
+    Args:
+        url (str): Url requested.
+
+    Returns (str)
+    """
+    for family, regex in URL_FAMILIES:
+        if regex.match(url):
+            return family
+    return "default"
+
+
+def immutable(url, family, now):
+    """Check if the responses of ``url`` can't change anymore: graphs
+    and historical pages of ranges which ended before the current day.
+
+    Args:
+        url (str): Url requested.
+        family (str): Family of ``url``.
+        now (float): Current epoch time.
+
+    Returns (bool)
+    """
+    if family == "graphs":
+        match = GRAPHS_RANGE.search(url)
+        # Graphs timestamps are in milliseconds
+        return match is not None and \
+            int(match.group(2)) < (now - 86400) * 1000
+    if family == "historical":
+        match = HISTORICAL_END.search(url)
+        return match is not None and \
+            match.group(1) < strftime("%Y%m%d", gmtime(now))
+    return False
+
+
+def expires_early(expires, delta, beta, now, rnd=random.random):
+    """Probabilistic early expiration (XFetch): a value which took
+    ``delta`` seconds to compute is considered expired before its
+    expiration time with a probability which grows as it approaches,
+    so its callers don't refresh it all at once.
+
+    Args:
+        expires (float): Expiration time, or ``None`` if it never expires.
+        delta (float): Seconds taken to compute the value.
+        beta (float): Eagerness of the refreshes, ``0`` to disable them.
+        now (float): Current time.
+        rnd (callable, optional): Random numbers generator in ``[0, 1)``.
+
+    Returns (bool)
+    """
+    if expires is None:
+        return False
+    if beta <= 0 or delta <= 0:
+        return now >= expires
+    return now - delta * beta * math.log(1 - rnd()) >= expires
+
+
+class ResponseCache:
+    """Two levels cache of responses: a LRU in memory, bounded by a
+    number of entries and a size, backed by a compressed
+    :class:`pymarketcap.store.SegmentStore` which keeps them
+    between sessions.
+
+    Each response is fresh for the seconds configured for its family
+    (see :func:`url_family`), while graphs and historical pages of past
+    ranges never expire. Expired responses are still served by
+    :meth:`get` with ``stale=True``, like clients in offline mode do.
+
+    Clients look up responses with :meth:`lookup`, which implements
+    stale-while-revalidate: responses expired for less than
+    ``stale_while_revalidate`` seconds are served while they are
+    refreshed in background, and fresh responses are refreshed early
+    with a probability which grows as they approach their expiration
+    (see :func:`expires_early`).
+
+    Args:
+        path (str, optional): Directory of the disk store. As default
+            ``None`` (responses are only cached in memory).
+        ttls (dict, optional): Seconds by family overriding
+            :data:`DEFAULT_TTLS`, like ``{"ticker": 30}``.
+        max_entries (int, optional): Maximum responses kept in
+            memory. As default ``512``.
+        max_bytes (int, optional): Maximum characters of the responses
+            kept in memory. As default 64 MiB.
+        max_disk_bytes (int, optional): Maximum size of the disk
+            store. As default 256 MiB.
+        compression (str, optional): Codec of the bodies stored on
+            disk: ``"zlib"``, ``"lzma"`` or ``"zstd"``. As default
+            ``"zstd"`` if :mod:`zstandard` is installed, ``"zlib"``
+            otherwise.
+        stale_while_revalidate (float, optional): Seconds expired
+            responses are served while they are refreshed. As default ``0``.
+        beta (float, optional): Eagerness of early refreshes, ``0``
+            to disable them. As default ``1``.
+        clock (callable, optional): Current epoch time in seconds.
+            As default :func:`time.time`.
+    """
+    def __init__(self, path=None, ttls=None, max_entries=512,
+                 max_bytes=64 * 1024 ** 2, max_disk_bytes=256 * 1024 ** 2,
+                 compression=None, stale_while_revalidate=0, beta=1,
+                 clock=time):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.stale_while_revalidate = stale_while_revalidate
+        self.beta = beta
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.disk = SegmentStore(path, max_disk_bytes,
+                                 compression=compression) \
+            if path is not None else None
+
+        #: dict: Counters of hits in ``"memory"`` and ``"disk"``,
+        #: ``"misses"`` and hits which must be ``"revalidated"``.
+        self.stats = {"memory": 0, "disk": 0, "misses": 0, "revalidated": 0}
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = RLock()
+
+    @staticmethod
+    def key(url, offset=0, until=b""):
+        """Returns (bytes): Key of the response of a request."""
+        if isinstance(url, str):
+            url = url.encode()
+        return b"%s %d %s" % (url, offset, until)
+
+    def ttl(self, url):
+        """Seconds the responses of ``url`` are fresh.
+
+        Returns (float): Seconds, or ``None`` if they never expire.
+        """
+        if isinstance(url, bytes):
+            url = url.decode("latin-1")
+        family = url_family(url)
+        if immutable(url, family, self.clock()):
+            return None
+        return self.ttls[family]
+
+    def _remember(self, key, expires, delta, text):
+        self._memory_bytes -= len(self._memory.pop(key, (0, 0, ""))[2])
+        self._memory[key] = (expires, delta, text)
+        self._memory_bytes += len(text)
+        while self._memory and (len(self._memory) > self.max_entries or
+                                self._memory_bytes > self.max_bytes):
+            _, (_, _, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _entry(self, key):
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry, "memory"
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self._remember(key, *entry)
+                return entry, "disk"
+        return None, None
+
+    def get(self, url, offset=0, until=b"", stale=False):
+        """Look up the cached response of a request.
+
+        Args:
+            url (bytes or str): Url requested.
+            offset (int, optional): Offset of the request.
+            until (bytes, optional): Marker of the request.
+            stale (bool, optional): Serve the response even if
+                it has expired. As default ``False``.
+
+        Returns (str): Decoded body, or ``None`` if it's not cached.
+        """
+        key = self.key(url, offset, until)
+        now = self.clock()
+        with self._lock:
+            entry, level = self._entry(key)
+            if entry is None or (not stale and entry[0] is not None
+                                 and entry[0] <= now):
+                self.stats["misses"] += 1
+                return None
+            self.stats[level] += 1
+            return entry[2]
+
+    def lookup(self, url, offset=0, until=b""):
+        """Look up the cached response of a request, with
+        stale-while-revalidate semantics.
+
+        Returns (tuple): Decoded body, or ``None`` if it must be
+            requested, and ``True`` if the caller should refresh it
+            in background.
+        """
+        key = self.key(url, offset, until)
+        now = self.clock()
+        with self._lock:
+            entry, level = self._entry(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None, False
+            expires, delta, text = entry
+            if expires is not None and \
+                    now >= expires + self.stale_while_revalidate:
+                self.stats["misses"] += 1
+                return None, False
+            self.stats[level] += 1
+            if expires_early(expires, delta, self.beta, now):
+                self.stats["revalidated"] += 1
+                return text, True
+            return text, False
+
+    def put(self, url, text, offset=0, until=b"", delta=0):
+        """Cache the response of a request.
+
+        Args:
+            url (bytes or str): Url requested.
+            text (str): Decoded body of the response.
+            offset (int, optional): Offset of the request.
+            until (bytes, optional): Marker of the request.
+            delta (float, optional): Seconds taken to fetch it, which
+                scale its early refreshes. As default ``0``.
+        """
+        key = self.key(url, offset, until)
+        ttl = self.ttl(url)
+        expires = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._remember(key, expires, delta, text)
+            if self.disk is not None:
+                self.disk.put(key, expires, delta, text)
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self.disk is not None:
+                self.disk.clear()
+
+    def close(self):
+        """Close the files of the disk store."""
+        if self.disk is not None:
+            with self._lock:
+                self.disk.close()
+
+
+class CachedValue:
+    """Value computed by a function and cached for ``ttl`` seconds,
+    like the list of cryptocurrencies of :class:`pymarketcap.Pymarketcap`,
+    with stale-while-revalidate semantics: once it expires, or early
+    with a probability which grows as it approaches its expiration
+    (see :func:`expires_early`), the stale value is returned while a
+    single thread computes it again in background. Only the first
+    callers wait for it.
+
+    Args:
+        compute (callable): Function without arguments which
+            returns the value.
+        ttl (float): Seconds the value is fresh.
+        max_stale (float, optional): Seconds the value is served after
+            its expiration, or ``None`` without limit. Older values are
+            computed again before being returned. As default ``None``.
+        beta (float, optional): Eagerness of early refreshes, ``0``
+            to disable them. As default ``1``.
+        clock (callable, optional): Current epoch time in seconds.
+            As default :func:`time.time`.
+        on_refresh (callable, optional): Function called without
+            arguments each time the value is computed, like to
+            persist it. As default ``None``.
+    """
+    def __init__(self, compute, ttl, max_stale=None, beta=1, clock=time,
+                 on_refresh=None):
+        self.compute = compute
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.beta = beta
+        self.clock = clock
+        self.on_refresh = on_refresh
+
+        #: float: Time the value was computed, or ``None``.
+        self.updated = None
+        #: Exception raised by the last refresh in background, if failed.
+        self.error = None
+        self._value = None
+        self._expires = None
+        self._delta = 0
+        self._refreshing = False
+        self._lock = Lock()
+        self._compute_lock = Lock()
+
+    def _refresh(self):
+        start = self.clock()
+        value = self.compute()
+        with self._lock:
+            self._value = value
+            self._delta = self.clock() - start
+            self.updated = self.clock()
+            self._expires = self.updated + self.ttl
+            self.error = None
+        if self.on_refresh is not None:
+            self.on_refresh()
+        return value
+
+    def _refresh_background(self):
+        try:
+            self._refresh()
+        except Exception as err:
+            self.error = err
+        finally:
+            self._refreshing = False
+
+    def get(self):
+        """Returns: The value, computing it only if there is none
+        or it's too stale to be served."""
+        now = self.clock()
+        with self._lock:
+            updated = self.updated
+            if updated is not None and (
+                    self.max_stale is None or
+                    now < self._expires + self.max_stale):
+                if not self._refreshing and expires_early(
+                        self._expires, self._delta, self.beta, now):
+                    self._refreshing = True
+                    Thread(target=self._refresh_background,
+                           daemon=True).start()
+                return self._value
+
+        with self._compute_lock:
+            # Computed by other caller while this one was waiting
+            if self.updated is not None and self.updated != updated:
+                return self._value
+            return self._refresh()
+
+    def peek(self):
+        """Returns: The value, or ``None`` if there is none,
+        without computing it."""
+        return self._value
+
+    def seed(self, value, updated, ttl=None):
+        """Set a value computed before, like one persisted
+        by a previous process.
+
+        Args:
+            value (any): The value.
+            updated (float): Time it was computed.
+            ttl (float, optional): Seconds it's fresh since then.
+                As default ``ttl`` of the instance.
+        """
+        with self._lock:
+            self._value = value
+            self.updated = updated
+            self._expires = updated + (self.ttl if ttl is None else ttl)
+
+    def invalidate(self):
+        """Discard the value, so the next call computes it again."""
+        with self._lock:
+            self.updated = None
+            self._value = None
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""Archive of recorded responses used by the recording and
+replay transports of :mod:`pymarketcap.transport`."""
+
+# Standard python modules
+import os
+import json
+import mmap
+import zlib
+import struct
+
+#: bytes: Signature at the beginning of cassette files.
+MAGIC = b"PYMCAS01"
+TRAILER = struct.Struct(">Q")
+
+
+class Cassette:
+    """Compact indexed archive of responses, stored as a single file.
+
+    Each body is compressed apart and the file ends with a compressed
+    index of urls, so a response is read without decompressing the
+    others. The file is mapped in memory when loaded, and responses
+    recorded after that are kept in memory until :meth:`save` is called.
+
+    Layout: ``MAGIC | bodies | index | index offset``.
+
+    Args:
+        path (str, optional): File of the archive, loaded
+            if it exists. As default ``None`` (only in memory).
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._index = {}
+        self._pending = {}
+        self._file = None
+        self._map = None
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __contains__(self, url):
+        return url in self._pending or url in self._index
+
+    def __len__(self):
+        return len(self.urls())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._pending and self.path is not None:
+            self.save()
+        self.close()
+
+    def urls(self):
+        """Returns (set): Urls recorded, as bytes."""
+        return set(self._index) | set(self._pending)
+
+    def add(self, url, status_code, headers, body):
+        """Record a response.
+
+        Args:
+            url (bytes): Url requested.
+            status_code (int): Status code of the response.
+            headers (dict): Headers of the response.
+            body (bytes): Full body of the response.
+        """
+        self._pending[url] = (status_code, dict(headers or {}),
+                              zlib.compress(body))
+
+    def get(self, url):
+        """Read a recorded response.
+
+        Args:
+            url (bytes): Url requested.
+
+        Returns (tuple): Status code, headers and body
+            of the response, raising :exc:`KeyError`
+            if ``url`` was not recorded.
+        """
+        try:
+            status_code, headers, compressed = self._pending[url]
+        except KeyError:
+            status_code, headers, compressed = self._read(url)
+        return status_code, headers, zlib.decompress(compressed)
+
+    def _read(self, url):
+        offset, length, status_code, headers = self._index[url]
+        return status_code, headers, self._map[offset:offset + length]
+
+    def load(self):
+        """Map the archive file in memory and read its index."""
+        self.close()
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("%s is not a pymarketcap cassette." % self.path)
+        index_offset, = TRAILER.unpack(self._map[-TRAILER.size:])
+        index = json.loads(zlib.decompress(
+            self._map[index_offset:-TRAILER.size]
+        ).decode())
+        self._index = {url.encode("latin-1"): tuple(entry)
+                       for url, entry in index.items()}
+
+    def save(self, path=None):
+        """Write every response recorded to the archive file,
+        replacing it atomically.
+
+        Args:
+            path (str, optional): File to write. As default
+                the path of the cassette, raising :exc:`ValueError`
+                if it was created without one.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("The cassette has no file to be saved to.")
+        index = {}
+        tmp_path = "%s.tmp" % path
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            for url in sorted(self.urls()):
+                if url in self._pending:
+                    status_code, headers, compressed = self._pending[url]
+                else:
+                    status_code, headers, compressed = self._read(url)
+                index[url.decode("latin-1")] = [f.tell(), len(compressed),
+                                                status_code, headers]
+                f.write(compressed)
+            index_offset = f.tell()
+            f.write(zlib.compress(json.dumps(index).encode()))
+            f.write(TRAILER.pack(index_offset))
+        self.close()
+        os.replace(tmp_path, path)
+        self.path = path
+        self._pending = {}
+        self.load()
+
+    def close(self):
+        """Release the file mapped in memory. Responses not saved
+        yet are kept."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
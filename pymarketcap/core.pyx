@@ -7,7 +7,9 @@ from re import (
     sub as re_sub,
     findall as re_findall
 )
-from time import time
+from time import time, sleep
+from collections import deque, OrderedDict
+from threading import Lock
 from datetime import datetime, date
 from json import loads
 from urllib.request import urlretrieve
@@ -15,16 +17,22 @@ from urllib.error import HTTPError
 
 # Internal Cython modules
 from pymarketcap.consts import DATETIME_MIN_TIME, DATETIME_MAX_TIME
-from pymarketcap.curl import get_to_memory
 from pymarketcap import processer
 
 # Internal Python modules
 from pymarketcap.errors import (
+    CoinmarketcapError,
     CoinmarketcapHTTPError,
     CoinmarketcapHTTPError404,
+    CoinmarketcapOfflineError,
     CoinmarketcapTooManyRequestsError
 )
-from pymarketcap.util import cmc_timestamp
+from pymarketcap.util import cmc_timestamp, endpoint, percentile
+from pymarketcap.transport import get_transport
+from pymarketcap.singleflight import SingleFlight
+from pymarketcap.cache import CachedValue
+from pymarketcap.snapshot import Snapshot
+from pymarketcap.index import FieldIndex, SearchIndex
 
 # HTTP errors mapper
 http_errors_map = {
@@ -43,21 +51,109 @@ cdef class Pymarketcap:
             As default, ``False``.
         proxy_addr (bytes, optional): Proxy to use with Pymarketcap.
             As default, ``b""``.
+        session (object, optional): Pool of connections reused
+            between requests by a transport selected by name. As
+            default, a new session of the transport, like
+            :class:`pymarketcap.curl.Session`.
+        transport (str or :class:`pymarketcap.transport.Transport`,
+            optional): Backend which performs the requests: ``"curl"``,
+            ``"curl-multi"``, ``"urllib"``, ``"replay"`` or an instance.
+            As default ``"curl-multi"`` if pymarketcap was installed
+            with curl support and ``"urllib"`` otherwise.
+        timings_size (int, optional): Number of timings of the last
+            requests kept for each endpoint. As default ``100``.
+        rate_limiter (:class:`pymarketcap.ratelimit.RateLimiter`,
+            optional): Limiter of the requests sent to each host, which
+            can be shared with other instances. As default ``None``.
+        retry (:class:`pymarketcap.retry.RetryPolicy`, optional):
+            Policy of retries of the requests which fail temporarily.
+            As default ``None`` (failures are raised at once).
+        cache (:class:`pymarketcap.cache.ResponseCache`, optional):
+            Cache of the responses, which can be shared with other
+            instances. As default ``None``.
+        offline (bool, optional): Serve responses only from ``cache``,
+            even if they have expired, raising
+            :exc:`pymarketcap.errors.CoinmarketcapOfflineError` for
+            those not cached. As default ``False``.
+        snapshot (str or :class:`pymarketcap.snapshot.Snapshot`,
+            optional): File where :attr:`cryptocurrencies`,
+            :attr:`cryptoexchanges` and :attr:`currencies_to_convert`
+            are persisted, loaded the first time one of them is needed.
+            As default ``None``.
+        snapshot_max_age (float, optional): Seconds the values loaded
+            from ``snapshot`` are served before being refreshed in
+            background. As default ``86400``.
+        validators_size (int, optional): Number of urls whose last
+            body is kept with its ``ETag`` and ``Last-Modified``
+            validators for conditional requests, the least recently
+            used discarded first. As default ``64``.
     """
-    cdef readonly dict _cryptocurrencies
-    cdef readonly list _cryptoexchanges
-    cdef readonly list _currencies_to_convert
-    cdef readonly list _converter_cache
+    cdef readonly object _cryptocurrencies
+    cdef readonly object _cryptoexchanges
+    cdef readonly object _currencies_to_convert
+    cdef readonly object _converter_cache
+    cdef object _currencies_index
+    cdef object _exchanges_index
+    cdef dict _search_indexes
+    cdef bint _snapshot_loaded
+    cdef object _snapshot_lock
+    cdef readonly object _validators
+    #: dict: Timings of the last requests, by endpoint.
+    cdef readonly dict timings
+    #: object: Requests in flight, shared by concurrent callers.
+    cdef readonly object single_flight
 
     cdef public long timeout
     cdef public object proxy_addr
     cdef public object graphs
     cdef public bint debug
-
-    def __init__(self, timeout=15, debug=False, proxy_addr=b""):
+    cdef public object transport
+    cdef public object rate_limiter
+    cdef public object retry
+    cdef public object cache
+    cdef public bint offline
+    cdef public int timings_size
+    cdef public int validators_size
+    cdef public object snapshot
+    cdef public double snapshot_max_age
+
+    def __init__(self, timeout=15, debug=False, proxy_addr=b"",
+                 session=None, timings_size=100, transport=None,
+                 rate_limiter=None, retry=None, cache=None, offline=False,
+                 snapshot=None, snapshot_max_age=86400, validators_size=64):
         self.timeout = timeout
         self.debug = debug
         self.proxy_addr = proxy_addr
+        self.transport = get_transport(transport, session)
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.cache = cache
+        self.offline = offline
+        self._validators = OrderedDict()
+        self.validators_size = validators_size
+        self.timings_size = timings_size
+        self.timings = {}
+        self.single_flight = SingleFlight()
+        self._search_indexes = {}
+        if isinstance(snapshot, str):
+            snapshot = Snapshot(snapshot)
+        self.snapshot = snapshot
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot_loaded = False
+        self._snapshot_lock = Lock()
+
+        # Derived caches, refreshed in background once they expire
+        self._cryptocurrencies = CachedValue(
+            self.listings, 3600, on_refresh=self._save_snapshot
+        )
+        self._cryptoexchanges = CachedValue(
+            self._exchanges_list, 3600, on_refresh=self._save_snapshot
+        )
+        self._currencies_to_convert = CachedValue(
+            self.__currencies_to_convert, 3600,
+            on_refresh=self._save_snapshot
+        )
+        self._converter_cache = CachedValue(self._exchange_rates, 600)
 
         #: object: Initialization of graphs internal interface
         self.graphs = type("Graphs", (), self._graphs_interface)
@@ -66,6 +162,44 @@ cdef class Pymarketcap:
 
                          #######   UTILS   #######
 
+    cdef dict _snapshot_values(self):
+        return {
+            "cryptocurrencies": self._cryptocurrencies,
+            "cryptoexchanges": self._cryptoexchanges,
+            "currencies_to_convert": self._currencies_to_convert,
+        }
+
+    cdef _load_snapshot(self):
+        """Seed the cached values with those of the snapshot, if any,
+        the first time one of them is needed. Values older than
+        ``snapshot_max_age`` are served while refreshed in background."""
+        if self._snapshot_loaded or self.snapshot is None:
+            return
+        with self._snapshot_lock:
+            if self._snapshot_loaded:
+                return
+            values = self.snapshot.load()
+            for name, cached in self._snapshot_values().items():
+                if name in values and cached.updated is None:
+                    updated, value = values[name]
+                    cached.seed(value, updated, ttl=self.snapshot_max_age)
+            self._snapshot_loaded = True
+
+    cpdef _save_snapshot(self):
+        """Persist the cached values computed to the snapshot, if any."""
+        if self.snapshot is None:
+            return
+        values = {}
+        for name, cached in self._snapshot_values().items():
+            if cached.updated is not None:
+                values[name] = (cached.updated, cached.peek())
+        self.snapshot.save(values)
+
+    @property
+    def session(self):
+        """object: Pool of connections of the transport."""
+        return self.transport.session
+
     @property
     def _graphs_interface(self):
         return {
@@ -94,7 +228,7 @@ cdef class Pymarketcap:
             url = b"https://s2.coinmarketcap.com/generated/search/quick_search_exchanges.json"
         else:
             url = b"https://s2.coinmarketcap.com/generated/search/quick_search.json"
-        return loads(self._get(url))
+        return loads(self._get_conditional(url))
 
     @property
     def cryptocurrencies(self):
@@ -102,9 +236,8 @@ cdef class Pymarketcap:
         This is the cached version of public API listings method
         but without low level fields like ``"data"`` and ``"metadata"``.
         """
-        if not self._cryptocurrencies:
-            self._cryptocurrencies = self.listings()
-        return self._cryptocurrencies["data"]
+        self._load_snapshot()
+        return self._cryptocurrencies.get()["data"]
 
     cpdef cryptocurrency_by_field_value(self, unicode field, value):
         """Returns a currency listed given a field and value
@@ -121,10 +254,19 @@ cdef class Pymarketcap:
             and ``"website_slug"`` and their values mapped if the currency
             was found, else ``None``.
         """
-        for currency in self.cryptocurrencies:
-            if currency[field] == value:
-                return currency
-        return None
+        return self._cryptocurrencies_index().get(field, value)
+
+    cdef _cryptocurrencies_index(self):
+        """Indexes of the cryptocurrencies listed, built again
+        when the listing is refreshed."""
+        data = self.cryptocurrencies
+        index = self._currencies_index
+        if index is None or index.records is not data:
+            index = FieldIndex(data, ("id", "name", "symbol", "website_slug"),
+                               normalized=("website_slug", "name"),
+                               grouped=("symbol",))
+            self._currencies_index = index
+        return index
 
     @property
     def cryptoexchanges(self):
@@ -132,17 +274,19 @@ cdef class Pymarketcap:
         as dictionaries with ``"name"``, ``"id"`` and
         ``"website_slug"`` keys.
         """
-        if not self._cryptoexchanges:
-            response = []
-            for exchange in self._quick_search(exchanges=True):
-                response.append({
-                    "name": exchange["name"],
-                    "id":   exchange["id"],
-                    "website_slug": exchange["slug"]
-                })
-            self._cryptoexchanges = response
-        else:
-            response = self._cryptoexchanges
+        self._load_snapshot()
+        return self._cryptoexchanges.get()
+
+    cpdef list _exchanges_list(self):
+        """Internal function for get the exchanges cached in
+        :attr:`~pymarketcap.core.Pymarketcap.cryptoexchanges`."""
+        response = []
+        for exchange in self._quick_search(exchanges=True):
+            response.append({
+                "name": exchange["name"],
+                "id":   exchange["id"],
+                "website_slug": exchange["slug"]
+            })
         return response
 
     cpdef exchange_by_field_value(self, unicode field, value):
@@ -150,6 +294,10 @@ cdef class Pymarketcap:
         if ``field`` and ``value`` parameters matches for a exchange,
         otherwise returns ``None``.
 
+        Names and slugs which don't match exactly are compared
+        ignoring case, spaces and punctuation, so ``"coinbase pro"``
+        finds the exchange named ``"Coinbase Pro"``.
+
         Args:
             field (str): Valid exchange data field. Valid data fields
                 are ``"id"``, ``"name"`` and ``"website_slug"``.
@@ -160,10 +308,103 @@ cdef class Pymarketcap:
             and their values mapped if the exchange was found,
             otherwise returns ``None``.
         """
-        for exchange in self.cryptoexchanges:
-            if exchange[field] == value:
-                return exchange
-        return None
+        return self._cryptoexchanges_index().get(field, value, True)
+
+    cdef _cryptoexchanges_index(self):
+        """Indexes of the exchanges listed, built again
+        when the list is refreshed."""
+        data = self.cryptoexchanges
+        index = self._exchanges_index
+        if index is None or index.records is not data:
+            index = FieldIndex(data, ("id", "name", "website_slug"),
+                               normalized=("website_slug", "name"))
+            self._exchanges_index = index
+        return index
+
+    cpdef dict resolve_many(self, identifiers, exchanges=False):
+        """Resolve several identifiers of cryptocurrencies or exchanges
+        typed by users at once, against the indexes of all their fields:
+        ids (as numbers or digits), slugs, symbols and names, in that
+        order, and then slugs and names ignoring case, spaces and
+        punctuation.
+        This replaces guessing the field of each one with
+        :meth:`~pymarketcap.core.Pymarketcap.field_type`.
+
+        Args:
+            identifiers (list): Identifiers, like ``["btc", 1027,
+                "Bitcoin Cash"]``.
+            exchanges (bool, optional): If ``True``, resolve exchanges
+                instead of cryptocurrencies. As default ``False``.
+
+        Returns (dict):
+            ``"resolved"``: cryptocurrencies or exchanges found, with
+            their ``"id"`` and ``"website_slug"``, by identifier.
+            ``"ambiguous"``: symbols shared by several cryptocurrencies,
+            with all of them. They are resolved to the first one.
+            ``"unknown"``: identifiers not found.
+        """
+        index = self._cryptoexchanges_index() if exchanges \
+            else self._cryptocurrencies_index()
+        cdef dict resolved = {}, ambiguous = {}
+        cdef list unknown = []
+        for identifier in identifiers:
+            record = None
+            if isinstance(identifier, int) or \
+                    isinstance(identifier, str) and identifier.isdigit():
+                record = index.get("id", int(identifier))
+            if record is None:
+                record = index.get("website_slug", identifier)
+            if record is None and not exchanges:
+                shared = index.get_all("symbol", identifier)
+                if not shared and isinstance(identifier, str):
+                    shared = index.get_all("symbol", identifier.upper())
+                if len(shared) > 1:
+                    ambiguous[identifier] = shared
+                record = shared[0] if shared else None
+            if record is None:
+                record = index.get("name", identifier)
+            if record is None:
+                record = index.get_normalized("website_slug", identifier)
+            if record is None:
+                record = index.get_normalized("name", identifier)
+            if record is None:
+                unknown.append(identifier)
+            else:
+                resolved[identifier] = record
+        return {"resolved": resolved, "ambiguous": ambiguous,
+                "unknown": unknown}
+
+    cpdef list search(self, unicode query, int limit=10, exchanges=False):
+        """Search cryptocurrencies or exchanges by the beginning of
+        their names, symbols or slugs, like autocompletion fields do,
+        or by similar ones if there are not enough, tolerating typos.
+        Exact matches go first and then, in each group, the
+        cryptocurrencies with the highest market capitalization rank.
+
+        Args:
+            query (str): Text to search, like ``"bitc"`` or ``"etherium"``.
+            limit (int, optional): Maximum number of results.
+                As default ``10``.
+            exchanges (bool, optional): If ``True``, search exchanges
+                instead of cryptocurrencies. As default ``False``.
+
+        Returns (list):
+            Cryptocurrencies or exchanges found, like those of
+            :attr:`~pymarketcap.core.Pymarketcap.cryptocurrencies`.
+        """
+        data = self.cryptoexchanges if exchanges else self.cryptocurrencies
+        index = self._search_indexes.get(exchanges)
+        if index is None or index.records is not data:
+            if exchanges:
+                index = SearchIndex(data, ("name", "website_slug"))
+            else:
+                ranks = {currency["id"]: currency["rank"]
+                         for currency in self._quick_search()
+                         if currency.get("rank")}
+                index = SearchIndex(data, ("name", "symbol", "website_slug"),
+                                    ranks)
+            self._search_indexes[exchanges] = index
+        return index.search(query, limit)
 
     def field_type(self, value):
         """Get a field type between ``"name"``, ``"symbol"``,
@@ -188,12 +429,8 @@ cdef class Pymarketcap:
 
     @property
     def currencies_to_convert(self):
-        res = self._currencies_to_convert
-        if res:
-            return res
-        else:
-            self._currencies_to_convert = self.__currencies_to_convert()
-            return self._currencies_to_convert
+        self._load_snapshot()
+        return self._currencies_to_convert.get()
 
     cpdef __currencies_to_convert(self):
         """Internal function for get currencies from and to convert
@@ -215,33 +452,298 @@ cdef class Pymarketcap:
 
     @property
     def converter_cache(self):
-        res = self._converter_cache
-        if res:
-            return res
-        else:
-            self._converter_cache = [self.currency_exchange_rates, time()]
-            return self._converter_cache
+        rates = self._converter_cache.get()
+        return [rates, self._converter_cache.updated]
+
+    cpdef dict _exchange_rates(self):
+        return self.currency_exchange_rates
+
+    cdef _rate_feedback(self, req, url):
+        """Adapt the rate limiter, if any, to a response."""
+        if self.rate_limiter is not None and \
+                not isinstance(req, Exception):
+            self.rate_limiter.feedback(url, req.status_code,
+                                       req.headers.get("retry-after"))
+
+    cdef _record_timings(self, req, url):
+        """Store the timings of a response in the
+        bounded history of its endpoint."""
+        key = endpoint(url)
+        history = self.timings.get(key)
+        if history is None:
+            history = deque(maxlen=self.timings_size)
+            self.timings[key] = history
+        history.append(req.timings)
+
+    cpdef dict latencies(self, percentiles=(50, 99), field="total_time"):
+        """Percentiles of the timings of the last requests
+        to each endpoint.
 
-    cpdef _get(self, char *url):
-        """Internal function to make a HTTP GET request
-        using the curl Cython bridge to C library or urllib
-        standard library, depending of installation."""
-        cdef int status
-        req = get_to_memory(<char *>url, self.timeout,
-                            <bint>self.debug, <char *>self.proxy_addr)
-        status = req.status_code
+        Args:
+            percentiles (tuple, optional): Percentiles computed.
+                As default ``(50, 99)``.
+            field (str, optional): Key of the timings to compute
+                the percentiles from, like ``"starttransfer_time"``.
+                As default ``"total_time"``.
+
+        Returns (dict):
+            Endpoints as keys and, as values, dictionaries with
+            percentiles like ``"p50"`` and ``"count"`` keys.
+        """
+        response = {}
+        for key, history in self.timings.items():
+            values = [timing[field] for timing in history
+                      if timing[field] is not None]
+            result = {"count": len(values)}
+            for percent in percentiles:
+                result["p%g" % percent] = percentile(values, percent)
+            response[key] = result
+        return response
+
+    cdef _response_text(self, req, url):
+        """Return the decoded body of a response or raise
+        the exception mapped to its status code."""
+        cdef int status = req.status_code
         if status == 200:
-            return req.text.decode()
+            return req.decode()
         else:
             msg = "Status code -> %d | Url -> %s" % (status, url.decode())
             if status in http_error_numbers:
                 raise http_errors_map[str(status)](msg)
             else:
-                print("DEBUG: ")
-                print(req.text)
-                print(req.url)
                 raise CoinmarketcapHTTPError(msg)
 
+    cpdef _get(self, char *url, size_t offset=0, bytes until=b""):
+        """Internal function to make a HTTP GET request
+        through the transport backend, using the curl Cython
+        bridge to C library or urllib standard library.
+
+        Scrapers stream the pages: the first ``offset`` bytes, where
+        there is nothing to parse, are discarded as they arrive and,
+        if ``until`` is passed, the transfer stops once that marker
+        is received. The body is decoded once from the response buffer.
+
+        Concurrent calls for the same url, from several threads,
+        are coalesced into one request whose body is shared.
+        """
+        cdef bytes key = url
+        text, refresh = self._cached(key, offset, until)
+        if refresh:
+            self.single_flight.start((key, offset, until), self._fetch,
+                                     key, offset, until)
+        if text is not None:
+            return text
+        return self.single_flight.do((key, offset, until), self._fetch,
+                                     key, offset, until)
+
+    cpdef _fetch(self, bytes url, size_t offset=0, bytes until=b""):
+        """Request performed by :meth:`_get` for all the
+        concurrent callers of ``url``."""
+        start = time()
+        text = self._response_text(self._request(url, offset, until), url)
+        if self.cache is not None:
+            self.cache.put(url, text, offset, until, time() - start)
+        return text
+
+    cdef _cached(self, bytes url, size_t offset=0, bytes until=b""):
+        """Look up the cached response of a request.
+
+        Returns (tuple): Decoded body, or ``None`` if it must be
+            requested, raising :exc:`CoinmarketcapOfflineError`
+            in offline mode, and if it must be refreshed in background.
+        """
+        if self.cache is not None:
+            if self.offline:
+                text, refresh = self.cache.get(url, offset, until, True), False
+            else:
+                text, refresh = self.cache.lookup(url, offset, until)
+            if text is not None:
+                return text, refresh
+        if self.offline:
+            raise CoinmarketcapOfflineError(
+                "Url -> %s is not cached." % url.decode()
+            )
+        return None, False
+
+    cdef _request(self, bytes url, size_t offset=0, bytes until=b"",
+                  list headers=None):
+        """Send a request through the transport, waiting for the rate
+        limiter and retrying it while the retry policy allows it.
+
+        Returns: The last response, raising the exception of the
+            transport if the last attempt failed.
+        """
+        backoff = self.retry.backoff() if self.retry is not None else None
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+            try:
+                req = self.transport.get(url, self.timeout, self.debug,
+                                         self.proxy_addr, offset, until,
+                                         headers)
+            except CoinmarketcapError as err:
+                req = err
+            else:
+                self._rate_feedback(req, url)
+                self._record_timings(req, url)
+
+            delay = backoff.next_delay([req]) if backoff is not None \
+                else None
+            if delay is None:
+                if isinstance(req, Exception):
+                    raise req
+                return req
+            sleep(delay)
+
+    cpdef _get_conditional(self, char *url):
+        """Internal function to make a conditional HTTP GET request.
+
+        The ``ETag`` and ``Last-Modified`` validators of the last
+        response of each url are stored next to its decoded body and
+        sent back as ``If-None-Match`` and ``If-Modified-Since``
+        headers. If the server responds ``304 Not Modified``, the
+        stored body is returned without downloading it again.
+        """
+        cdef bytes key = url
+        text, refresh = self._cached(key)
+        if refresh:
+            self.single_flight.start((key, 0, b""),
+                                     self._fetch_conditional, key)
+        if text is not None:
+            return text
+        return self.single_flight.do((key, 0, b""),
+                                     self._fetch_conditional, key)
+
+    cpdef _fetch_conditional(self, bytes key):
+        """Request performed by :meth:`_get_conditional` for all
+        the concurrent callers of ``key``."""
+        cdef list headers = []
+        start = time()
+        stored = self._validators.get(key)
+        if stored is not None:
+            try:
+                self._validators.move_to_end(key)
+            except KeyError:   # Discarded by another thread
+                pass
+            etag, last_modified, text = stored
+            if etag:
+                headers.append(b"If-None-Match: %s" % etag.encode("latin-1"))
+            if last_modified:
+                headers.append(b"If-Modified-Since: %s" % \
+                               last_modified.encode("latin-1"))
+        req = self._request(key, 0, b"", headers)
+        if req.status_code != 304 or stored is None:
+            text = self._response_text(req, key)
+            etag = req.headers.get("etag")
+            last_modified = req.headers.get("last-modified")
+            if etag or last_modified:
+                self._remember_validators(key, etag, last_modified, text)
+        if self.cache is not None:
+            self.cache.put(key, text, 0, b"", time() - start)
+        return text
+
+    cdef _remember_validators(self, bytes key, etag, last_modified, text):
+        """Store the validators and body of the last response of
+        ``key``, discarding those of the least recently used urls."""
+        self._validators[key] = (etag, last_modified, text)
+        self._validators.move_to_end(key)
+        while len(self._validators) > max(self.validators_size, 0):
+            try:
+                self._validators.popitem(last=False)
+            except KeyError:
+                break
+
+    cdef list _request_many(self, list urls, int max_parallel=8,
+                            size_t offset=0, bytes until=b""):
+        """Send several requests in parallel through the transport,
+        which waits for the rate limiter before starting each transfer
+        and feeds it back each response as it completes.
+
+        Returns (list): Responses or exceptions of the transport.
+        """
+        reqs = self.transport.get_many(urls, self.timeout, self.debug,
+                                       self.proxy_addr, max_parallel,
+                                       offset, until, self.rate_limiter)
+        for url, req in zip(urls, reqs):
+            if not isinstance(req, Exception):
+                self._record_timings(req, url)
+        return reqs
+
+    cpdef list _get_many(self, list urls, int max_parallel=8,
+                         bint return_exceptions=False,
+                         size_t offset=0, bytes until=b""):
+        """Internal function to make several HTTP GET requests
+        in parallel through the transport backend, using the curl
+        multi interface or a pool of threads with urllib.
+
+        Args:
+            urls (list): Urls to request, as bytes.
+            max_parallel (int, optional): Maximum number of
+                simultaneous requests. As default ``8``.
+            return_exceptions (bool, optional): If ``True``, failed
+                requests are returned as exception instances in their
+                position, otherwise the first one found is raised.
+                As default ``False``.
+            offset (int, optional): Bytes discarded at the beginning
+                of each body. As default ``0``.
+            until (bytes, optional): Marker which stops each
+                transfer once received. As default ``b""``.
+
+        Responses cached are not requested again. If there is a retry
+        policy, only the requests which failed are sent again, in
+        parallel, while the policy allows it.
+
+        Returns (list):
+            Decoded bodies of the responses, in the same order as ``urls``.
+        """
+        cdef list response = []
+        for url in urls:
+            try:
+                text, refresh = self._cached(url, offset, until)
+            except CoinmarketcapOfflineError as err:
+                text, refresh = err, False
+            if refresh:
+                self.single_flight.start((url, offset, until), self._fetch,
+                                         url, offset, until)
+            response.append(text)
+        cdef list missing = [i for i, text in enumerate(response)
+                             if text is None]
+        cdef list fetched = [urls[i] for i in missing]
+        start = time()
+        cdef list reqs = self._request_many(fetched, max_parallel,
+                                            offset, until) if fetched else []
+        cdef list pending
+        if self.retry is not None:
+            backoff = self.retry.backoff()
+            while True:
+                pending = [i for i, req in enumerate(reqs)
+                           if self.retry.retryable(req)]
+                delay = backoff.next_delay([reqs[i] for i in pending])
+                if delay is None:
+                    break
+                sleep(delay)
+                for i, req in zip(pending, self._request_many(
+                        [fetched[i] for i in pending], max_parallel,
+                        offset, until)):
+                    reqs[i] = req
+
+        for i, url, req in zip(missing, fetched, reqs):
+            if not isinstance(req, Exception):
+                try:
+                    req = self._response_text(req, url)
+                except CoinmarketcapError as err:
+                    req = err
+                else:
+                    if self.cache is not None:
+                        self.cache.put(url, req, offset, until,
+                                       time() - start)
+            response[i] = req
+        if not return_exceptions:
+            for res in response:
+                if isinstance(res, Exception):
+                    raise res
+        return response
+
     # ====================================================================
 
                         #######   DEPRECATED   #######
@@ -289,7 +791,9 @@ cdef class Pymarketcap:
         Returns (dict):
             Coinmarketcap API raw response.
         """
-        return loads(self._get(b"https://api.coinmarketcap.com/v2/listings/"))
+        return loads(self._get_conditional(
+            b"https://api.coinmarketcap.com/v2/listings/"
+        ))
 
     cpdef stats(self, convert="USD"):
         """ Get global cryptocurrencies statistics.
@@ -345,10 +849,7 @@ cdef class Pymarketcap:
         """
         cdef short i, len_i
         if not currency:
-            url =  "https://api.coinmarketcap.com/v2/ticker/?&convert=%s" % convert
-            url += "&start=%d" % start
-            url += "&limit=%s" % limit
-            return loads(self._get(url.encode()))
+            return loads(self._get(self._ticker_url(start, limit, convert)))
         else:
             parms = (self.field_type(currency), currency)
             _id = self.cryptocurrency_by_field_value(*parms)["id"]
@@ -370,22 +871,37 @@ cdef class Pymarketcap:
         Returns (list):
             All currencies metadata.
         """
-        cdef short start = 1
         response = []
-
-        num_cryptocurrencies = None
-        while True:
-            cryptocurrencies = self.ticker(start=start, convert="USD")
-            if not num_cryptocurrencies:
-                num_cryptocurrencies = \
-                    cryptocurrencies["metadata"]["num_cryptocurrencies"]
+        for cryptocurrencies in self._ticker_pages(convert="USD"):
             for curr in cryptocurrencies["data"].values():
                 response.append(curr)
-            start += 100
-            if start > num_cryptocurrencies:
-                break
         return response
 
+    cdef bytes _ticker_url(self, start, limit, convert):
+        url =  "https://api.coinmarketcap.com/v2/ticker/?&convert=%s" % convert
+        url += "&start=%d" % start
+        url += "&limit=%s" % limit
+        return url.encode()
+
+    cpdef list _ticker_pages(self, convert="USD"):
+        """Retrieve all pages of :py:meth:`pymarketcap.Pymarketcap.ticker`
+        endpoint. The first page tells the number of cryptocurrencies,
+        the rest are requested in parallel.
+
+        Returns (list):
+            Raw responses of every page.
+        """
+        first_page = loads(self._get(self._ticker_url(1, 0, convert)))
+        num_cryptocurrencies = first_page["metadata"]["num_cryptocurrencies"]
+        urls = [
+            self._ticker_url(start, 0, convert)
+            for start in range(101, num_cryptocurrencies + 1, 100)
+        ]
+        pages = [first_page]
+        for res in self._get_many(urls):
+            pages.append(loads(res))
+        return pages
+
     # ====================================================================
 
                        #######    WEB SCRAPER    #######
@@ -398,8 +914,6 @@ cdef class Pymarketcap:
             All currencies rates used internally by coinmarketcap to calculate
             the prices shown.
         """
-        cdef short start = 1
-
         res = self._get(b"https://coinmarketcap.com")
         rates = re_findall(
             r'data-([a-z]+)="(\d+\.*[\d|e|-]*)"', res[-10000:-2000]
@@ -407,20 +921,12 @@ cdef class Pymarketcap:
         response = {currency.upper(): float(rate) for currency, rate in rates}
 
         # Ticker API method pagination
-        num_cryptocurrencies = None
-        while True:
-            cryptocurrencies = self.ticker(start=start)
-            if not num_cryptocurrencies:
-                num_cryptocurrencies = \
-                    cryptocurrencies["metadata"]["num_cryptocurrencies"]
+        for cryptocurrencies in self._ticker_pages():
             for _id, currency in cryptocurrencies["data"].items():
-                symbol = cryptocurrencies["data"][_id]["symbol"]
-                usd_price = cryptocurrencies["data"][_id]["quotes"]["USD"]["price"]
+                symbol = currency["symbol"]
+                usd_price = currency["quotes"]["USD"]["price"]
                 if usd_price:
                     response[symbol] = usd_price
-            start += 100
-            if start > num_cryptocurrencies:
-                break
         return response
 
     cpdef convert(self, value, unicode currency_in, unicode currency_out):
@@ -437,15 +943,14 @@ cdef class Pymarketcap:
         Returns (float):
             Value expressed in currency_out parameter provided.
         """
-        if time() - self.converter_cache[1] > 600:
-            self.converter_cache[0] = self.currency_exchange_rates
+        # Stale rates are served while they are refreshed in background
+        rates = self._converter_cache.get()
         try:
             if currency_in == "USD":
-                return value / self.converter_cache[0][currency_out]
+                return value / rates[currency_out]
             elif currency_out == "USD":
-                return value * self.converter_cache[0][currency_in]
+                return value * rates[currency_in]
             else:
-                rates = self.converter_cache[0]
                 return value * rates[currency_in] / rates[currency_out]
         except KeyError as err:
             msg = "Invalid currency: '%s'. " \
@@ -480,8 +985,8 @@ cdef class Pymarketcap:
             curr = response["website_slug"]
 
         res = self._get(
-            b"https://coinmarketcap.com/currencies/%s/" % curr.encode()
-        )[20000:]
+            b"https://coinmarketcap.com/currencies/%s/" % curr.encode(), 20000
+        )
 
         response.update(processer.currency(res, convert.lower()))
         return response
@@ -515,8 +1020,8 @@ cdef class Pymarketcap:
             exc = response["website_slug"]
 
         res = self._get(
-            b"https://coinmarketcap.com/exchanges/%s/" % exc.encode()
-        )[20000:]
+            b"https://coinmarketcap.com/exchanges/%s/" % exc.encode(), 20000
+        )
 
         response.update(processer.exchange(res, convert.lower()))
         return response
@@ -534,7 +1039,7 @@ cdef class Pymarketcap:
         """
         cdef bytes url
         url = b"https://coinmarketcap.com/exchanges/volume/24-hour/all/"
-        res = self._get(url)[45000:]
+        res = self._get(url, 45000)
         return processer.exchanges(res, convert.lower())
 
     cpdef historical(self, unicode curr,
@@ -575,7 +1080,8 @@ cdef class Pymarketcap:
         _end = "%d" % end.year + "%02d" % end.month + "%02d" % end.day
         url += "?start=%s" % _start + "&" + "end=%s" % _end
 
-        res = self._get(url.encode())[50000:]
+        # The table of periods is the last thing parsed in the page
+        res = self._get(url.encode(), 50000, b"</tbody>")
         response["history"] = processer.historical(res, start, end, revert)
         return response
 
@@ -604,8 +1110,8 @@ cdef class Pymarketcap:
             curr = response["website_slug"]
 
         res = self._get(
-            b"https://coinmarketcap.com/currencies/%s/" % curr.encode()
-        )[20000:]
+            b"https://coinmarketcap.com/currencies/%s/" % curr.encode(), 20000
+        )
 
         response["markets"] = processer.markets(res, convert.lower())
         return response
@@ -646,8 +1152,8 @@ cdef class Pymarketcap:
             Platforms tokens data.
         """
         res = self._get(
-            b"https://coinmarketcap.com/tokens/views/all/"
-        )[40000:]
+            b"https://coinmarketcap.com/tokens/views/all/", 40000
+        )
         return processer.tokens(res, convert.lower())
 
     # ====================================================================
@@ -696,7 +1202,7 @@ cdef class Pymarketcap:
                 end_tsmp = cmc_timestamp(end)
                 url = b"%s/%d/%d/" % (url.strip(b"/"), start_tsmp, end_tsmp)
 
-        res = loads(self._get(url))
+        res = loads(self._get_conditional(url))
 
         return processer.graphs(res, start, end)
 
@@ -726,7 +1232,7 @@ cdef class Pymarketcap:
                 end_tsmp = cmc_timestamp(end)
                 url = b"%s/%d/%d/" % (url.strip(b"/"), start_tsmp, end_tsmp)
 
-        res = loads(self._get(url))
+        res = loads(self._get_conditional(url))
         return processer.graphs(res, start, end)
 
     cpdef _global_cap(self, bitcoin=True, start=None, end=None,
@@ -765,7 +1271,7 @@ cdef class Pymarketcap:
                 end_tsmp = cmc_timestamp(end)
                 url = b"%s/%d/%d/" % (url.strip(b"/"), start_tsmp, end_tsmp)
 
-        res = loads(self._get(url))
+        res = loads(self._get_conditional(url))
         return processer.graphs(res, start, end)
 
     # ====================================================================
@@ -3,6 +3,7 @@ cdef extern from "curl/curl.h" nogil:
     ctypedef void CURL
     ctypedef int CURLoption
     ctypedef int CURLINFO
+    ctypedef long long curl_off_t
 
     # {{{ CURLoption
     enum: CURLOPT_WRITEDATA
@@ -216,6 +217,15 @@ cdef extern from "curl/curl.h" nogil:
     enum: CURLOPT_EXPECT_100_TIMEOUT_MS
     enum: CURLOPT_PROXYHEADER
     enum: CURLOPT_HEADEROPT
+    enum: CURLOPT_PIPEWAIT
+    # }}}
+
+    # {{{ CURL_HTTP_VERSION
+    enum: CURL_HTTP_VERSION_NONE
+    enum: CURL_HTTP_VERSION_1_0
+    enum: CURL_HTTP_VERSION_1_1
+    enum: CURL_HTTP_VERSION_2_0
+    enum: CURL_HTTP_VERSION_2TLS
     # }}}
 
     # {{{ CURLcode
@@ -357,6 +367,9 @@ cdef extern from "curl/curl.h" nogil:
     enum: CURLINFO_LOCAL_IP
     enum: CURLINFO_LOCAL_PORT
     enum: CURLINFO_TLS_SESSION
+    enum: CURLINFO_CONTENT_LENGTH_DOWNLOAD_T
+    enum: CURLINFO_SIZE_DOWNLOAD_T
+    enum: CURLINFO_HTTP_VERSION
     enum: CURLINFO_LASTONE
     # }}}
 
@@ -364,6 +377,80 @@ cdef extern from "curl/curl.h" nogil:
     CURL *curl_easy_init()
     CURLcode curl_easy_perform(CURL * easy_handle )
     void curl_easy_cleanup(CURL * handle )
+    void curl_easy_reset(CURL * handle )
     CURLcode curl_easy_setopt(CURL *handle, CURLoption option, void *parameter)
     const char *curl_easy_strerror(CURLcode errornum)
     CURLcode curl_easy_getinfo(CURL *curl, CURLINFO info, ... )
+
+    # {{{ String lists
+    struct curl_slist:
+        char *data
+        curl_slist *next
+
+    curl_slist *curl_slist_append(curl_slist *list, const char *string)
+    void curl_slist_free_all(curl_slist *list)
+    # }}}
+
+    # {{{ Multi interface
+    ctypedef void CURLM
+    ctypedef int CURLMcode
+    ctypedef int CURLMoption
+
+    enum: CURLM_OK
+    enum: CURLMSG_DONE
+    enum: CURLMOPT_MAXCONNECTS
+    enum: CURLMOPT_PIPELINING
+    enum: CURLPIPE_NOTHING
+    enum: CURLPIPE_MULTIPLEX
+    enum: CURLMOPT_MAX_HOST_CONNECTIONS
+    enum: CURLMOPT_MAX_TOTAL_CONNECTIONS
+
+    ctypedef union CURLMsgData:
+        void *whatever
+        CURLcode result
+
+    ctypedef struct CURLMsg:
+        int msg
+        CURL *easy_handle
+        CURLMsgData data
+
+    CURLM *curl_multi_init()
+    CURLMcode curl_multi_add_handle(CURLM *multi_handle, CURL *curl_handle)
+    CURLMcode curl_multi_remove_handle(CURLM *multi_handle, CURL *curl_handle)
+    CURLMcode curl_multi_perform(CURLM *multi_handle, int *running_handles)
+    CURLMcode curl_multi_wait(CURLM *multi_handle, void *extra_fds,
+                              unsigned int extra_nfds, int timeout_ms,
+                              int *ret)
+    CURLMsg *curl_multi_info_read(CURLM *multi_handle, int *msgs_in_queue)
+    CURLMcode curl_multi_setopt(CURLM *multi_handle, CURLMoption option, ...)
+    CURLMcode curl_multi_cleanup(CURLM *multi_handle)
+    const char *curl_multi_strerror(CURLMcode errornum)
+    # }}}
+
+    # {{{ Share interface
+    ctypedef void CURLSH
+    ctypedef int CURLSHcode
+    ctypedef int CURLSHoption
+    ctypedef int curl_lock_data
+    ctypedef int curl_lock_access
+
+    enum: CURLSHE_OK
+    enum: CURLSHOPT_SHARE
+    enum: CURLSHOPT_UNSHARE
+    enum: CURLSHOPT_LOCKFUNC
+    enum: CURLSHOPT_UNLOCKFUNC
+    enum: CURLSHOPT_USERDATA
+
+    enum: CURL_LOCK_DATA_NONE
+    enum: CURL_LOCK_DATA_SHARE
+    enum: CURL_LOCK_DATA_COOKIE
+    enum: CURL_LOCK_DATA_DNS
+    enum: CURL_LOCK_DATA_SSL_SESSION
+    enum: CURL_LOCK_DATA_CONNECT
+    enum: CURL_LOCK_DATA_LAST
+
+    CURLSH *curl_share_init()
+    CURLSHcode curl_share_setopt(CURLSH *share, CURLSHoption option, ...)
+    CURLSHcode curl_share_cleanup(CURLSH *share)
+    const char *curl_share_strerror(CURLSHcode errornum)
+    # }}}
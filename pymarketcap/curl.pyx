@@ -1,7 +1,20 @@
 # External cython modules
 from libc.stddef cimport size_t
-from libc.string cimport memcpy
-from cpython.mem cimport PyMem_Malloc, PyMem_Realloc, PyMem_Free
+from libc.string cimport memcpy, memchr, memcmp
+from libc.stdlib cimport malloc, realloc, free
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from cpython.buffer cimport PyBuffer_FillInfo
+from cpython.pythread cimport (
+    PyThread_type_lock,
+    PyThread_allocate_lock,
+    PyThread_free_lock,
+    PyThread_acquire_lock,
+    PyThread_release_lock,
+    WAIT_LOCK
+)
+
+# Standard Python modules
+from time import monotonic, sleep
 
 # External C modules
 from curl cimport *
@@ -14,34 +27,601 @@ from pymarketcap import __version__
 cdef struct MemoryStruct:
     char *memory
     size_t size
+    size_t capacity
+    size_t reallocs
+    curl_off_t expected
+    bint sized
+    CURL *handle
+    # Streaming: bytes to discard before storing
+    # and marker after which the transfer stops
+    size_t skip
+    const char *until
+    size_t until_len
+    bint stopped
+    # Header lines of the last response received
+    char *headers
+    size_t headers_size
+    size_t headers_capacity
+
+# Minimum capacity reserved when the buffer grows
+cdef enum:
+    MIN_CAPACITY = 16384
+
+cdef int init_memory(MemoryStruct *mem, CURL *handle, size_t skip=0,
+                     const char *until=NULL, size_t until_len=0):
+    """Initialize an empty buffer. The expected size of the
+    body is read from ``handle`` when the first chunk arrives.
+
+    The first ``skip`` bytes of the body are discarded without being
+    stored and, if ``until`` is passed, the transfer is stopped as soon
+    as the marker is received, keeping the body up to its end.
+    """
+    mem.memory = <char *>malloc(1)
+    if mem.memory == NULL:
+        return -1
+    mem.memory[0] = 0
+    mem.size = 0
+    mem.capacity = 1
+    mem.reallocs = 0
+    mem.expected = -1
+    mem.sized = False
+    mem.handle = handle
+    mem.skip = skip
+    mem.until = until
+    mem.until_len = until_len if until != NULL else 0
+    mem.stopped = False
+    mem.headers = NULL
+    mem.headers_size = 0
+    mem.headers_capacity = 0
+    return 0
+
+cdef void free_memory(MemoryStruct *mem) noexcept nogil:
+    """Release the buffers of the body and the headers."""
+    free(mem.memory)
+    free(mem.headers)
+    mem.memory = NULL
+    mem.headers = NULL
+
+cdef Py_ssize_t find_marker(const char *haystack, size_t size,
+                            const char *needle, size_t len) noexcept nogil:
+    """Position of ``needle`` in ``haystack`` or ``-1`` if not found."""
+    cdef const char *pos = haystack
+    cdef const char *end = haystack + size
+    while <size_t>(end - pos) >= len:
+        pos = <const char *>memchr(pos, needle[0], end - pos - len + 1)
+        if pos == NULL:
+            return -1
+        if memcmp(pos, needle, len) == 0:
+            return pos - haystack
+        pos += 1
+    return -1
+
+cdef int reserve_memory(MemoryStruct *mem, size_t capacity) noexcept nogil:
+    """Grow the buffer to hold at least ``capacity`` bytes."""
+    cdef char *memory = <char *>realloc(mem.memory, capacity)
+    if memory == NULL:
+        return -1
+    mem.memory = memory
+    mem.capacity = capacity
+    mem.reallocs += 1
+    return 0
+
+cdef void trim_memory(MemoryStruct *mem) noexcept nogil:
+    """Release the slack left at the end of the buffer."""
+    cdef char *memory
+    if mem.capacity > mem.size + 1:
+        memory = <char *>realloc(mem.memory, mem.size + 1)
+        if memory != NULL:
+            mem.memory = memory
+            mem.capacity = mem.size + 1
 
 cdef size_t write_memory(void *contents, size_t size,
-                         size_t nmemb, void *userp):
+                         size_t nmemb, void *userp) noexcept nogil:
+    # Called by libcurl without the GIL, so only C calls are allowed
     cdef size_t realsize = size * nmemb
+    cdef size_t storesize = realsize
+    cdef size_t needed, capacity, search_from
+    cdef Py_ssize_t found
+    cdef char *data = <char *>contents
     cdef MemoryStruct *mem = <MemoryStruct *>userp
-    mem.memory = <char *>PyMem_Realloc(
-        mem.memory, mem.size + realsize + 1
-    )
-    if mem.memory == NULL:
-        print("Not enough memory (realloc returned NULL)\n")
-        return 0
-    memcpy(&(mem.memory[mem.size]), contents, realsize)
-    mem.size += realsize
+
+    if not mem.sized:
+        # Headers are complete when the first chunk of the
+        # body arrives, so the length is known at this point
+        mem.sized = True
+        if mem.handle != NULL:
+            curl_easy_getinfo(mem.handle, CURLINFO_CONTENT_LENGTH_DOWNLOAD_T,
+                              &mem.expected)
+        if mem.expected > 0 and <size_t>mem.expected > mem.skip:
+            needed = <size_t>mem.expected - mem.skip + 1
+            if needed > mem.capacity and reserve_memory(mem, needed) != 0:
+                return 0
+
+    if mem.skip > 0:
+        if storesize <= mem.skip:
+            mem.skip -= storesize
+            return realsize
+        data += mem.skip
+        storesize -= mem.skip
+        mem.skip = 0
+
+    needed = mem.size + storesize + 1
+    if needed > mem.capacity:
+        # Geometric growth keeps the number of reallocs logarithmic
+        capacity = mem.capacity * 2
+        if capacity < needed:
+            capacity = needed
+        if capacity < MIN_CAPACITY:
+            capacity = MIN_CAPACITY
+        if reserve_memory(mem, capacity) != 0:
+            # Not enough memory, libcurl aborts the transfer
+            return 0
+    memcpy(&(mem.memory[mem.size]), data, storesize)
+
+    if mem.until_len > 0:
+        # The marker may start at the end of previous chunk
+        search_from = mem.size - mem.until_len + 1 \
+            if mem.size >= mem.until_len else 0
+        mem.size += storesize
+        found = find_marker(mem.memory + search_from, mem.size - search_from,
+                            mem.until, mem.until_len)
+        if found >= 0:
+            mem.size = search_from + found + mem.until_len
+            mem.memory[mem.size] = 0
+            mem.stopped = True
+            # Returning less than received makes libcurl abort
+            return 0
+    else:
+        mem.size += storesize
     mem.memory[mem.size] = 0
     return realsize
 
+cdef size_t write_header(char *buffer, size_t size,
+                         size_t nitems, void *userp) noexcept nogil:
+    # Called by libcurl once for each header line, without the GIL
+    cdef size_t realsize = size * nitems
+    cdef size_t capacity
+    cdef char *headers
+    cdef MemoryStruct *mem = <MemoryStruct *>userp
+
+    if realsize >= 5 and memcmp(buffer, b"HTTP/", 5) == 0:
+        # Status line of a new response (redirect or ``100 Continue``),
+        # only the headers of the last one are kept
+        mem.headers_size = 0
+    if mem.headers_size + realsize > mem.headers_capacity:
+        capacity = mem.headers_capacity * 2
+        if capacity < mem.headers_size + realsize:
+            capacity = mem.headers_size + realsize
+        headers = <char *>realloc(mem.headers, capacity)
+        if headers == NULL:
+            return 0
+        mem.headers = headers
+        mem.headers_capacity = capacity
+    memcpy(&(mem.headers[mem.headers_size]), buffer, realsize)
+    mem.headers_size += realsize
+    return realsize
+
+def feed_write_memory(list chunks, long long content_length=-1,
+                      size_t offset=0, bytes until=b""):
+    """Feed chunks to the write callback as libcurl would do
+    during a transfer. Used by :file:`bench/write_memory.py`.
+
+    Args:
+        chunks (list): Chunks of bytes of the simulated body.
+        content_length (int, optional): Length announced by the
+            simulated server, or ``-1`` if unknown. As default ``-1``.
+        offset (int, optional): Bytes discarded at the beginning
+            of the body. As default ``0``.
+        until (bytes, optional): Marker which stops the simulated
+            transfer. As default ``b""`` (no marker).
+
+    Returns (tuple):
+        Size of the body stored and number of reallocs performed.
+    """
+    cdef MemoryStruct mem
+    cdef bytes chunk
+    if init_memory(&mem, NULL, offset, until, len(until)) != 0:
+        raise MemoryError
+    mem.expected = content_length
+    try:
+        for chunk in chunks:
+            if write_memory(<char *>chunk, 1, len(chunk), &mem) != len(chunk):
+                if mem.stopped:
+                    break
+                raise MemoryError
+        trim_memory(&mem)
+        return mem.size, mem.reallocs
+    finally:
+        free_memory(&mem)
+
 cdef class Response(object):
+    """Response of a transfer. Owns the buffer filled by libcurl
+    and exposes it through the buffer protocol, so the body can
+    be read by ``memoryview(response)`` without copying it.
+    """
+    cdef char *memory
+    cdef Py_ssize_t size
     cdef readonly long status_code
-    cdef readonly bytes text
+    cdef readonly long http_version
+    #: bool: ``True`` if the transfer was stopped after receiving
+    #: the ``until`` marker, so the body is truncated after it.
+    cdef readonly bint stopped
     cdef readonly bytes content_type
     cdef readonly bytes encoding
     cdef readonly bytes url
+    #: bytes: Raw header lines of the response, status line included.
+    cdef readonly bytes raw_headers
+    cdef dict _headers
+
+    #: float: Seconds from the start until the name was resolved.
+    cdef readonly double namelookup_time
+    #: float: Seconds from the start until the TCP connect was done.
+    cdef readonly double connect_time
+    #: float: Seconds from the start until the TLS handshake was done.
+    cdef readonly double appconnect_time
+    #: float: Seconds from the start until the first byte was received.
+    cdef readonly double starttransfer_time
+    #: float: Total seconds of the transfer.
+    cdef readonly double total_time
+    #: float: Bytes of the body downloaded, offset included.
+    cdef readonly curl_off_t size_download
+    #: bool: ``True`` if the transfer reused a live connection.
+    cdef readonly bint connection_reused
+
+    def __cinit__(self):
+        self.memory = NULL
+        self.size = 0
+        self.raw_headers = b""
+
+    def __dealloc__(self):
+        free(self.memory)
+
+    def __len__(self):
+        return self.size
+
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        PyBuffer_FillInfo(buffer, self, self.memory, self.size, 1, flags)
+
+    def __releasebuffer__(self, Py_buffer *buffer):
+        pass
+
+    @property
+    def body(self):
+        """memoryview: Read only view of the body."""
+        return memoryview(self)
+
+    @property
+    def text(self):
+        """bytes: Copy of the body."""
+        if self.memory == NULL:
+            return b""
+        return self.memory[:self.size]
+
+    @property
+    def headers(self):
+        """dict: Headers of the response with lowercased names.
+        Parsed from :attr:`raw_headers` the first time accessed."""
+        cdef bytes line
+        if self._headers is None:
+            self._headers = {}
+            for line in self.raw_headers.split(b"\r\n")[1:]:
+                name, sep, value = line.partition(b":")
+                if sep:
+                    self._headers[name.strip().lower().decode("latin-1")] = \
+                        value.strip().decode("latin-1")
+        return self._headers
+
+    @property
+    def timings(self):
+        """dict: Timing breakdown of the transfer, with keys
+        ``"namelookup_time"``, ``"connect_time"``, ``"appconnect_time"``,
+        ``"starttransfer_time"``, ``"total_time"``, ``"size_download"``
+        and ``"connection_reused"``."""
+        return {
+            "namelookup_time": self.namelookup_time,
+            "connect_time": self.connect_time,
+            "appconnect_time": self.appconnect_time,
+            "starttransfer_time": self.starttransfer_time,
+            "total_time": self.total_time,
+            "size_download": self.size_download,
+            "connection_reused": self.connection_reused,
+        }
 
-    def __cinit__(self, text):
-        self.text = text
+    cpdef unicode decode(self, Py_ssize_t offset=0):
+        """Decode the body from UTF-8 starting at byte ``offset``,
+        reading directly from the buffer.
+
+        Args:
+            offset (int, optional): Number of bytes skipped at the
+                beginning of the body. If it falls inside a multibyte
+                character, the start moves to the next character.
+                As default ``0``.
+        """
+        if self.memory == NULL or offset >= self.size:
+            return u""
+        if offset < 0:
+            offset = 0
+        # Skip UTF-8 continuation bytes (10xxxxxx)
+        while offset < self.size and (self.memory[offset] & 0xC0) == 0x80:
+            offset += 1
+        return self.memory[offset:self.size].decode("utf-8")
+
+cdef Response build_response(CURL *curl, MemoryStruct *chunk):
+    """Build a response from a finished transfer, taking
+    the ownership of the buffer of ``chunk``."""
+    cdef Response resp = Response.__new__(Response)
+    cdef long num_connects = 0
+    trim_memory(chunk)
+    resp.memory = chunk.memory
+    resp.size = chunk.size
+    resp.stopped = chunk.stopped
+    chunk.memory = NULL
+    if chunk.headers != NULL:
+        resp.raw_headers = chunk.headers[:chunk.headers_size]
+    curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE,
+                      &resp.status_code)
+    curl_easy_getinfo(curl, CURLINFO_HTTP_VERSION,
+                      &resp.http_version)
+
+    curl_easy_getinfo(curl, CURLINFO_NAMELOOKUP_TIME,
+                      &resp.namelookup_time)
+    curl_easy_getinfo(curl, CURLINFO_CONNECT_TIME,
+                      &resp.connect_time)
+    curl_easy_getinfo(curl, CURLINFO_APPCONNECT_TIME,
+                      &resp.appconnect_time)
+    curl_easy_getinfo(curl, CURLINFO_STARTTRANSFER_TIME,
+                      &resp.starttransfer_time)
+    curl_easy_getinfo(curl, CURLINFO_TOTAL_TIME,
+                      &resp.total_time)
+    curl_easy_getinfo(curl, CURLINFO_SIZE_DOWNLOAD_T,
+                      &resp.size_download)
+    curl_easy_getinfo(curl, CURLINFO_NUM_CONNECTS,
+                      &num_connects)
+    resp.connection_reused = num_connects == 0
+    return resp
+
+cdef inline bint transfer_stopped(CURLcode ret, MemoryStruct *chunk):
+    """Check if a transfer failed because the write
+    callback stopped it after finding the marker."""
+    return ret == CURLE_WRITE_ERROR and chunk.stopped
+
+cdef void share_lock(CURL *handle, curl_lock_data data,
+                     curl_lock_access access, void *userptr) noexcept nogil:
+    cdef PyThread_type_lock *locks = <PyThread_type_lock *>userptr
+    PyThread_acquire_lock(locks[data], WAIT_LOCK)
+
+cdef void share_unlock(CURL *handle, curl_lock_data data,
+                       void *userptr) noexcept nogil:
+    cdef PyThread_type_lock *locks = <PyThread_type_lock *>userptr
+    PyThread_release_lock(locks[data])
+
+cdef class Session(object):
+    """Pool of libcurl easy handles reused between requests.
+
+    Each handle keeps its live connections cached, so consecutive
+    requests to the same host through the session skip the TCP connect
+    and the TLS handshake. All the handles are attached to the same
+    share object, so the DNS cache and the TLS session IDs are reused
+    by the others, and new connections skip the name resolution and the
+    full handshake. Access to the shared data is protected by a lock per
+    data type, so handles of the same session can run on several
+    threads. Connections are not shared, because libcurl doesn't
+    support using a shared connection cache from concurrent threads.
+
+    Transfers of :func:`get_many_to_memory` use the connection cache
+    of their multi handle, so they only reuse connections among them.
+
+    Args:
+        max_handles (int, optional): Maximum number of idle handles
+            stored in the pool, which is also the maximum number of
+            connections cached by each of them. As default ``8``.
+        cainfo (bytes, optional): Path to a CA bundle used to
+            verify peers. As default ``b""`` (libcurl default bundle).
+        http2 (bool, optional): Negotiate HTTP/2 with HTTPS servers,
+            falling back to HTTP/1.1 when the server doesn't support
+            it. Parallel transfers to the same host are multiplexed
+            over a single connection. As default ``False``.
+    """
+    cdef CURL **handles
+    cdef int num_handles
+    cdef CURLSH *share
+    cdef PyThread_type_lock *locks
+    cdef readonly int max_handles
+    cdef public bytes cainfo
+    cdef public bint http2
+
+    #: int: Number of transfers completed through the session.
+    cdef readonly unsigned long requests
+    #: int: Number of transfers that opened a new connection.
+    cdef readonly unsigned long connections_created
+    #: int: Number of transfers that reused a live connection.
+    cdef readonly unsigned long connections_reused
+    #: int: Number of TLS handshakes performed by new connections.
+    cdef readonly unsigned long tls_handshakes
+
+    def __cinit__(self, int max_handles=8, bytes cainfo=b"",
+                  bint http2=False):
+        cdef int i
+        self.locks = <PyThread_type_lock *>PyMem_Malloc(
+            CURL_LOCK_DATA_LAST * sizeof(PyThread_type_lock)
+        )
+        if self.locks == NULL:
+            raise MemoryError
+        for i in range(CURL_LOCK_DATA_LAST):
+            self.locks[i] = PyThread_allocate_lock()
+        for i in range(CURL_LOCK_DATA_LAST):
+            if self.locks[i] == NULL:
+                raise MemoryError
+        self.handles = <CURL **>PyMem_Malloc(max_handles * sizeof(CURL *))
+        if self.handles == NULL:
+            raise MemoryError
+        self.num_handles = 0
+        self.max_handles = max_handles
+        self.cainfo = cainfo
+        self.http2 = http2
+
+        self.share = curl_share_init()
+        if self.share == NULL:
+            raise RuntimeError
+        curl_share_setopt(self.share, CURLSHOPT_LOCKFUNC, &share_lock)
+        curl_share_setopt(self.share, CURLSHOPT_UNLOCKFUNC, &share_unlock)
+        curl_share_setopt(self.share, CURLSHOPT_USERDATA, <void *>self.locks)
+        curl_share_setopt(self.share, CURLSHOPT_SHARE, CURL_LOCK_DATA_DNS)
+        curl_share_setopt(self.share, CURLSHOPT_SHARE,
+                          CURL_LOCK_DATA_SSL_SESSION)
+
+    def __dealloc__(self):
+        cdef int i
+        # Handles must be destroyed before the share they use
+        if self.handles != NULL:
+            for i in range(self.num_handles):
+                curl_easy_cleanup(self.handles[i])
+            PyMem_Free(self.handles)
+        if self.share != NULL:
+            curl_share_cleanup(self.share)
+        if self.locks != NULL:
+            for i in range(CURL_LOCK_DATA_LAST):
+                if self.locks[i] != NULL:
+                    PyThread_free_lock(self.locks[i])
+            PyMem_Free(self.locks)
+
+    def __len__(self):
+        return self.num_handles
+
+    @property
+    def stats(self):
+        """Counters of connections and handshakes reused
+        by the transfers of this session.
+
+        Returns (dict):
+            With keys ``"requests"``, ``"connections_created"``,
+            ``"connections_reused"`` and ``"tls_handshakes"``.
+        """
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "tls_handshakes": self.tls_handshakes,
+        }
+
+    cdef CURL *acquire(self):
+        """Take an idle handle from the pool or create a new one."""
+        cdef CURL *curl
+        cdef long max_connects = max(self.max_handles, 1)
+        if self.num_handles > 0:
+            self.num_handles -= 1
+            curl = self.handles[self.num_handles]
+            # Options are cleared, the connections cached by the handle
+            # stay alive, like DNS entries and TLS sessions in the share
+            curl_easy_reset(curl)
+        else:
+            curl = curl_easy_init()
+        if curl != NULL:
+            curl_easy_setopt(curl, CURLOPT_SHARE, self.share)
+            curl_easy_setopt(curl, CURLOPT_MAXCONNECTS,
+                             <void *>max_connects)
+        return curl
+
+    cdef void release(self, CURL *curl):
+        """Return a handle to the pool, destroying it if the pool is full."""
+        if self.num_handles < self.max_handles:
+            self.handles[self.num_handles] = curl
+            self.num_handles += 1
+        else:
+            curl_easy_cleanup(curl)
+
+    cdef void record(self, CURL *curl):
+        """Update the counters with a finished transfer."""
+        cdef long num_connects = 0
+        cdef double appconnect_time = 0
+        curl_easy_getinfo(curl, CURLINFO_NUM_CONNECTS, &num_connects)
+        curl_easy_getinfo(curl, CURLINFO_APPCONNECT_TIME, &appconnect_time)
+        self.requests += 1
+        if num_connects > 0:
+            self.connections_created += num_connects
+            if appconnect_time > 0:
+                self.tls_handshakes += 1
+        else:
+            self.connections_reused += 1
+
+cdef CURLcode setup_handle(CURL *curl, const char *url, long timeout,
+                           bint debug, const char *proxy_addr,
+                           MemoryStruct *chunk, Session session,
+                           curl_slist *headers=NULL):
+    """Set the options shared by every GET request on a handle."""
+    cdef CURLcode ret
+    cdef long true = 1L
+    cdef const char *user_agent = "pymarketcap 4.0.0017"
+    cdef const char *accept_encoding = "gzip, deflate"
+
+    if debug:
+        curl_easy_setopt(curl, CURLOPT_VERBOSE,
+                         &true)
+    curl_easy_setopt(curl, CURLOPT_FOLLOWLOCATION,
+                     &true)
+    ret = curl_easy_setopt(curl, CURLOPT_URL, url)
+    ret = curl_easy_setopt(curl, CURLOPT_TIMEOUT,
+                           <void *>timeout)
+
+    if proxy_addr != b"":
+        ret = curl_easy_setopt(curl, CURLOPT_PROXY,
+                               proxy_addr);
+
+    ret = curl_easy_setopt(curl, CURLOPT_HTTPGET,
+                           &true)
+
+    ret = curl_easy_setopt(curl, CURLOPT_USERAGENT,
+                           user_agent)
+    ret = curl_easy_setopt(curl, CURLOPT_ACCEPT_ENCODING,
+                           accept_encoding)
+    ret = curl_easy_setopt(curl, CURLOPT_TCP_KEEPALIVE,
+                           <void *>1L)
+
+    if session is not None and session.cainfo:
+        ret = curl_easy_setopt(curl, CURLOPT_CAINFO,
+                               <const char *>session.cainfo)
+
+    if session is not None and session.http2:
+        ret = curl_easy_setopt(curl, CURLOPT_HTTP_VERSION,
+                               <void *>CURL_HTTP_VERSION_2TLS)
+        # Wait for a connection to the same host to know if it can
+        # be multiplexed instead of opening a new one in parallel
+        ret = curl_easy_setopt(curl, CURLOPT_PIPEWAIT,
+                               <void *>1L)
+
+    if headers != NULL:
+        ret = curl_easy_setopt(curl, CURLOPT_HTTPHEADER,
+                               headers)
+
+    curl_easy_setopt(curl, CURLOPT_WRITEFUNCTION,
+                     &write_memory)
+    curl_easy_setopt(curl, CURLOPT_WRITEDATA,
+                     <void *>chunk)
+    curl_easy_setopt(curl, CURLOPT_HEADERFUNCTION,
+                     &write_header)
+    curl_easy_setopt(curl, CURLOPT_HEADERDATA,
+                     <void *>chunk)
+    return ret
+
+cdef curl_slist *build_headers(list headers) except? NULL:
+    """Build the list of extra request headers passed to libcurl."""
+    cdef curl_slist *slist = NULL
+    cdef curl_slist *appended
+    cdef bytes header
+    if not headers:
+        return NULL
+    for header in headers:
+        appended = curl_slist_append(slist, header)
+        if appended == NULL:
+            curl_slist_free_all(slist)
+            raise MemoryError
+        slist = appended
+    return slist
 
 cpdef Response get_to_memory(const char *url, long timeout,
-                             bint debug, const char *proxy_addr):
+                             bint debug, const char *proxy_addr,
+                             Session session=None, size_t offset=0,
+                             bytes until=b"", list headers=None):
     """Send a get request using a buffer stored in memory.
 
     Args:
@@ -50,61 +630,223 @@ cpdef Response get_to_memory(const char *url, long timeout,
             time cancels the request.
         debug (bint): Flag to activate/desactivate body
             response printing.
+        proxy_addr (char *): Proxy to use, or ``b""`` for none.
+        session (:class:`pymarketcap.curl.Session`, optional): Pool
+            of handles to reuse connections from. If ``None``, a new
+            handle is created and destroyed for this request.
+        offset (int, optional): Number of bytes at the beginning of
+            the body discarded as they arrive. As default ``0``.
+        until (bytes, optional): If passed, the transfer is stopped
+            as soon as this marker is received, and the body ends
+            with it. As default ``b""``.
+        headers (list, optional): Extra request headers as bytes,
+            like ``b"If-None-Match: \"etag\""``. As default ``None``.
 
     Returns (:class:`pymarketcap.curl.Response`):
         Returns a class with next attributes:
-            ``text``, ``status_code``, ``url``.
+            ``text``, ``status_code``, ``url``, ``headers``.
     """
     cdef CURLcode ret
-    cdef long true = 1L
-    version = curl_version()
-    cdef CURL *curl = curl_easy_init()
-    cdef const char *user_agent = "pymarketcap 4.0.0017"
-    cdef const char *accept_encoding = "gzip, deflate"
-    cdef char *raw_body
+    cdef CURL *curl
+    cdef curl_slist *slist = build_headers(headers)
+    if session is not None:
+        curl = session.acquire()
+    else:
+        curl = curl_easy_init()
+    if curl == NULL:
+        curl_slist_free_all(slist)
+        raise RuntimeError
 
     cdef MemoryStruct chunk
-    chunk.memory = <char *>PyMem_Malloc(1)
-    chunk.size = 0
-
-    if curl != NULL:
-        if debug:
-            curl_easy_setopt(curl, CURLOPT_VERBOSE,
-                             &true)
-        curl_easy_setopt(curl, CURLOPT_FOLLOWLOCATION,
-                         &true)
-        ret = curl_easy_setopt(curl, CURLOPT_URL, url)
-        ret = curl_easy_setopt(curl, CURLOPT_TIMEOUT,
-                               <void *>timeout)
+    if init_memory(&chunk, curl, offset, until, len(until)) != 0:
+        curl_slist_free_all(slist)
+        if session is not None:
+            session.release(curl)
+        else:
+            curl_easy_cleanup(curl)
+        raise MemoryError
 
-        if proxy_addr != b"":
-            ret = curl_easy_setopt(curl, CURLOPT_PROXY,
-                                   proxy_addr);
+    try:
+        ret = setup_handle(curl, url, timeout, debug,
+                           proxy_addr, &chunk, session, slist)
+        if ret != CURLE_OK:
+            raise RuntimeError
+        # The transfer doesn't touch Python objects, so other
+        # threads can run while waiting for the network
+        with nogil:
+            ret = curl_easy_perform(curl)
+        if ret != CURLE_OK and not transfer_stopped(ret, &chunk):
+            raise CoinmarketcapHTTPError(
+                curl_easy_strerror(ret).decode()
+            )
 
-        ret = curl_easy_setopt(curl, CURLOPT_HTTPGET,
-                               &true)
+        if session is not None:
+            session.record(curl)
+        return build_response(curl, &chunk)
+    finally:
+        free_memory(&chunk)
+        curl_slist_free_all(slist)
+        if session is not None:
+            session.release(curl)
+        else:
+            curl_easy_cleanup(curl)
 
-        ret = curl_easy_setopt(curl, CURLOPT_USERAGENT,
-                               user_agent)
-        ret = curl_easy_setopt(curl, CURLOPT_ACCEPT_ENCODING,
-                               accept_encoding)
+cpdef list get_many_to_memory(list urls, long timeout, bint debug,
+                              const char *proxy_addr, int max_parallel=8,
+                              Session session=None, size_t offset=0,
+                              bytes until=b"", rate_limiter=None):
+    """Send several get requests in parallel using the libcurl
+    multi interface. All transfers are driven from one loop, with
+    at most ``max_parallel`` of them in flight at the same time.
 
-        curl_easy_setopt(curl, CURLOPT_WRITEFUNCTION,
-                         &write_memory)
-        curl_easy_setopt(curl, CURLOPT_WRITEDATA,
-                         <void *>&chunk)
+    Args:
+        urls (list): Urls as bytes.
+        timeout (long): Number of seconds until expiration
+            time cancels each request.
+        debug (bint): Flag to activate/desactivate body
+            response printing.
+        proxy_addr (char *): Proxy to use, or ``b""`` for none.
+        max_parallel (int, optional): Maximum number of simultaneous
+            transfers. As default ``8``.
+        session (:class:`pymarketcap.curl.Session`, optional): Pool
+            of handles to take the easy handles from.
+        offset (int, optional): Bytes discarded at the beginning
+            of each body. As default ``0``.
+        until (bytes, optional): Marker which stops each transfer
+            once received. As default ``b""``.
+        rate_limiter (:class:`pymarketcap.ratelimit.RateLimiter`,
+            optional): Limiter whose token is reserved just before each
+            transfer is added to the multi handle, which keeps driving
+            the transfers in flight while the next one waits. It's fed
+            back each response as it completes. As default ``None``.
 
-        if ret != CURLE_OK:
-            raise RuntimeError
-        ret = curl_easy_perform(curl)
-        if ret != CURLE_OK:
-            raise CoinmarketcapHTTPError
+    Returns (list):
+        A :class:`pymarketcap.curl.Response` for each url, in the
+        same order, or a :class:`pymarketcap.errors.CoinmarketcapHTTPError`
+        instance for those whose transfer failed.
+    """
+    cdef Py_ssize_t i, num_urls = len(urls), next_url = 0
+    cdef int running = 0, active = 0, msgs_left = 0, wait_ms
+    # Time when the next transfer can start, if its token is reserved
+    cdef double start_at = 0
+    cdef bint reserved = False
+    cdef void *private
+    cdef CURLMsg *msg
+    cdef CURL *curl
+    cdef CURLM *multi
+    cdef CURLcode ret
+    cdef bytes url
+    cdef list responses = [None] * num_urls
+
+    if num_urls == 0:
+        return responses
+    if max_parallel < 1:
+        max_parallel = 1
+
+    cdef MemoryStruct *chunks = <MemoryStruct *>PyMem_Malloc(
+        num_urls * sizeof(MemoryStruct)
+    )
+    cdef CURL **handles = <CURL **>PyMem_Malloc(num_urls * sizeof(CURL *))
+    if chunks == NULL or handles == NULL:
+        PyMem_Free(chunks)
+        PyMem_Free(handles)
+        raise MemoryError
+    for i in range(num_urls):
+        chunks[i].memory = NULL
+        chunks[i].headers = NULL
+        chunks[i].size = 0
+        handles[i] = NULL
+
+    multi = curl_multi_init()
+    if multi == NULL:
+        PyMem_Free(chunks)
+        PyMem_Free(handles)
+        raise RuntimeError
+    if session is not None and session.http2:
+        curl_multi_setopt(multi, CURLMOPT_PIPELINING, CURLPIPE_MULTIPLEX)
+    else:
+        curl_multi_setopt(multi, CURLMOPT_PIPELINING, CURLPIPE_NOTHING)
 
-        resp = Response(chunk.memory)
-        curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE,
-                          &resp.status_code)
-        curl_easy_cleanup(curl)
+    try:
+        while next_url < num_urls or active > 0:
+            # Keep the multi handle filled up to ``max_parallel`` transfers
+            while next_url < num_urls and active < max_parallel:
+                if rate_limiter is not None:
+                    if not reserved:
+                        start_at = monotonic() + \
+                            rate_limiter.reserve(urls[next_url])
+                        reserved = True
+                    if monotonic() < start_at:
+                        break
+                    reserved = False
+                i = next_url
+                next_url += 1
+                curl = session.acquire() if session is not None \
+                    else curl_easy_init()
+                if curl == NULL:
+                    raise RuntimeError
+                handles[i] = curl
+                if init_memory(&chunks[i], curl, offset,
+                               until, len(until)) != 0:
+                    raise MemoryError
+                url = urls[i]
+                ret = setup_handle(curl, url, timeout, debug,
+                                   proxy_addr, &chunks[i], session)
+                if ret != CURLE_OK:
+                    raise RuntimeError
+                curl_easy_setopt(curl, CURLOPT_PRIVATE, <void *>i)
+                curl_multi_add_handle(multi, curl)
+                active += 1
 
-        PyMem_Free(chunk.memory)
+            wait_ms = 1000
+            if reserved:
+                if active == 0:
+                    sleep(max(start_at - monotonic(), 0))
+                    continue
+                # Wake up when the next transfer can start
+                wait_ms = min(max(<int>((start_at - monotonic()) * 1000) + 1,
+                                  0), 1000)
+            with nogil:
+                curl_multi_perform(multi, &running)
+                if running > 0:
+                    curl_multi_wait(multi, NULL, 0, wait_ms, NULL)
 
-        return resp
+            msg = curl_multi_info_read(multi, &msgs_left)
+            while msg != NULL:
+                if msg.msg == CURLMSG_DONE:
+                    curl = msg.easy_handle
+                    ret = msg.data.result
+                    curl_easy_getinfo(curl, CURLINFO_PRIVATE, &private)
+                    i = <Py_ssize_t>private
+                    if ret == CURLE_OK or transfer_stopped(ret, &chunks[i]):
+                        if session is not None:
+                            session.record(curl)
+                        responses[i] = build_response(curl, &chunks[i])
+                        if rate_limiter is not None:
+                            rate_limiter.feedback(
+                                urls[i], responses[i].status_code,
+                                responses[i].headers.get("retry-after")
+                            )
+                    else:
+                        responses[i] = CoinmarketcapHTTPError(
+                            curl_easy_strerror(ret).decode()
+                        )
+                    curl_multi_remove_handle(multi, curl)
+                    if session is not None:
+                        session.release(curl)
+                    else:
+                        curl_easy_cleanup(curl)
+                    handles[i] = NULL
+                    free_memory(&chunks[i])
+                    active -= 1
+                msg = curl_multi_info_read(multi, &msgs_left)
+        return responses
+    finally:
+        for i in range(num_urls):
+            if handles[i] != NULL:
+                curl_multi_remove_handle(multi, handles[i])
+                curl_easy_cleanup(handles[i])
+            free_memory(&chunks[i])
+        curl_multi_cleanup(multi)
+        PyMem_Free(chunks)
+        PyMem_Free(handles)
@@ -23,3 +23,7 @@ class CoinmarketcapHTTPError408(CoinmarketcapError):
 class CoinmarketcapTooManyRequestsError(CoinmarketcapHTTPError):
     """Exception for catch 429 HTTP error codes."""
     pass
+
+class CoinmarketcapOfflineError(CoinmarketcapError):
+    """Exception for requests not cached in offline mode."""
+    pass
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""Indexes of the cryptocurrencies and exchanges listed by
+coinmarketcap, which answer lookups without scanning them."""
+
+# Standard python modules
+import re
+import heapq
+from bisect import bisect_left
+
+NOT_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(value):
+    """Normalize a name or slug typed by a user, so it matches
+    others which only differ in case, spaces or punctuation.
+
+    Args:
+        value (str): Like ``"Coinbase Pro"`` or ``"coinbase_pro"``.
+
+    Returns (str): Like ``"coinbase-pro"``.
+    """
+    return NOT_SLUG.sub("-", value.lower()).strip("-")
+
+
+class FieldIndex:
+    """Hash indexes of a list of records, like the cryptocurrencies
+    of :attr:`pymarketcap.Pymarketcap.cryptocurrencies`, by some of
+    their fields. If several records share a value, lookups return
+    the first of them, like a linear scan of the list does.
+
+    Values of the ``normalized`` fields are also indexed by their
+    :func:`normalize` form, where lookups asking for it which don't
+    match exactly are tried again, so ``"coinbase pro"`` finds the
+    exchange named ``"Coinbase Pro"``.
+
+    Args:
+        records (list): Dictionaries indexed.
+        fields (tuple): Fields indexed.
+        normalized (tuple, optional): Fields whose values are also
+            indexed normalized. As default ``()``.
+        grouped (tuple, optional): Fields whose values can be shared by
+            several records, like symbols, indexed to find all of them
+            with :meth:`get_all`. As default ``()``.
+    """
+    def __init__(self, records, fields, normalized=(), grouped=()):
+        self.records = records
+        self.fields = fields
+        self.normalized = normalized
+        self._indexes = {field: {} for field in fields}
+        self._normalized = {field: {} for field in normalized}
+        self._groups = {field: {} for field in grouped}
+        for record in records:
+            for field in fields:
+                self._indexes[field].setdefault(record[field], record)
+            for field in grouped:
+                self._groups[field].setdefault(record[field], []).append(
+                    record
+                )
+            for field in normalized:
+                self._normalized[field].setdefault(normalize(record[field]),
+                                                   record)
+
+    def get(self, field, value, normalized=False):
+        """Find a record by the value of a field. Fields not
+        indexed are looked up scanning the records.
+
+        Args:
+            field (str): Field of the records.
+            value (any): Value of the field.
+            normalized (bool, optional): If ``True``, values of
+                normalized fields which don't match exactly are
+                looked up normalized. As default ``False``.
+
+        Returns (dict): The record, or ``None`` if not found.
+        """
+        index = self._indexes.get(field)
+        if index is None:
+            for record in self.records:
+                if record[field] == value:
+                    return record
+            return None
+        try:
+            record = index.get(value)
+        except TypeError:   # Unhashable values don't match any record
+            return None
+        if record is None and normalized:
+            return self.get_normalized(field, value)
+        return record
+
+    def get_normalized(self, field, value):
+        """Find a record by the :func:`normalize` form of the value
+        of a normalized field, ignoring case, spaces and punctuation.
+
+        Returns (dict): The record, or ``None`` if not found.
+        """
+        if field not in self._normalized or not isinstance(value, str):
+            return None
+        return self._normalized[field].get(normalize(value))
+
+    def get_all(self, field, value):
+        """Find every record with a value of a grouped field.
+
+        Returns (list): Records, in their order.
+        """
+        try:
+            return self._groups[field].get(value, [])
+        except TypeError:
+            return []
+
+
+def trigrams(term):
+    """Returns (set): Trigrams of ``term``, padded with spaces
+    so its beginning and end weigh more."""
+    padded = " %s " % term
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Search index of records by some of their fields, for
+    autocompletion and typo tolerant lookups.
+
+    Terms (values of the fields, normalized with :func:`normalize`) are
+    kept in a sorted array where the terms starting with a query are
+    found by bisection. If there are not enough of them, records are
+    matched by the trigrams their terms share with the query, through
+    an inverted index of trigrams.
+
+    Args:
+        records (list): Dictionaries indexed.
+        fields (tuple): Fields searched.
+        ranks (dict, optional): Rank of the records by ``id``, like the
+            market capitalization rank of cryptocurrencies. Records
+            without rank are ranked by their position.
+        min_similarity (float, optional): Minimum Jaccard similarity
+            between the trigrams of a query and those of a term to
+            match it. As default ``.3``.
+    """
+    def __init__(self, records, fields, ranks=None, min_similarity=.3):
+        self.records = records
+        self.min_similarity = min_similarity
+        ranks = ranks or {}
+        self._ranks = [ranks.get(record.get("id"), len(records) + position)
+                       for position, record in enumerate(records)]
+
+        terms = set()
+        for position, record in enumerate(records):
+            for field in fields:
+                term = normalize(str(record[field]))
+                if term:
+                    terms.add((term, position))
+        #: Sorted terms and the position of their record
+        self._terms = sorted(terms)
+        self._keys = [term for term, _ in self._terms]
+        self._term_trigrams = []
+        self._trigrams = {}
+        for term_id, (term, _) in enumerate(self._terms):
+            grams = trigrams(term)
+            self._term_trigrams.append(len(grams))
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(term_id)
+
+    def _top(self, scores, limit):
+        # Best score first, then the highest rank
+        return heapq.nsmallest(
+            limit, scores, key=lambda position: (scores[position],
+                                                 self._ranks[position])
+        )
+
+    def prefix(self, query, limit=10):
+        """Records with a term which starts with ``query``. Those
+        with a term equal to it go first, then ordered by rank.
+
+        Returns (list)
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        scores = {}
+        for i in range(bisect_left(self._keys, query), len(self._keys)):
+            term, position = self._terms[i]
+            if not term.startswith(query):
+                break
+            score = 0 if term == query else 1
+            scores[position] = min(scores.get(position, 1), score)
+        return [self.records[position]
+                for position in self._top(scores, limit)]
+
+    def fuzzy(self, query, limit=10):
+        """Records with a term similar to ``query``, by the trigrams
+        they share, the most similar first.
+
+        Returns (list)
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        grams = trigrams(query)
+        shared = {}
+        for gram in grams:
+            for term_id in self._trigrams.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+
+        scores = {}
+        for term_id, count in shared.items():
+            similarity = count / (len(grams) + self._term_trigrams[term_id]
+                                  - count)
+            if similarity >= self.min_similarity:
+                position = self._terms[term_id][1]
+                scores[position] = min(scores.get(position, 0), -similarity)
+        return [self.records[position]
+                for position in self._top(scores, limit)]
+
+    def search(self, query, limit=10):
+        """Records matching ``query``: first those with a term
+        which starts with it (see :meth:`prefix`), then similar
+        ones (see :meth:`fuzzy`) if there are not enough.
+
+        Args:
+            query (str): Text typed, like ``"bitc"`` or ``"etherium"``.
+            limit (int, optional): Maximum number of records
+                returned. As default ``10``.
+
+        Returns (list)
+        """
+        response = self.prefix(query, limit)
+        if len(response) < limit:
+            found = {id(record) for record in response}
+            for record in self.fuzzy(query, limit):
+                if id(record) not in found:
+                    response.append(record)
+                    if len(response) == limit:
+                        break
+        return response
@@ -6,6 +6,7 @@
 # Standard Python modules
 import logging
 from functools import partial
+from time import time
 from json import loads
 from datetime import datetime, date
 from asyncio import (
@@ -28,6 +29,9 @@ from pymarketcap.consts import (
     DATETIME_MAX_TIME
 )
 from pymarketcap.util import cmc_timestamp
+from pymarketcap.transport import get_transport
+from pymarketcap.singleflight import AsyncSingleFlight
+from pymarketcap.errors import CoinmarketcapError, CoinmarketcapOfflineError
 
 # Logging initialization
 LOGGER_NAME = "/pymarketcap%s" % __file__.split("pymarketcap")[-1]
@@ -60,19 +64,48 @@ class AsyncPymarketcap(ClientSession):
             level will be setted as :data:`~logging.DEBUG`.
             As default ``False``.
         sync (object, optional): Synchronous version instance
-            of pymarketcap. As default
-            :py:class:`pymarketcap.core.Pymarketcap`
+            of pymarketcap. As default a new
+            :py:class:`pymarketcap.core.Pymarketcap` instance with
+            the same ``transport``, ``rate_limiter``, ``cache`` and
+            ``offline`` parameters.
+        transport (str or :class:`pymarketcap.transport.Transport`,
+            optional): If passed, requests are performed by this
+            backend instead of :mod:`aiohttp`, like a
+            :class:`pymarketcap.transport.ReplayTransport` serving
+            recorded responses. As default ``None``.
+        rate_limiter (:class:`pymarketcap.ratelimit.RateLimiter`,
+            optional): Limiter of the requests sent to each host, which
+            can be shared with other instances. As default ``None``.
+        cache (:class:`pymarketcap.cache.ResponseCache`, optional):
+            Cache of the responses, which can be shared with other
+            instances. As default ``None``.
+        offline (bool, optional): Serve responses only from ``cache``,
+            even if they have expired, raising
+            :exc:`pymarketcap.errors.CoinmarketcapOfflineError` for
+            those not cached. As default ``False``.
         **kwargs: arguments that corresponds to the
             :class:`aiohttp.client.ClientSession <~aiohttp.ClientSession>`
             parent class.
     """
     def __init__(self, queue_size=10, progress_bar=True,
                  consumers=10, timeout=15, logger=LOGGER,
-                 debug=False, sync=Pymarketcap(), **kwargs):
+                 debug=False, sync=None, transport=None,
+                 rate_limiter=None, cache=None, offline=False, **kwargs):
         super().__init__(**kwargs)
         self.timeout = timeout
         self.logger = logger
+        self.transport = get_transport(transport) \
+            if transport is not None else None
+        if sync is None:
+            sync = Pymarketcap(transport=self.transport,
+                               rate_limiter=rate_limiter, cache=cache,
+                               offline=offline)
         self.sync = sync
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.offline = offline
+        #: Requests in flight, shared by concurrent coroutines.
+        self.single_flight = AsyncSingleFlight()
 
         # Async queue
         self.queue_size = queue_size
@@ -96,13 +129,88 @@ class AsyncPymarketcap(ClientSession):
 
                          #######   UTILS   #######
 
-    async def _get(self, url):
+    async def _get(self, url, offset=0, until=b""):
+        """Make a GET request. The first ``offset`` bytes of the
+        body are discarded as they arrive and, if ``until`` is passed,
+        the body is not read after that marker. Concurrent calls for
+        the same url are coalesced into one request."""
+        if self.cache is not None:
+            if self.offline:
+                text, refresh = self.cache.get(url, offset, until, True), False
+            else:
+                text, refresh = self.cache.lookup(url, offset, until)
+            if refresh:
+                # Stale responses are served while refreshed in background
+                self.single_flight.start((url, offset, until), self._fetch,
+                                         url, offset, until)
+            if text is not None:
+                return text
+        if self.offline:
+            raise CoinmarketcapOfflineError("Url -> %s is not cached." % url)
+        return await self.single_flight.do((url, offset, until), self._fetch,
+                                           url, offset, until)
+
+    async def _fetch(self, url, offset=0, until=b""):
+        start = time()
+        status, text = await self._request(url, offset, until)
+        if self.cache is not None and status == 200:
+            self.cache.put(url, text, offset, until, time() - start)
+        return text
+
+    async def _request(self, url, offset=0, until=b""):
+        """Returns (tuple): Status code and decoded body
+        of the response."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire(url)
+        if self.transport is not None:
+            response = await self.transport.aget(url.encode(), self.timeout,
+                                                 offset, until)
+            if self.rate_limiter is not None:
+                self.rate_limiter.feedback(
+                    url, response.status_code,
+                    response.headers.get("retry-after")
+                )
+            return (response.status_code,
+                    response.text.decode("utf-8", "ignore"))
         async with self.get(url, timeout=self.timeout) as response:
-            return await response.text()
+            if self.rate_limiter is not None:
+                self.rate_limiter.feedback(
+                    url, response.status,
+                    response.headers.get("Retry-After")
+                )
+            if not offset and not until:
+                return response.status, await response.text()
+            return response.status, (await self._read_stream(
+                response.content, offset, until
+            )).decode("utf-8", "ignore")
+
+    async def _read_stream(self, stream, offset=0, until=b"",
+                           chunk_size=65536):
+        while offset > 0:
+            chunk = await stream.read(min(offset, chunk_size))
+            if not chunk:
+                break
+            offset -= len(chunk)
+        if not until:
+            return await stream.read()
+
+        data = bytearray()
+        while True:
+            chunk = await stream.read(chunk_size)
+            if not chunk:
+                return data
+            # The marker may start at the end of previous chunk
+            search_from = max(len(data) - len(until) + 1, 0)
+            data += chunk
+            found = data.find(until, search_from)
+            if found >= 0:
+                del data[found + len(until):]
+                return data
 
     async def _async_multiget(self, itr, build_url_callback,
-                              num_of_consumers=None, desc=""):
+                              num_of_consumers=None, desc="", **get_kwargs):
         queue, dlq, responses = Queue(maxsize=self.queue_size), Queue(), []
+        errors = []
         try:
             itr_len = len(itr)
         except TypeError:
@@ -113,12 +221,14 @@ class AsyncPymarketcap(ClientSession):
 
         consumers = [
             ensure_future(
-                self._consumer(main_queue=queue, dlq=dlq, responses=responses)
+                self._consumer(main_queue=queue, dlq=dlq, responses=responses,
+                               get_kwargs=get_kwargs, errors=errors)
             )
             for _ in range(num_of_consumers or self.connector_limit)
         ]
         dlq_consumers = [
-            ensure_future(self._consumer(dlq, dlq, responses))
+            ensure_future(self._consumer(dlq, dlq, responses, get_kwargs,
+                                         errors))
             for _ in range(num_of_consumers)
         ]
         await self._producer(itr, build_url_callback, queue, desc=desc)
@@ -129,38 +239,64 @@ class AsyncPymarketcap(ClientSession):
         all_consumers.extend(dlq_consumers)
         for consumer in all_consumers:
             consumer.cancel()
+        if errors:
+            raise errors[0]
         return responses
 
     async def _producer(self, items, build_url_callback, queue, desc=""):
         for item in tqdm(items, desc=desc, disable=not self.progress_bar):
             await queue.put(await build_url_callback(item))
 
-    async def _consumer(self, main_queue, dlq, responses):
+    async def _consumer(self, main_queue, dlq, responses, get_kwargs=None,
+                        errors=None):
         while True:
             url = await main_queue.get()
             try:
-                responses.append([url, await self._get(url)])
+                responses.append([url, await self._get(url, **(get_kwargs or {}))])
             except AsyncioTimeoutError:
                 self.logger.debug("Problem with %s, Moving to DLQ" % url)
                 await dlq.put(url)
-
-            # Notify the queue that the item has been processed
-            main_queue.task_done()
+            except CoinmarketcapError as err:
+                # Raised by _async_multiget once the queues are joined
+                if errors is None:
+                    raise
+                errors.append(err)
+            finally:
+                # Notify the queue that the item has been processed
+                main_queue.task_done()
 
     # ====================================================================
 
                          #######   SCRAPER   #######
 
-    async def _base_currency_url(self, curr):
-        params = (self.sync.field_type(curr), curr)
-        response = self.sync.cryptocurrency_by_field_value(*params)
-        if not response:
-            raise ValueError(
-                "Any cryptocurrency found matching %s == %r." % params
-            )
+    def _resolve(self, identifiers=None, exchanges=False):
+        """Resolve the cryptocurrencies or exchanges passed to the
+        ``every_*`` methods at once with
+        :meth:`pymarketcap.Pymarketcap.resolve_many`.
+
+        Returns (dict): Cryptocurrencies or exchanges by slug, all
+            of them if ``identifiers`` is ``None``. An empty list also
+            selects every cryptocurrency, but no exchange, as the
+            ``every_*`` methods always did.
+        """
+        if identifiers is None or not identifiers and not exchanges:
+            records = self.sync.cryptoexchanges if exchanges \
+                else self.sync.cryptocurrencies
+        elif not identifiers:
+            records = ()
         else:
-            curr = response["website_slug"]
-        return "https://coinmarketcap.com/currencies/%s" % curr
+            response = self.sync.resolve_many(identifiers, exchanges)
+            if response["unknown"]:
+                raise ValueError("Any %s found matching %s." % (
+                    "exchange" if exchanges else "cryptocurrency",
+                    ", ".join(repr(identifier) for identifier
+                              in response["unknown"])
+                ))
+            records = response["resolved"].values()
+        return {record["website_slug"]: record for record in records}
+
+    async def _base_currency_url(self, slug):
+        return "https://coinmarketcap.com/currencies/%s" % slug
 
     async def every_currency(self, currencies=None, convert="USD",
                              consumers=None):
@@ -182,27 +318,20 @@ class AsyncPymarketcap(ClientSession):
 
         Returns (list): Data for all currencies.
         """
-        if not currencies:
-            currencies = [
-                curr["website_slug"]
-                for curr in self.sync.cryptocurrencies
-            ]
+        currencies = self._resolve(currencies)
 
         res = await self._async_multiget(
-            currencies,
+            list(currencies),
             self._base_currency_url,
             consumers if consumers else self.consumers,
             desc="Retrieving every currency data "
-                 "for %d currencies from coinmarketcap" % len(currencies)
+                 "for %d currencies from coinmarketcap" % len(currencies),
+            offset=20000
         )
         for url, raw_res in res:
             self.logger.debug("Processing data from %s" % url)
-            response = processer.currency(raw_res[20000:], convert.lower())
-            response.update(
-                self.sync.cryptocurrency_by_field_value(
-                    "website_slug", url.split("/")[-1]
-                )
-            )
+            response = processer.currency(raw_res, convert.lower())
+            response.update(currencies[url.split("/")[-1]])
             yield response
 
     async def every_markets(self, currencies=None, convert="USD",
@@ -227,45 +356,30 @@ class AsyncPymarketcap(ClientSession):
         Returns (async iterator):
                 Data for all currencies.
         """
-        if not currencies:
-            currencies = [
-                curr["website_slug"]
-                for curr in self.sync.cryptocurrencies
-            ]
+        currencies = self._resolve(currencies)
 
         res = await self._async_multiget(
-            currencies,
+            list(currencies),
             self._base_currency_url,
             consumers if consumers else self.consumers,
             desc="Retrieving all markets "
-                 "for %d currencies from coinmarketcap" % len(currencies)
+                 "for %d currencies from coinmarketcap" % len(currencies),
+            offset=20000
         )
         for url, raw_res in res:
             self.logger.debug("Processing data from %s" % url)
             response = {
-                "markets": processer.markets(raw_res[20000:], convert.lower()),
+                "markets": processer.markets(raw_res, convert.lower()),
                 "slug": url.split("/")[-1]
             }
-            response.update(
-                self.sync.cryptocurrency_by_field_value(
-                    "website_slug", url.split("/")[-1]
-                )
-            )
+            response.update(currencies[url.split("/")[-1]])
             yield response
 
-    async def _base_historical_url(self, curr):
-        params = (self.sync.field_type(curr), curr)
-        response = self.sync.cryptocurrency_by_field_value(*params)
-        if not response:
-            raise ValueError(
-                "Any cryptocurrency found matching %s == %r." % params
-            )
-        else:
-            curr = response["website_slug"]
+    async def _base_historical_url(self, slug):
         url = ("https://coinmarketcap.com/currencies"
                "/{currency}/historical-data"
                "?start={start:%Y%m%d}&end={end:%Y%m%d}")
-        return url.format(currency=curr, start=self.__start, end=self.__end)
+        return url.format(currency=slug, start=self.__start, end=self.__end)
 
     async def every_historical(self, currencies=None,
                                start=datetime(2008, 8, 18),
@@ -301,35 +415,29 @@ class AsyncPymarketcap(ClientSession):
         """
         self.__start = start
         self.__end = end
-        if not currencies:
-            currencies = [
-                curr["website_slug"]
-                for curr in self.sync.cryptocurrencies
-            ]
+        currencies = self._resolve(currencies)
 
         res = await self._async_multiget(
-            currencies,
+            list(currencies),
             self._base_historical_url,
             consumers if consumers else self.consumers,
             desc="Retrieving all historical data "
-                 "for %d currencies from coinmarketcap" % len(currencies)
+                 "for %d currencies from coinmarketcap" % len(currencies),
+            offset=50000,
+            until=b"</tbody>"
         )
         for url, raw_res in res:
             self.logger.debug("Processing data from %s" % url)
             response = {
                 "history": processer.historical(
-                    raw_res[50000:],
+                    raw_res,
                     start,
                     end,
                     revert
                 ),
                 "slug": url.split("/historical-data")[0].split("/")[-2]
             }
-            response.update(
-                self.sync.cryptocurrency_by_field_value(
-                    "website_slug", url.split("/")[-2]
-                )
-            )
+            response.update(currencies[url.split("/")[-2]])
             yield response
 
     async def _base_exchange_url(self, exc):
@@ -337,7 +445,7 @@ class AsyncPymarketcap(ClientSession):
 
     async def exchange(self, name, convert="USD"):
         convert = convert.lower()
-        res = await self._get(await self._base_exchange_url(name))[20000:]
+        res = await self._get(await self._base_exchange_url(name), 20000)
         return processer.exchange(res, convert)
 
     async def every_exchange(self, exchanges=None, convert="USD",
@@ -365,15 +473,10 @@ class AsyncPymarketcap(ClientSession):
             General data from all exchanges.
         """
         convert = convert.lower()
-
-        if exchanges is None:
-            exchanges = [
-                exc["website_slug"]
-                for exc in self.sync.cryptoexchanges
-            ]
+        exchanges = self._resolve(exchanges, exchanges=True)
 
         res = await self._async_multiget(
-            exchanges,
+            list(exchanges),
             self._base_exchange_url,
             consumers if consumers else self.consumers,
             desc="Retrieving all exchange data "
@@ -382,28 +485,15 @@ class AsyncPymarketcap(ClientSession):
         for url, raw_res in res:
             self.logger.debug("Processing data from %s" % url)
             response = processer.exchange(raw_res, convert)
-            response.update(
-                self.sync.exchange_by_field_value(
-                    "website_slug", url.split("/")[-1]
-                )
-            )
+            response.update(exchanges[url.split("/")[-1]])
             yield response
 
     # ====================================================================
 
                         #######   GRAPHS API   #######
 
-    async def _base_graphs_currency_url(self, curr, start=None, end=None):
-        params = (self.sync.field_type(curr), curr)
-        response = self.sync.cryptocurrency_by_field_value(*params)
-        if not response:
-            raise ValueError(
-                "Any cryptocurrency found matching %s == %r." % params
-            )
-        else:
-            curr = response["website_slug"]
-
-        url = "https://graphs2.coinmarketcap.com/currencies/%s" % curr
+    async def _base_graphs_currency_url(self, slug, start=None, end=None):
+        url = "https://graphs2.coinmarketcap.com/currencies/%s" % slug
 
         if type(start) is date:
             start = datetime.combine(start, DATETIME_MIN_TIME)
@@ -448,14 +538,10 @@ class AsyncPymarketcap(ClientSession):
                 end=end,
             )
 
-        if not currencies:
-            currencies = [
-                curr["website_slug"]
-                for curr in self.sync.cryptocurrencies
-            ]
+        currencies = self._resolve(currencies)
 
         res = await self._async_multiget(
-            currencies,
+            list(currencies),
             partial(self._base_graphs_currency_url, **url_kwargs),
             consumers if consumers else self.consumers,
             desc="Retrieving all graphs data for %d currencies "
@@ -465,9 +551,5 @@ class AsyncPymarketcap(ClientSession):
             self.logger.debug("Processing data from %s" % url)
             raw_res = loads(raw_res)
             response = processer.graphs(raw_res, start, end)
-            response.update(
-                self.sync.cryptocurrency_by_field_value(
-                    "website_slug", url.split("/")[4]
-                )
-            )
+            response.update(currencies[url.split("/")[4]])
             yield response
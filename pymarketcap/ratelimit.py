@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""Client side rate limiting of the requests sent to coinmarketcap."""
+
+# Standard python modules
+import asyncio
+from time import monotonic, sleep, time
+from threading import Lock
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a ``Retry-After`` header, which can be
+    a number of seconds or a HTTP date.
+
+    Args:
+        value (str): Value of the header.
+        now (float, optional): Current epoch time, used to
+            compute delays from dates. As default :func:`time.time`.
+
+    Returns (float): Seconds, or ``None`` if ``value`` is not valid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(date.timestamp() - (time() if now is None else now), 0)
+
+
+def host_of(url):
+    """Returns (str): Host of ``url``."""
+    if isinstance(url, bytes):
+        url = url.decode()
+    return urlsplit(url).hostname or ""
+
+
+class Bucket:
+    """Token bucket of a host. Requests reserve a token even if there
+    are none left, going into debt, so the delay of each request is
+    known when it's reserved and concurrent clients are spaced."""
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.max_rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = now
+        self.blocked_until = now
+
+    def reserve(self, now):
+        """Take a token and return the seconds to wait before using it."""
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        return max(wait, self.blocked_until - now)
+
+
+class RateLimiter:
+    """Token bucket rate limiter with a bucket for each host.
+
+    Before each request the clients reserve a token of the bucket of the
+    host, waiting if the bucket is empty. After it, the response status
+    is fed back: on ``429 Too Many Requests`` responses the rate of the
+    host is reduced multiplicatively and the bucket is blocked for the
+    seconds of the ``Retry-After`` header, and each successful response
+    increases it additively again up to the configured rate. So the
+    throughput stays just under the limit of the server instead of
+    oscillating around it.
+
+    The limiter is thread safe and doesn't depend on any event loop,
+    so one instance can be shared by a :class:`pymarketcap.Pymarketcap`
+    and any number of :class:`pymarketcap.AsyncPymarketcap` instances.
+
+    Args:
+        rate (float, optional): Maximum requests per second sent to
+            each host. As default ``5``.
+        burst (float, optional): Requests which can be sent at once
+            after an idle period. As default ``1``.
+        rates (dict, optional): Maximum rates by host overriding
+            ``rate``, like ``{"api.coinmarketcap.com": .5}``.
+        min_rate (float, optional): Minimum rate reached reducing it
+            on ``429`` responses. As default ``.1``.
+        decrease (float, optional): Factor applied to the rate of a
+            host on each ``429`` response. As default ``.5``.
+        increase (float, optional): Requests per second added to the
+            rate of a host on each successful response. As default ``.05``.
+        retry_after (float, optional): Seconds a host is blocked after
+            a ``429`` response without ``Retry-After`` header.
+            As default ``1``.
+        clock (callable, optional): Monotonic clock in seconds.
+            As default :func:`time.monotonic`.
+    """
+    def __init__(self, rate=5, burst=1, rates=None, min_rate=.1,
+                 decrease=.5, increase=.05, retry_after=1, clock=monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.rates = rates or {}
+        self.min_rate = min_rate
+        self.decrease = decrease
+        self.increase = increase
+        self.retry_after = retry_after
+        self.clock = clock
+        self._buckets = {}
+        self._lock = Lock()
+
+    def _bucket(self, host, now):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = Bucket(self.rates.get(host, self.rate), self.burst, now)
+            self._buckets[host] = bucket
+        return bucket
+
+    def reserve(self, url):
+        """Reserve a request to the host of ``url``.
+
+        Args:
+            url (bytes or str): Url to request.
+
+        Returns (float): Seconds to wait before sending the request.
+        """
+        host = host_of(url)
+        with self._lock:
+            now = self.clock()
+            return self._bucket(host, now).reserve(now)
+
+    def acquire(self, url):
+        """Wait until a request to the host of ``url`` can be sent."""
+        wait = self.reserve(url)
+        if wait > 0:
+            sleep(wait)
+
+    async def aacquire(self, url):
+        """Wait until a request to the host of ``url`` can be sent,
+        without blocking the event loop."""
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def feedback(self, url, status_code, retry_after=None):
+        """Adapt the rate of the host of ``url`` to a response.
+
+        Args:
+            url (bytes or str): Url requested.
+            status_code (int): Status code of the response.
+            retry_after (str, optional): Value of the ``Retry-After``
+                header of the response.
+        """
+        host = host_of(url)
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(host, now)
+            if status_code == 429:
+                if now >= bucket.blocked_until:
+                    # Requests in flight during the backoff would also
+                    # be rejected, only the first one reduces the rate
+                    bucket.rate = max(bucket.rate * self.decrease,
+                                      self.min_rate)
+                wait = parse_retry_after(retry_after)
+                if wait is None:
+                    wait = self.retry_after
+                bucket.blocked_until = max(bucket.blocked_until, now + wait)
+                bucket.tokens = min(bucket.tokens, 0)
+            elif status_code < 400:
+                bucket.rate = min(bucket.rate + self.increase,
+                                  bucket.max_rate)
+
+    def rate_of(self, url):
+        """Returns (float): Current rate of the host of ``url``."""
+        host = host_of(url)
+        with self._lock:
+            return self._bucket(host, self.clock()).rate
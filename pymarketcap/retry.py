@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""Retry policy of the requests which fail temporarily."""
+
+# Standard python modules
+import random
+from time import monotonic
+
+# Internal python modules
+from pymarketcap.errors import (
+    CoinmarketcapHTTPError,
+    CoinmarketcapHTTPError408
+)
+from pymarketcap.ratelimit import parse_retry_after
+
+
+class RetryPolicy:
+    """Policy of retries of the requests which fail temporarily:
+    transport errors, timeouts and responses with a retryable status.
+
+    Retries are spaced by a decorrelated jitter backoff: each delay
+    is a random value between ``base`` and three times the previous
+    one, capped at ``cap``, so clients which failed at the same time
+    don't retry together. If the server sends a ``Retry-After``
+    header, the delay is at least its value.
+
+    Args:
+        max_attempts (int, optional): Maximum number of attempts of
+            each request, the first one included. As default ``4``.
+        budget (float, optional): Maximum seconds spent by a call,
+            retries included. Retries which would exceed it are not
+            performed. As default ``30``.
+        base (float, optional): Minimum seconds between
+            attempts. As default ``.5``.
+        cap (float, optional): Maximum seconds between
+            attempts. As default ``10``.
+        statuses (tuple, optional): Retryable status codes.
+            As default ``(429, 500, 502, 503, 504)``.
+        seed (int, optional): Seed of the random numbers
+            generator. As default ``None``.
+        clock (callable, optional): Monotonic clock in seconds.
+            As default :func:`time.monotonic`.
+    """
+    def __init__(self, max_attempts=4, budget=30, base=.5, cap=10,
+                 statuses=(429, 500, 502, 503, 504), seed=None,
+                 clock=monotonic):
+        self.max_attempts = max_attempts
+        self.budget = budget
+        self.base = base
+        self.cap = cap
+        self.statuses = frozenset(statuses)
+        self.random = random.Random(seed)
+        self.clock = clock
+
+    def retryable(self, response):
+        """Check if a request can be retried after ``response``,
+        which can be the exception raised by the transport.
+
+        Returns (bool)
+        """
+        if isinstance(response, Exception):
+            return isinstance(response, (CoinmarketcapHTTPError,
+                                         CoinmarketcapHTTPError408))
+        return response.status_code in self.statuses
+
+    def backoff(self):
+        """Start the retries of a call.
+
+        Returns (:class:`Backoff`)
+        """
+        return Backoff(self)
+
+
+class Backoff:
+    """Retries of a call performed under a :class:`RetryPolicy`."""
+    def __init__(self, policy):
+        self.policy = policy
+        self.started = policy.clock()
+        self.attempts = 1
+        self.delay = policy.base
+
+    def next_delay(self, responses):
+        """Seconds to wait before retrying the failed requests.
+
+        Args:
+            responses (list): Responses or exceptions of the
+                failed requests.
+
+        Returns (float): Seconds, or ``None`` if none of them can
+            be retried, the attempts are exhausted or the retry
+            would exceed the budget of the call.
+        """
+        policy = self.policy
+        if self.attempts >= policy.max_attempts or \
+                not any(policy.retryable(res) for res in responses):
+            return None
+        self.delay = min(policy.cap, policy.random.uniform(policy.base,
+                                                           self.delay * 3))
+        delay = self.delay
+        for res in responses:
+            if not isinstance(res, Exception):
+                retry_after = parse_retry_after(
+                    res.headers.get("retry-after")
+                )
+                if retry_after is not None and retry_after > delay:
+                    delay = retry_after
+        if policy.clock() - self.started + delay > policy.budget:
+            return None
+        self.attempts += 1
+        return delay
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Coalescing of concurrent identical requests: callers of a key
+which is already being fetched wait for that fetch and share its
+result instead of sending their own request."""
+
+# Standard python modules
+import asyncio
+from functools import partial
+from threading import Event, Lock, Thread
+
+
+class Flight:
+    """Fetch in progress of a key."""
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Group of fetches of :class:`pymarketcap.Pymarketcap`,
+    safe to call from several threads.
+
+    Attributes:
+        stats (dict): Counters of ``"requests"`` performed and
+            ``"coalesced"`` calls which shared one of them.
+    """
+    def __init__(self):
+        self._flights = {}
+        self._lock = Lock()
+        self.stats = {"requests": 0, "coalesced": 0}
+
+    def do(self, key, func, *args):
+        """Call ``func(*args)``, unless another thread is already
+        doing it for ``key``, in which case its result is awaited.
+
+        Returns: Result of the call, raising its exception if failed.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+                self.stats["requests"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+        else:
+            self._run(key, flight, func, args)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def start(self, key, func, *args):
+        """Call ``func(*args)`` in a new thread, unless it's
+        already being done for ``key``. Its errors are discarded.
+
+        Returns (bool): If the call was started.
+        """
+        with self._lock:
+            if key in self._flights:
+                return False
+            flight = self._flights[key] = Flight()
+            self.stats["requests"] += 1
+        Thread(target=self._run, args=(key, flight, func, args),
+               daemon=True).start()
+        return True
+
+    def _run(self, key, flight, func, args):
+        try:
+            flight.result = func(*args)
+        except Exception as err:
+            flight.error = err
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class AsyncSingleFlight:
+    """Group of fetches of :class:`pymarketcap.AsyncPymarketcap`,
+    shared by the coroutines of an event loop.
+
+    Attributes:
+        stats (dict): Counters of ``"requests"`` performed and
+            ``"coalesced"`` calls which shared one of them.
+    """
+    def __init__(self):
+        self._flights = {}
+        self.stats = {"requests": 0, "coalesced": 0}
+
+    async def do(self, key, func, *args):
+        """Await ``func(*args)``, unless another coroutine is already
+        doing it for ``key``, in which case its result is awaited.
+
+        Returns: Result of the call, raising its exception if failed.
+        """
+        future = self._flights.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            # Cancelling a follower doesn't cancel the shared fetch
+            return await asyncio.shield(future)
+
+        future = self._start(key, func, args)
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                del self._flights[key]
+            else:
+                future.add_done_callback(
+                    lambda _: self._flights.pop(key, None)
+                )
+
+    def start(self, key, func, *args):
+        """Schedule ``func(*args)`` in a new task, unless it's
+        already being done for ``key``. Its errors are discarded.
+
+        Returns (bool): If the call was started.
+        """
+        if key in self._flights:
+            return False
+        future = self._start(key, func, args)
+        future.add_done_callback(partial(self._discard, key))
+        return True
+
+    def _start(self, key, func, args):
+        future = self._flights[key] = asyncio.ensure_future(func(*args))
+        self.stats["requests"] += 1
+        return future
+
+    def _discard(self, key, future):
+        self._flights.pop(key, None)
+        if not future.cancelled():
+            future.exception()   # Retrieved, so it's not logged
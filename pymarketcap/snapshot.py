@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""Snapshot of the metadata of coinmarketcap cached by
+:class:`pymarketcap.Pymarketcap` (cryptocurrencies, exchanges and
+currencies to convert), persisted so new processes don't have to
+download it before resolving their first identifier."""
+
+# Standard python modules
+import os
+import json
+import zlib
+from threading import Lock, get_ident
+
+#: bytes: Signature at the beginning of snapshot files.
+MAGIC = b"PYMSNAP1"
+
+
+class Snapshot:
+    """Single file with values and the time they were computed, stored
+    as compressed JSON. It's written atomically, so processes sharing
+    it always read a complete snapshot.
+
+    Args:
+        path (str): File of the snapshot.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+
+    def load(self):
+        """Read the values of the snapshot.
+
+        Returns (dict): Time they were computed and value, by name.
+            Empty if the file doesn't exist or is not valid.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return {}
+        if not data.startswith(MAGIC):
+            return {}
+        try:
+            values = json.loads(zlib.decompress(data[len(MAGIC):]).decode())
+        except (zlib.error, ValueError):
+            return {}
+        return {name: tuple(entry) for name, entry in values.items()}
+
+    def save(self, values):
+        """Write the values to the snapshot, replacing it.
+
+        Args:
+            values (dict): Time they were computed and value, by name.
+        """
+        data = MAGIC + zlib.compress(json.dumps(
+            {name: list(entry) for name, entry in values.items()},
+            separators=(",", ":")
+        ).encode())
+        tmp_path = "%s.%d.%d.tmp" % (self.path, os.getpid(), get_ident())
+        with self._lock:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
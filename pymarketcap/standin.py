@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+
+"""Local stand-in of coinmarketcap.com for load tests, serving
+responses recorded in a :class:`pymarketcap.cassette.Cassette`
+from an :mod:`asyncio` HTTP server.
+
+Clients are pointed at the server through the transport returned
+by :meth:`StandinServer.transport`, which rewrites
+``https://<host>/<path>`` urls as ``http://127.0.0.1:<port>/<host>/<path>``::
+
+    with StandinServer("responses.cassette", latency=.05) as server:
+        cmc = Pymarketcap(transport=server.transport())
+        cmc.ticker()
+"""
+
+# Standard python modules
+import re
+import ssl
+import random
+import asyncio
+import threading
+import multiprocessing
+from time import monotonic
+
+# Internal python modules
+from pymarketcap.cassette import Cassette
+
+try:
+    all_tasks = asyncio.all_tasks
+except AttributeError:   # Python < 3.7
+    all_tasks = asyncio.Task.all_tasks
+
+#: list: Patterns of the urls requested by pymarketcap whose variable
+#: parts (slugs, ids, timestamps and queries) are replaced to find a
+#: recorded response to serve for urls which were not recorded.
+URL_PATTERNS = [
+    (re.compile(r"^(https?://coinmarketcap\.com/(?:currencies|exchanges))"
+                r"/[^/?#]+"), r"\1/{slug}"),
+    (re.compile(r"^(https?://graphs2\.coinmarketcap\.com/currencies)/[^/]+"),
+     r"\1/{slug}"),
+    (re.compile(r"/\d{9,}/\d{9,}/?$"), "/{start}/{end}/"),
+    (re.compile(r"^(https?://api\.coinmarketcap\.com/v2/ticker)/\d+"),
+     r"\1/{id}"),
+    (re.compile(r"\?.*$"), "?{query}"),
+]
+
+STATUS_REASONS = {
+    200: "OK", 304: "Not Modified", 404: "Not Found",
+    429: "Too Many Requests", 500: "Internal Server Error",
+}
+
+
+def url_pattern(url):
+    """Pattern of ``url``, shared by the urls of the same page type.
+
+    Args:
+        url (str): Url requested.
+
+    Returns (str): Like ``"https://coinmarketcap.com/currencies/{slug}/"``.
+    """
+    for regex, replacement in URL_PATTERNS:
+        url = regex.sub(replacement, url)
+    return url
+
+
+class StandinServer:
+    """HTTP server which serves recorded responses with injected
+    latency, errors, rate limiting and bandwidth caps. It runs its
+    own event loop in a thread, so it can be used by synchronous and
+    asynchronous clients.
+
+    Requests for urls which were not recorded are served with a
+    response recorded for another url of the same pattern (see
+    :func:`url_pattern`), so crawls over every currency can be
+    simulated recording only one page of each type.
+
+    Args:
+        cassette (str or :class:`pymarketcap.cassette.Cassette`,
+            optional): Recorded responses, or the path of the archive.
+        responses (dict, optional): Additional bodies as bytes by url,
+            served with status ``200``.
+        default (bytes, optional): Body served with status ``200`` for
+            urls without any response of their pattern, instead of
+            ``404 Not Found``. As default ``None``.
+        latency (float or callable, optional): Seconds waited before
+            responding each request, or a function which receives a
+            :class:`random.Random` instance and returns them, like
+            ``lambda rnd: rnd.lognormvariate(-3, .5)``. As default ``0``.
+        error_rate (float, optional): Probability of responding
+            ``500 Internal Server Error``. As default ``0``.
+        too_many_requests_rate (float, optional): Probability of
+            responding ``429 Too Many Requests``. As default ``0``.
+        retry_after (int, optional): Seconds sent in the
+            ``Retry-After`` header of ``429`` responses. As default ``1``.
+        bandwidth (int, optional): Maximum bytes per second sent
+            for each response, or ``0`` for no cap. As default ``0``.
+        seed (int, optional): Seed of the random numbers generator,
+            for reproducible runs. As default ``None``.
+        host (str, optional): Address to listen on.
+            As default ``"127.0.0.1"``.
+        port (int, optional): Port to listen on, or ``0`` for
+            a free one. As default ``0``.
+        certfile (str, optional): Certificate served, to listen for
+            HTTPS instead of HTTP. As default ``None``.
+        keyfile (str, optional): Private key of ``certfile``, if it's
+            not included in it. As default ``None``.
+    """
+    def __init__(self, cassette=None, responses=None, default=None,
+                 latency=0, error_rate=0, too_many_requests_rate=0,
+                 retry_after=1, bandwidth=0, seed=None, host="127.0.0.1",
+                 port=0, certfile=None, keyfile=None):
+        if cassette is not None and not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette)
+        self.cassette = cassette
+        self.responses = {}
+        for url, body in (responses or {}).items():
+            self.record(url, body)
+        self.default = default
+        self.latency = latency
+        self.error_rate = error_rate
+        self.too_many_requests_rate = too_many_requests_rate
+        self.retry_after = retry_after
+        self.bandwidth = bandwidth
+        self.random = random.Random(seed)
+        self.host = host
+        self.port = port
+        self.certfile = certfile
+        self.keyfile = keyfile
+
+        #: dict: Counters of requests served, by status code.
+        self.stats = {}
+        self._patterns = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def url(self):
+        """str: Base url of the server."""
+        return "%s://%s:%d/" % ("http" if self.certfile is None else "https",
+                                self.host, self.port)
+
+    def record(self, url, body, status_code=200, headers=None):
+        """Store the response served for ``url``.
+
+        Args:
+            url (bytes): Url of the response.
+            body (bytes): Body of the response.
+            status_code (int, optional): As default ``200``.
+            headers (dict, optional): Headers of the response.
+        """
+        self.responses[url] = (status_code, headers or {}, body)
+        self._patterns = {}
+
+    def transport(self, transport=None, session=None):
+        """Transport which sends the requests to this server.
+
+        Args:
+            transport (str or :class:`pymarketcap.transport.Transport`,
+                optional): Backend which performs the requests.
+            session (object, optional): Session of the backend.
+
+        Returns (:class:`pymarketcap.transport.RewriteTransport`)
+        """
+        from pymarketcap.transport import RewriteTransport
+        return RewriteTransport(self.url, transport, session)
+
+    # ====================================================================
+
+    def _urls(self):
+        urls = set(self.responses)
+        if self.cassette is not None:
+            urls |= self.cassette.urls()
+        return urls
+
+    def lookup(self, url):
+        """Find the response served for ``url``.
+
+        Args:
+            url (bytes): Url requested.
+
+        Returns (tuple): Status code, headers and body.
+        """
+        if url not in self.responses and (
+                self.cassette is None or url not in self.cassette):
+            if not self._patterns:
+                for recorded in sorted(self._urls()):
+                    self._patterns.setdefault(
+                        url_pattern(recorded.decode("latin-1")), recorded
+                    )
+            url = self._patterns.get(url_pattern(url.decode("latin-1")))
+            if url is None:
+                if self.default is not None:
+                    return 200, {}, self.default
+                return 404, {}, b""
+        if url in self.responses:
+            return self.responses[url]
+        return self.cassette.get(url)
+
+    def _delay(self):
+        if callable(self.latency):
+            return max(self.latency(self.random), 0)
+        return self.latency
+
+    def _respond(self, target, headers):
+        if target.startswith("http://") or target.startswith("https://"):
+            url = target
+        else:
+            # ``/<host>/<path>`` as rewritten by the transport
+            url = "https://" + target.lstrip("/")
+        rnd = self.random.random()
+        if rnd < self.too_many_requests_rate:
+            return 429, {"Retry-After": str(self.retry_after)}, b""
+        if rnd < self.too_many_requests_rate + self.error_rate:
+            return 500, {}, b""
+
+        status_code, recorded_headers, body = self.lookup(
+            url.encode("latin-1")
+        )
+        response_headers = {name: value for name, value
+                            in recorded_headers.items()
+                            if name.lower() not in (
+                                "content-length", "content-encoding",
+                                "transfer-encoding", "connection")}
+        etag = recorded_headers.get("etag")
+        if etag and headers.get("if-none-match") == etag:
+            return 304, response_headers, b""
+        return status_code, response_headers, body
+
+    async def _send(self, writer, body):
+        if not self.bandwidth:
+            writer.write(body)
+            await writer.drain()
+            return
+        # Chunks of a tenth of second of bandwidth
+        chunk_size = max(self.bandwidth // 10, 1)
+        start = monotonic()
+        for sent in range(0, len(body), chunk_size):
+            chunk = body[sent:sent + chunk_size]
+            # Each chunk is sent once the time it takes at most passed
+            wait = (sent + len(chunk)) / self.bandwidth - (monotonic() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            writer.write(chunk)
+            await writer.drain()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                delay = self._delay()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                status_code, response_headers, body = self._respond(target,
+                                                                    headers)
+                self.stats[status_code] = self.stats.get(status_code, 0) + 1
+                if method == "HEAD":
+                    body = b""
+
+                lines = ["HTTP/1.1 %d %s" % (status_code, STATUS_REASONS.get(
+                    status_code, "Unknown"))]
+                for name, value in response_headers.items():
+                    lines.append("%s: %s" % (name, value))
+                lines.append("Content-Length: %d" % len(body))
+                lines.append("\r\n")
+                writer.write("\r\n".join(lines).encode("latin-1"))
+                await self._send(writer, body)
+
+                if headers.get("connection", "").lower() == "close" \
+                        or version == "HTTP/1.0":
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Connection kept alive by a client when the server stops.
+            # Finishing without the exception keeps asyncio from
+            # reporting it, as it does since Python 3.8
+            pass
+        finally:
+            writer.close()
+
+    # ====================================================================
+
+    def start(self):
+        """Start the server in a new thread with its own event loop."""
+        started = threading.Event()
+        context = None
+        if self.certfile is not None:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.certfile, self.keyfile)
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port,
+                                     ssl=context, backlog=1024)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            # Cancel the handlers of connections kept alive by clients
+            tasks = all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self):
+        """Stop the server and wait for its thread to finish."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+
+def _serve(args, kwargs, urls, stopped):
+    server = StandinServer(*args, **kwargs)
+    server.start()
+    urls.put(server.url)
+    stopped.wait()
+    server.stop()
+
+
+class StandinProcess:
+    """:class:`StandinServer` run in a child process, so the clients
+    measured by benchmarks don't compete with it for the GIL. Receives
+    the arguments of :class:`StandinServer`, which must be picklable.
+    """
+    def __init__(self, *args, **kwargs):
+        #: str: Base url of the server, once started.
+        self.url = None
+        self._urls = multiprocessing.Queue()
+        self._stopped = multiprocessing.Event()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(args, kwargs, self._urls, self._stopped),
+            daemon=True
+        )
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """Start the server in a new process."""
+        self._process.start()
+        self.url = self._urls.get(timeout=10)
+
+    def stop(self):
+        """Stop the server and wait for its process to finish."""
+        self._stopped.set()
+        self._process.join()
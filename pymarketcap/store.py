@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""Compressed store of responses on disk used by
+:class:`pymarketcap.cache.ResponseCache`."""
+
+# Standard python modules
+import os
+import re
+import lzma
+import mmap
+import zlib
+import math
+import struct
+from collections import OrderedDict
+
+try:
+    import zstandard
+except ImportError:   # Optional dependency
+    zstandard = None
+
+#: dict: Identifiers of the compression codecs stored in the records.
+CODECS = {"zlib": 1, "lzma": 2, "zstd": 3}
+
+#: Header of each record: signature, codec, length of the key, length
+#: of the body, expiration time (``NaN`` if it never expires) and
+#: seconds taken to fetch it.
+HEADER = struct.Struct(">4sBHIdd")
+MAGIC = b"PYMR"
+SEGMENT_NAME = re.compile(r"^(\d{6})\.seg$")
+
+
+def compress(data, codec):
+    """Returns (bytes): ``data`` compressed with ``codec``."""
+    if codec == CODECS["zlib"]:
+        return zlib.compress(data)
+    if codec == CODECS["lzma"]:
+        return lzma.compress(data)
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def decompress(data, codec):
+    """Returns (bytes): ``data`` decompressed with ``codec``."""
+    if codec == CODECS["zlib"]:
+        return zlib.decompress(data)
+    if codec == CODECS["lzma"]:
+        return lzma.decompress(data)
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+class SegmentStore:
+    """Responses stored on disk, compressed, in append-only segment
+    files. Records are appended to the last segment until it grows
+    over ``segment_bytes``, then a new one is started, and the oldest
+    segments are removed when the store exceeds ``max_bytes``.
+
+    Only an index of the keys, with the position of their records,
+    is kept in memory: it's rebuilt on startup reading the headers of
+    the records, and bodies are read through memory maps of the
+    segments. Records truncated by an interrupted write are discarded.
+
+    Args:
+        path (str): Directory of the segments, created if needed.
+        max_bytes (int, optional): Maximum size of the
+            segments. As default 256 MiB.
+        segment_bytes (int, optional): Size from which a new segment
+            is started. As default an eighth of ``max_bytes``, up to
+            64 MiB.
+        compression (str, optional): Codec of the bodies: ``"zlib"``,
+            ``"lzma"`` or ``"zstd"`` (requires :mod:`zstandard`).
+            As default ``"zstd"`` if it's installed, ``"zlib"`` otherwise.
+    """
+    def __init__(self, path, max_bytes=256 * 1024 ** 2, segment_bytes=None,
+                 compression=None):
+        if compression is None:
+            compression = "zstd" if zstandard is not None else "zlib"
+        if compression not in CODECS:
+            raise ValueError(
+                "Compression %r not found. Valid compressions are: %s." % (
+                    compression, ", ".join(sorted(CODECS)))
+            )
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires zstandard module.")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes or min(max_bytes // 8,
+                                                  64 * 1024 ** 2)
+        self.codec = CODECS[compression]
+        self.size = 0
+
+        # Key -> segment, offset and length of the body, codec,
+        # expiration time and seconds taken to fetch it
+        self._index = {}
+        self._segments = OrderedDict()   # Number -> size
+        self._maps = {}
+        self._file = None
+        os.makedirs(path, exist_ok=True)
+        numbers = sorted(int(match.group(1)) for match in (
+            SEGMENT_NAME.match(name) for name in os.listdir(path)
+        ) if match)
+        for number in numbers:
+            self._scan(number)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def _segment_path(self, number):
+        return os.path.join(self.path, "%06d.seg" % number)
+
+    def _scan(self, number):
+        path = self._segment_path(number)
+        size = os.path.getsize(path)
+        position = 0
+        if size:
+            with open(path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while position + HEADER.size <= size:
+                    magic, codec, key_length, length, expires, delta = \
+                        HEADER.unpack_from(data, position)
+                    start = position + HEADER.size + key_length
+                    if magic != MAGIC or start + length > size:
+                        break
+                    key = data[position + HEADER.size:start]
+                    self._index[key] = (number, start, length, codec,
+                                        None if math.isnan(expires)
+                                        else expires, delta)
+                    position = start + length
+        if position < size:
+            with open(path, "r+b") as f:
+                f.truncate(position)
+        self._segments[number] = position
+        self.size += position
+
+    def _map(self, number, end):
+        data = self._maps.get(number)
+        if data is None or len(data) < end:
+            if data is not None:
+                data.close()
+            with open(self._segment_path(number), "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[number] = data
+        return data
+
+    def get(self, key):
+        """Read a stored response.
+
+        Args:
+            key (bytes): Key of the response.
+
+        Returns (tuple): Expiration time, or ``None`` if it never
+            expires, seconds taken to fetch it and decoded body,
+            or ``None`` if not stored.
+        """
+        try:
+            number, start, length, codec, expires, delta = self._index[key]
+        except KeyError:
+            return None
+        data = self._map(number, start + length)[start:start + length]
+        return expires, delta, decompress(data, codec).decode()
+
+    def put(self, key, expires, delta, text):
+        """Append a response to the last segment.
+
+        Args:
+            key (bytes): Key of the response.
+            expires (float): Expiration time, or ``None``
+                if it never expires.
+            delta (float): Seconds taken to fetch it.
+            text (str): Decoded body.
+        """
+        body = compress(text.encode(), self.codec)
+        header = HEADER.pack(MAGIC, self.codec, len(key), len(body),
+                             float("nan") if expires is None else expires,
+                             delta)
+        if self._file is None or \
+                self._segments[self._active] >= self.segment_bytes:
+            self._roll()
+        number = self._active
+        start = self._segments[number] + len(header) + len(key)
+        self._file.write(header + key + body)
+        self._file.flush()
+        self._index[key] = (number, start, len(body), self.codec,
+                            expires, delta)
+        written = len(header) + len(key) + len(body)
+        self._segments[number] += written
+        self.size += written
+
+        while self.size > self.max_bytes and len(self._segments) > 1:
+            self._remove(next(iter(self._segments)))
+
+    def _roll(self):
+        if self._file is not None:
+            self._file.close()
+        self._active = next(reversed(self._segments), 0) + 1
+        self._segments[self._active] = 0
+        self._file = open(self._segment_path(self._active), "ab")
+
+    def _remove(self, number):
+        data = self._maps.pop(number, None)
+        if data is not None:
+            data.close()
+        self.size -= self._segments.pop(number)
+        self._index = {key: entry for key, entry in self._index.items()
+                       if entry[0] != number}
+        try:
+            os.remove(self._segment_path(number))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every response stored."""
+        self.close()
+        for number in list(self._segments):
+            self._remove(number)
+
+    def close(self):
+        """Close the segments. They are opened again when needed."""
+        for data in self._maps.values():
+            data.close()
+        self._maps.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
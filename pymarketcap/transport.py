@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+
+"""Transport backends which perform the HTTP requests of
+:class:`pymarketcap.Pymarketcap`, selected at runtime with its
+``transport`` parameter."""
+
+# Standard python modules
+import asyncio
+from io import BytesIO
+from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+
+# Internal python modules
+from pymarketcap import url as urllib_backend
+from pymarketcap.cassette import Cassette
+from pymarketcap.errors import CoinmarketcapError
+
+try:
+    from pymarketcap import curl
+except ImportError:   # Installed with ``--no-curl``
+    curl = None
+
+
+class Transport:
+    """Interface of transport backends.
+
+    Args:
+        session (object, optional): Pool of connections reused
+            between requests by the backend.
+    """
+    name = None
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def __repr__(self):
+        return "<%s transport>" % self.name
+
+    def get(self, url, timeout, debug, proxy_addr,
+            offset=0, until=b"", headers=None):
+        """Send a GET request.
+
+        Args:
+            url (bytes): Url to request.
+            timeout (int): Number of seconds until
+                expiration time cancels the request.
+            debug (bool): Print low level data of the request.
+            proxy_addr (bytes): Proxy to use, or ``b""`` for none.
+            offset (int, optional): Number of bytes at the beginning of
+                the body discarded as they arrive. As default ``0``.
+            until (bytes, optional): If passed, the body ends after
+                this marker. As default ``b""``.
+            headers (list, optional): Extra request headers as bytes.
+                As default ``None``.
+
+        Returns: A response with ``status_code``, ``headers``,
+            ``timings`` and ``decode()`` members, like
+            :class:`pymarketcap.url.Response`.
+        """
+        raise NotImplementedError
+
+    def get_many(self, urls, timeout, debug, proxy_addr,
+                 max_parallel=8, offset=0, until=b"", rate_limiter=None):
+        """Send several GET requests. As default they are
+        sent one after another.
+
+        Args:
+            urls (list): Urls to request, as bytes.
+            max_parallel (int, optional): Maximum number of
+                simultaneous requests. As default ``8``.
+            rate_limiter (:class:`pymarketcap.ratelimit.RateLimiter`,
+                optional): Limiter whose token is reserved just before
+                each transfer starts, and which is fed back each
+                response as it completes. As default ``None``.
+
+        Returns (list): A response for each url in the same order,
+            or the exception raised requesting it.
+        """
+        responses = []
+        for url in urls:
+            if rate_limiter is not None:
+                rate_limiter.acquire(url)
+            try:
+                response = self.get(url, timeout, debug, proxy_addr,
+                                    offset, until)
+            except CoinmarketcapError as err:
+                response = err
+            else:
+                feedback(rate_limiter, url, response)
+            responses.append(response)
+        return responses
+
+    async def aget(self, url, timeout, offset=0, until=b""):
+        """Send a GET request from a coroutine, used by
+        :class:`pymarketcap.AsyncPymarketcap`. As default the
+        blocking :meth:`get` is run in the executor of the loop.
+
+        Returns: A response like those returned by :meth:`get`.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self.get, url, timeout, False, b"", offset, until
+        )
+
+
+def feedback(rate_limiter, url, response):
+    """Adapt ``rate_limiter``, if any, to the response of ``url``."""
+    if rate_limiter is not None and not isinstance(response, Exception):
+        rate_limiter.feedback(url, response.status_code,
+                              response.headers.get("retry-after"))
+
+
+class CurlTransport(Transport):
+    """Requests performed by libcurl, reusing the handles
+    of a :class:`pymarketcap.curl.Session`."""
+    name = "curl"
+
+    def __init__(self, session=None):
+        if curl is None:
+            raise ImportError(
+                "pymarketcap was installed without curl support."
+            )
+        super().__init__(session if session is not None else curl.Session())
+
+    def get(self, url, timeout, debug, proxy_addr,
+            offset=0, until=b"", headers=None):
+        return curl.get_to_memory(url, timeout, debug, proxy_addr,
+                                  self.session, offset, until, headers)
+
+
+class CurlMultiTransport(CurlTransport):
+    """Like :class:`CurlTransport`, but several requests are
+    performed in parallel through the libcurl multi interface."""
+    name = "curl-multi"
+
+    def get_many(self, urls, timeout, debug, proxy_addr,
+                 max_parallel=8, offset=0, until=b"", rate_limiter=None):
+        return curl.get_many_to_memory(urls, timeout, debug, proxy_addr,
+                                       max_parallel, self.session,
+                                       offset, until, rate_limiter)
+
+
+class UrllibTransport(Transport):
+    """Requests performed by the standard library, several
+    of them in parallel by a pool of threads."""
+    name = "urllib"
+
+    def __init__(self, session=None):
+        if session is None:
+            session = urllib_backend.Session()
+        super().__init__(session)
+
+    def get(self, url, timeout, debug, proxy_addr,
+            offset=0, until=b"", headers=None):
+        return urllib_backend.get_to_memory(url, timeout, debug, proxy_addr,
+                                            self.session, offset, until,
+                                            headers)
+
+    def get_many(self, urls, timeout, debug, proxy_addr,
+                 max_parallel=8, offset=0, until=b"", rate_limiter=None):
+        return urllib_backend.get_many_to_memory(urls, timeout, debug,
+                                                 proxy_addr, max_parallel,
+                                                 self.session, offset, until,
+                                                 rate_limiter)
+
+
+def slice_body(body, offset=0, until=b""):
+    """Apply the ``offset`` and ``until`` parameters of a request
+    to a full body, like the transfers of the network backends.
+
+    Returns (tuple): Body sliced and if it was stopped by the marker.
+    """
+    return urllib_backend.read_stream(BytesIO(body), offset, until)
+
+
+class RecordingTransport(Transport):
+    """Requests performed by another transport whose responses are
+    recorded in a :class:`pymarketcap.cassette.Cassette`, to be served
+    later by :class:`ReplayTransport`. Full bodies are always requested
+    and recorded, so they can be replayed with any ``offset``.
+
+    Args:
+        cassette (str or :class:`pymarketcap.cassette.Cassette`): Archive
+            where responses are recorded, or its path.
+        transport (str or :class:`Transport`, optional): Backend which
+            performs the requests. As default the same of
+            :func:`get_transport`.
+        session (object, optional): Session of the backend.
+    """
+    name = "record"
+
+    def __init__(self, cassette=None, transport=None, session=None):
+        self.transport = get_transport(transport, session)
+        super().__init__(self.transport.session)
+        if not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette)
+        self.cassette = cassette
+
+    def _record(self, url, response, offset, until, debug=False):
+        if isinstance(response, Exception):
+            return response
+        body = bytes(response.body)
+        self.cassette.add(url, response.status_code,
+                          response.headers, body)
+        data, stopped = slice_body(body, offset, until)
+        if debug:
+            print(data)
+        res = urllib_backend.Response(data, response.status_code, url,
+                                      stopped, response.headers)
+        for key, value in response.timings.items():
+            setattr(res, key, value)
+        return res
+
+    def get(self, url, timeout, debug, proxy_addr,
+            offset=0, until=b"", headers=None):
+        response = self.transport.get(url, timeout, False, proxy_addr,
+                                      0, b"", headers)
+        return self._record(url, response, offset, until, debug)
+
+    def get_many(self, urls, timeout, debug, proxy_addr,
+                 max_parallel=8, offset=0, until=b"", rate_limiter=None):
+        responses = self.transport.get_many(urls, timeout, False,
+                                            proxy_addr, max_parallel,
+                                            rate_limiter=rate_limiter)
+        return [self._record(url, response, offset, until, debug)
+                for url, response in zip(urls, responses)]
+
+    def save(self, path=None):
+        """Write the responses recorded to the cassette file.
+
+        Args:
+            path (str, optional): File to write. As default
+                the path of the cassette.
+        """
+        self.cassette.save(path)
+
+
+class ReplayTransport(Transport):
+    """Responses served from memory or from a cassette recorded by
+    :class:`RecordingTransport`, without touching the network, for
+    tests and benchmarks. Urls not recorded respond ``404``.
+
+    Args:
+        responses (dict, optional): Bodies as bytes by url.
+        session (object, optional): Ignored, the transport
+            doesn't open connections.
+        cassette (str or :class:`pymarketcap.cassette.Cassette`,
+            optional): Archive of recorded responses, or its path.
+        latency (float or callable, optional): Seconds waited before
+            serving each response, or a function without arguments
+            which returns them, like ``lambda: random.expovariate(20)``.
+            As default ``0``.
+    """
+    name = "replay"
+
+    def __init__(self, responses=None, session=None,
+                 cassette=None, latency=0):
+        if session is None:
+            session = urllib_backend.Session()
+        super().__init__(session)
+        if cassette is not None and not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette)
+        self.cassette = cassette
+        self.latency = latency
+        self.responses = {}
+        for url, body in (responses or {}).items():
+            self.record(url, body)
+
+    def record(self, url, body, status_code=200, headers=None):
+        """Store the response returned for ``url``.
+
+        Args:
+            url (bytes): Url of the response.
+            body (bytes): Body of the response.
+            status_code (int, optional): As default ``200``.
+            headers (dict, optional): Headers of the response.
+        """
+        self.responses[url] = (status_code, headers, body)
+
+    def delay(self):
+        """Returns (float): Seconds of latency of the next response."""
+        return self.latency() if callable(self.latency) else self.latency
+
+    def response(self, url, offset=0, until=b"", debug=False):
+        """Build the response replayed for ``url``.
+
+        Returns (:class:`pymarketcap.url.Response`)
+        """
+        try:
+            status_code, headers, body = self.responses[url]
+        except KeyError:
+            if self.cassette is None or url not in self.cassette:
+                return urllib_backend.Response(b"", 404, url)
+            status_code, headers, body = self.cassette.get(url)
+        data, stopped = slice_body(body, offset, until)
+        if debug:
+            print(data)
+        response = urllib_backend.Response(data, status_code, url,
+                                           stopped, headers)
+        response.size_download = len(body)
+        return response
+
+    def get(self, url, timeout, debug, proxy_addr,
+            offset=0, until=b"", headers=None):
+        delay = self.delay()
+        if delay > 0:
+            sleep(delay)
+        response = self.response(url, offset, until, debug)
+        response.starttransfer_time = response.total_time = delay
+        return response
+
+    def get_many(self, urls, timeout, debug, proxy_addr,
+                 max_parallel=8, offset=0, until=b"", rate_limiter=None):
+        if not self.latency or not urls:
+            return super().get_many(urls, timeout, debug, proxy_addr,
+                                    max_parallel, offset, until,
+                                    rate_limiter)
+
+        def fetch(url):
+            if rate_limiter is not None:
+                rate_limiter.acquire(url)
+            response = self.get(url, timeout, debug, proxy_addr,
+                                offset, until)
+            feedback(rate_limiter, url, response)
+            return response
+
+        # Latencies of parallel requests overlap
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            return list(executor.map(fetch, urls))
+
+    async def aget(self, url, timeout, offset=0, until=b""):
+        delay = self.delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        response = self.response(url, offset, until)
+        response.starttransfer_time = response.total_time = delay
+        return response
+
+
+class RewriteTransport(Transport):
+    """Requests performed by another transport against a different
+    server, like :class:`pymarketcap.standin.StandinServer`: urls like
+    ``https://<host>/<path>`` are requested as ``<prefix><host>/<path>``.
+
+    Args:
+        prefix (str): Base url of the server, like
+            ``"http://127.0.0.1:8080/"``.
+        transport (str or :class:`Transport`, optional): Backend which
+            performs the requests. As default the same of
+            :func:`get_transport`.
+        session (object, optional): Session of the backend.
+    """
+    name = "rewrite"
+
+    def __init__(self, prefix, transport=None, session=None):
+        self.transport = get_transport(transport, session)
+        super().__init__(self.transport.session)
+        self.prefix = prefix.encode() if isinstance(prefix, str) else prefix
+
+    def rewrite(self, url):
+        """Returns (bytes): Url requested instead of ``url``."""
+        return self.prefix + url.split(b"://", 1)[-1]
+
+    def get(self, url, timeout, debug, proxy_addr,
+            offset=0, until=b"", headers=None):
+        return self.transport.get(self.rewrite(url), timeout, debug,
+                                  proxy_addr, offset, until, headers)
+
+    def get_many(self, urls, timeout, debug, proxy_addr,
+                 max_parallel=8, offset=0, until=b"", rate_limiter=None):
+        rewritten = [self.rewrite(url) for url in urls]
+        if rate_limiter is not None:
+            rate_limiter = RewrittenRateLimiter(rate_limiter,
+                                                dict(zip(rewritten, urls)))
+        return self.transport.get_many(rewritten, timeout, debug, proxy_addr,
+                                       max_parallel, offset, until,
+                                       rate_limiter)
+
+    async def aget(self, url, timeout, offset=0, until=b""):
+        return await self.transport.aget(self.rewrite(url), timeout,
+                                         offset, until)
+
+
+class RewrittenRateLimiter:
+    """Rate limiter of the requests of a :class:`RewriteTransport`,
+    which paces them by the urls they had before being rewritten."""
+    def __init__(self, rate_limiter, originals):
+        self.rate_limiter = rate_limiter
+        self.originals = originals
+
+    def reserve(self, url):
+        return self.rate_limiter.reserve(self.originals[url])
+
+    def acquire(self, url):
+        self.rate_limiter.acquire(self.originals[url])
+
+    def feedback(self, url, status_code, retry_after=None):
+        self.rate_limiter.feedback(self.originals[url], status_code,
+                                   retry_after)
+
+
+#: dict: Transport classes by name.
+TRANSPORTS = {
+    transport.name: transport for transport in (
+        CurlTransport, CurlMultiTransport, UrllibTransport, ReplayTransport
+    )
+}
+
+
+def get_transport(transport=None, session=None):
+    """Build the transport used by a :class:`pymarketcap.Pymarketcap`
+    instance.
+
+    Args:
+        transport (str or :class:`Transport`, optional): Name of the
+            backend (``"curl"``, ``"curl-multi"``, ``"urllib"`` or
+            ``"replay"``) or an instance, returned as is. As default
+            ``"curl-multi"`` if pymarketcap was installed with curl
+            support and ``"urllib"`` otherwise. Recording transports
+            need the file of their cassette, so they are passed as
+            :class:`RecordingTransport` instances.
+        session (object, optional): Session passed to the backend
+            built by name. Transport instances already have their own,
+            so :exc:`ValueError` is raised if both are passed.
+
+    Returns (:class:`Transport`)
+    """
+    if transport is None:
+        transport = "curl-multi" if curl is not None else "urllib"
+    if transport == RecordingTransport.name:
+        raise ValueError(
+            "Record transport needs the path of its cassette, pass "
+            "RecordingTransport(path) instead of its name."
+        )
+    if isinstance(transport, str):
+        try:
+            return TRANSPORTS[transport](session=session)
+        except KeyError:
+            raise ValueError(
+                "Transport %r not found. Valid transports are: %s." % (
+                    transport, ", ".join(sorted(TRANSPORTS)))
+            )
+    if session is not None:
+        raise ValueError(
+            "A session can't be passed with a transport instance, "
+            "pass it to the constructor of the transport instead."
+        )
+    return transport
@@ -1,25 +1,267 @@
 # -*- coding: utf-8 -*-
 
-"""Urllib implementation for pymarketcap."""
+"""Standard library implementation for pymarketcap, used when
+it's installed without curl support."""
 
 # Standard python modules
-from urllib.error import HTTPError
-from urllib.request import urlopen, Request
+import ssl
+import zlib
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from urllib.parse import urlsplit, urljoin
 from socket import timeout as TimeoutHTTPError
+from threading import Lock
+from time import perf_counter, monotonic
+from concurrent.futures import ThreadPoolExecutor
 
 # Internal python modules
 from pymarketcap import __version__
-from pymarketcap.errors import CoinmarketcapHTTPError408
+from pymarketcap.errors import CoinmarketcapError, CoinmarketcapHTTPError408
+
+#: Maximum number of redirects followed by a request
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
 
 class Response:
     """Internal response object for encapsulate responses
     getted by requests with urllib module."""
-    def __init__(self, text, status_code, url):
+    def __init__(self, text, status_code, url, stopped=False, headers=None):
         self.text = text
         self.status_code = status_code
         self.url = url
+        self.stopped = stopped
+        self.headers = {name.lower(): value for name, value in
+                        (headers.items() if headers else ())}
+
+        # Name resolution is not measured apart and the connect
+        # time of HTTPS connections includes the TLS handshake
+        self.namelookup_time = None
+        self.connect_time = None
+        self.appconnect_time = None
+        self.starttransfer_time = None
+        self.total_time = None
+        self.size_download = len(text)
+        self.connection_reused = False
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def body(self):
+        """memoryview: Read only view of the body."""
+        return memoryview(self.text)
+
+    @property
+    def timings(self):
+        """dict: Timing breakdown of the request, with the same keys
+        as :attr:`pymarketcap.curl.Response.timings`. Phases that
+        urllib doesn't expose are ``None``."""
+        return {
+            "namelookup_time": self.namelookup_time,
+            "connect_time": self.connect_time,
+            "appconnect_time": self.appconnect_time,
+            "starttransfer_time": self.starttransfer_time,
+            "total_time": self.total_time,
+            "size_download": self.size_download,
+            "connection_reused": self.connection_reused,
+        }
+
+    def decode(self, offset=0):
+        """Decode the body from UTF-8 starting at byte ``offset``.
+        If it falls inside a multibyte character, the start moves
+        to the next character."""
+        text = self.text
+        offset = max(offset, 0)
+        while offset < len(text) and (text[offset] & 0xC0) == 0x80:
+            offset += 1
+        return str(memoryview(text)[offset:], "utf-8")
+
+class Session:
+    """Pool of keep-alive connections reused between requests,
+    counterpart of :class:`pymarketcap.curl.Session` for the urllib
+    implementation. Idle connections are stored by scheme, host and
+    port, and those which have been idle for more than
+    ``idle_timeout`` seconds are closed instead of being reused.
+
+    Args:
+        max_handles (int, optional): Maximum number of idle
+            connections stored for each host. As default ``8``.
+        cainfo (bytes, optional): Path to a CA bundle used to
+            verify peers. As default ``b""`` (system bundle).
+        idle_timeout (float, optional): Seconds after which an idle
+            connection is discarded. As default ``30``.
+    """
+    def __init__(self, max_handles=8, cainfo=b"", idle_timeout=30):
+        self.max_handles = max_handles
+        self.cainfo = cainfo
+        self.idle_timeout = idle_timeout
+        self.context = ssl.create_default_context(
+            cafile=cainfo.decode() if cainfo else None
+        )
+        self._idle = {}
+        self._lock = Lock()
+
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.tls_handshakes = 0
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(conns) for conns in self._idle.values())
+
+    @property
+    def stats(self):
+        """Counters of connections and handshakes reused
+        by the requests of this session.
+
+        Returns (dict):
+            With keys ``"requests"``, ``"connections_created"``,
+            ``"connections_reused"`` and ``"tls_handshakes"``.
+        """
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "tls_handshakes": self.tls_handshakes,
+        }
+
+    def acquire(self, key, timeout):
+        """Take a live idle connection to ``key`` from the pool.
+
+        Returns: A :class:`http.client.HTTPConnection` or ``None``
+            if there is no idle connection to reuse.
+        """
+        now = monotonic()
+        with self._lock:
+            conns = self._idle.get(key, [])
+            while conns:
+                conn, released = conns.pop()
+                if now - released <= self.idle_timeout:
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn
+                conn.close()
+        return None
+
+    def connect(self, key, timeout, proxy=None):
+        """Open a new connection to ``key``, through ``proxy`` if passed.
+
+        Returns (:class:`http.client.HTTPConnection`)
+        """
+        scheme, host, port = key
+        if proxy is not None:
+            conn = HTTPConnection(proxy[0], proxy[1], timeout=timeout) \
+                if scheme == "http" else \
+                HTTPSConnection(proxy[0], proxy[1], timeout=timeout,
+                                context=self.context)
+            if scheme == "https":
+                conn.set_tunnel(host, port)
+        elif scheme == "https":
+            conn = HTTPSConnection(host, port, timeout=timeout,
+                                   context=self.context)
+        else:
+            conn = HTTPConnection(host, port, timeout=timeout)
+        conn.connect()
+        self.connections_created += 1
+        if scheme == "https":
+            self.tls_handshakes += 1
+        return conn
+
+    def release(self, key, conn):
+        """Return a connection to the pool, closing it if the pool is full."""
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_handles:
+                conns.append((conn, monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        """Close all the idle connections."""
+        with self._lock:
+            for conns in self._idle.values():
+                for conn, _ in conns:
+                    conn.close()
+            self._idle.clear()
+
+class DecodedStream:
+    """Decompress a ``gzip`` or ``deflate`` encoded
+    response body as it is read."""
+    def __init__(self, stream, encoding):
+        self.stream = stream
+        self.encoding = encoding
+        wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+        self._decompressor = zlib.decompressobj(wbits)
+        self._buffer = b""
+
+    def _decompress(self, data):
+        try:
+            return self._decompressor.decompress(data)
+        except zlib.error:
+            if self.encoding != "deflate" or self._decompressor.total_in:
+                raise
+            # Some servers send raw deflate streams, without zlib header
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decompressor.decompress(data)
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            data = self.stream.read(65536 if size < 0 else size)
+            if not data:
+                self._buffer += self._decompressor.flush()
+                break
+            self._buffer += self._decompress(data)
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
 
-def get_to_memory(url, timeout, debug, proxy_addr):
+def parse_proxy(proxy_addr):
+    """Host and port of a HTTP proxy like ``b"http://host:port"``,
+    or ``None`` if there is no proxy or it's not a HTTP one."""
+    if not proxy_addr:
+        return None
+    proxy_addr = proxy_addr.decode()
+    if "://" not in proxy_addr:
+        proxy_addr = "http://" + proxy_addr
+    parts = urlsplit(proxy_addr)
+    if parts.scheme not in ("http", "https"):
+        # SOCKS proxies are only supported by the curl implementation
+        return None
+    return parts.hostname, parts.port or 8080
+
+def read_stream(stream, offset=0, until=b"", chunk_size=65536):
+    """Read a response body discarding the first ``offset`` bytes
+    and stopping after the ``until`` marker, if passed.
+
+    Returns (tuple): Body read and if the read was stopped
+        by the marker.
+    """
+    while offset > 0:
+        chunk = stream.read(min(offset, chunk_size))
+        if not chunk:
+            break
+        offset -= len(chunk)
+    if not until:
+        return stream.read(), False
+
+    data = bytearray()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return bytes(data), False
+        # The marker may start at the end of previous chunk
+        search_from = max(len(data) - len(until) + 1, 0)
+        data += chunk
+        found = data.find(until, search_from)
+        if found >= 0:
+            del data[found + len(until):]
+            return bytes(data), True
+
+def get_to_memory(url, timeout, debug, proxy_addr, session=None,
+                  offset=0, until=b"", headers=None):
     """GET request stored in memory.
 
     Args:
@@ -27,25 +269,151 @@ def get_to_memory(url, timeout, debug, proxy_addr):
         timeout (int): Number of seconds until
             expiration time cancels the request.
         debug (bool): See code response or not.
+        proxy_addr (bytes): HTTP proxy to use, or ``b""`` for none.
+        session (:class:`pymarketcap.url.Session`, optional): Pool
+            of connections to reuse. If ``None``, a new connection
+            is opened and closed for this request.
+        offset (int, optional): Number of bytes at the beginning of
+            the body discarded as they arrive. As default ``0``.
+        until (bytes, optional): If passed, the body is read only
+            until this marker. As default ``b""``.
+        headers (list, optional): Extra request headers as bytes,
+            like ``b"If-None-Match: \"etag\""``. As default ``None``.
     """
-    req = Request(
-        url.decode(),
-        headers={"User-Agent": "pymarketcap %s" % __version__}
-    )
+    if session is None:
+        session = Session(max_handles=0)
+    request_headers = {
+        "User-Agent": "pymarketcap %s" % __version__,
+        "Accept-Encoding": "gzip, deflate",
+    }
+    for header in headers or ():
+        name, _, value = header.decode("latin-1").partition(":")
+        request_headers[name.strip()] = value.strip()
+    proxy = parse_proxy(proxy_addr)
+
+    start = perf_counter()
     try:
-        req = urlopen(req, timeout=timeout)
-    except HTTPError as err:
-        return Response(b"", err.code, url)
-    except OSError:
-        return Response(b"", 404, url)
+        for _ in range(MAX_REDIRECTS + 1):
+            res = request(session, url, timeout, proxy, request_headers,
+                          offset, until, start)
+            location = res.headers.get("location")
+            if res.status_code not in REDIRECT_CODES or not location:
+                break
+            url = urljoin(url.decode(), location).encode()
     except TimeoutHTTPError:
         raise CoinmarketcapHTTPError408(
             "Request timeout exceed (%d seconds)." % timeout
         )
+    except (OSError, HTTPException):
+        return Response(b"", 404, url)
+    if debug:
+        print(res.text)
+    return res
+
+def request(session, url, timeout, proxy, headers, offset, until, start):
+    """Send a GET request through a connection of ``session``,
+    reconnecting once if a reused connection was closed by the server.
+
+    Returns (:class:`pymarketcap.url.Response`)
+    """
+    parts = urlsplit(url.decode())
+    scheme = parts.scheme or "http"
+    key = (scheme, parts.hostname,
+           parts.port or (443 if scheme == "https" else 80))
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    if proxy is not None and scheme == "http":
+        target = url.decode()
+
+    conn = session.acquire(key, timeout)
+    reused = conn is not None
+    connect_time = None
+    while True:
+        if conn is None:
+            conn = session.connect(key, timeout, proxy)
+            connect_time = perf_counter() - start
+        try:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+        except (ConnectionError, HTTPException):
+            conn.close()
+            if not reused:
+                raise
+            # The server closed the idle connection, open a new one
+            conn, reused = None, False
+            continue
+        break
+
+    starttransfer_time = perf_counter() - start
+    encoding = resp.getheader("Content-Encoding", "").lower()
+    stream = DecodedStream(resp, encoding) \
+        if encoding in ("gzip", "deflate") else resp
+    try:
+        data, stopped = read_stream(stream, offset, until)
+    except BaseException:
+        conn.close()
+        raise
+
+    session.requests += 1
+    if reused:
+        session.connections_reused += 1
+    if stopped or resp.will_close or not resp.isclosed():
+        # The rest of the body was not read, the connection can't be reused
+        conn.close()
     else:
-        data = req.read()
-        if debug:
-            print(data)
-        res = Response(data, req.getcode(), url)
-        req.close()
-        return res
+        session.release(key, conn)
+
+    res = Response(data, resp.status, url, stopped, resp.headers)
+    res.connection_reused = reused
+    if connect_time is not None:
+        res.connect_time = connect_time
+        if scheme == "https":
+            res.appconnect_time = connect_time
+    res.starttransfer_time = starttransfer_time
+    res.total_time = perf_counter() - start
+    return res
+
+def get_many_to_memory(urls, timeout, debug, proxy_addr,
+                       max_parallel=8, session=None, offset=0, until=b"",
+                       rate_limiter=None):
+    """Several GET requests stored in memory, performed
+    in parallel by a pool of threads.
+
+    Args:
+        urls (list): Urls to send GET requests.
+        timeout (int): Number of seconds until
+            expiration time cancels each request.
+        debug (bool): See code response or not.
+        max_parallel (int, optional): Maximum number of
+            simultaneous requests. As default ``8``.
+        session (:class:`pymarketcap.url.Session`, optional): Pool
+            of connections shared by the threads.
+        offset (int, optional): Bytes discarded at the beginning
+            of each body. As default ``0``.
+        until (bytes, optional): Marker after which each body
+            is not read. As default ``b""``.
+        rate_limiter (:class:`pymarketcap.ratelimit.RateLimiter`,
+            optional): Limiter waited for by each thread just before
+            its request, and fed back its response. As default ``None``.
+
+    Returns (list): A :class:`pymarketcap.url.Response` for each
+        url in the same order, or the exception raised requesting it.
+    """
+    def fetch(url):
+        if rate_limiter is not None:
+            rate_limiter.acquire(url)
+        try:
+            response = get_to_memory(url, timeout, debug, proxy_addr,
+                                     session, offset, until)
+        except CoinmarketcapError as err:
+            return err
+        if rate_limiter is not None:
+            rate_limiter.feedback(url, response.status_code,
+                                  response.headers.get("retry-after"))
+        return response
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        return list(executor.map(fetch, urls))
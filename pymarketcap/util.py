@@ -4,6 +4,7 @@
 
 # Standard python modules
 import sys
+import math
 import time
 from datetime import datetime
 
@@ -19,3 +20,42 @@ def get_timestamp(dt):
 
 def cmc_timestamp(dt):
     return int(get_timestamp(dt) * 1000)
+
+
+def endpoint(url):
+    """Name of the endpoint requested by ``url``, used to group
+    timings: the host followed by the first segment of the path,
+    or the first two if the first one is an API version.
+
+    Args:
+        url (bytes or str): Url requested.
+
+    Returns (str):
+        Like ``"api.coinmarketcap.com/v2/ticker"``
+        or ``"coinmarketcap.com/currencies"``.
+    """
+    if isinstance(url, bytes):
+        url = url.decode()
+    url = url.split("://", 1)[-1].split("?", 1)[0]
+    host, _, path = url.partition("/")
+    segments = [segment for segment in path.split("/") if segment]
+    length = 1
+    if segments and segments[0][:1] == "v" and segments[0][1:].isdigit():
+        length = 2
+    return "/".join([host] + segments[:length])
+
+
+def percentile(values, percent):
+    """Percentile of ``values`` by the nearest rank method.
+
+    Args:
+        values (list): Numbers to compute the percentile from.
+        percent (float): Percentile between ``0`` and ``100``.
+
+    Returns (float): The percentile, or ``None`` if ``values`` is empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = int(math.ceil(percent / 100.0 * len(ordered)))
+    return ordered[min(max(rank - 1, 0), len(ordered) - 1)]
@@ -139,18 +139,7 @@ if COMPILE_CURL:
         declare_cython_extension("pymarketcap.curl", libraries=["curl"])
     )
     package_data["pymarketcap"].extend(["curl.pyx", "curl.pxd"])
-else:
-    core_path = os.path.join(CURR_DIR, "pymarketcap", "core.pyx")
-    with open(core_path, "r") as f:
-        content = f.readlines()
-
-    for i, line in enumerate(content):
-        if "from pymarketcap.curl import get_to_memory" in line:
-            content[i] = line.replace("curl", "url")
-            break
-
-    with open(core_path, "w") as f:
-        f.writelines(content)
+# Without curl extension, ``pymarketcap.transport`` falls back to urllib
 
 ext_modules = cythonize(ext_modules)
 
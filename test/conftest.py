@@ -3,8 +3,14 @@
 import os
 import sys
 import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
 import pytest
 
+from pymarketcap.standin import StandinServer
+
 sys.path.append(
     os.path.abspath(os.path.join(os.getcwd(), "pymarketcap"))
 )
@@ -39,3 +45,64 @@ def event_loop():
     pass
 
 
+
+@pytest.fixture
+def standin():
+    """Factory of local stand-in servers of coinmarketcap,
+    stopped at the end of the test. Receives the arguments
+    of :class:`pymarketcap.standin.StandinServer`."""
+    servers = []
+    def start(*args, **kwargs):
+        server = StandinServer(*args, **kwargs)
+        server.start()
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.stop()
+
+
+class LocalServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.respond(self)
+
+    def reply(self, body=b"", status=200, headers=None):
+        """Send a response with ``body`` and ``headers``."""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            pass  # Client stopped the transfer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Factory of local HTTP servers, stopped at the end of the test.
+    Receives a function called with the request handler of each GET
+    request, which answers it with ``handler.reply(body, status,
+    headers)``, and returns the server, whose url is ``server.url``."""
+    servers = []
+    def start(respond):
+        server = LocalServer(("127.0.0.1", 0), LocalHandler)
+        server.respond = respond
+        server.url = b"http://127.0.0.1:%d/" % server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
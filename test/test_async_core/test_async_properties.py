@@ -8,6 +8,7 @@ try:
 except ImportError:
     pass
 from pymarketcap import Pymarketcap
+from pymarketcap.transport import ReplayTransport
 from pymarketcap.test.consts import asyncparms
 
 @pytest.mark.py36
@@ -18,3 +19,16 @@ def test_sync_interface(event_loop):
         assert isinstance(sync_interface, Pymarketcap)
 
     event_loop.run_until_complete(wrapper())
+
+@pytest.mark.py36
+def test_sync_interface_transport(event_loop):
+    async def wrapper():
+        transport = ReplayTransport()
+        async with AsyncPymarketcap(transport=transport) as apym:
+            # Metadata lookups go through the same transport
+            assert apym.sync.transport is transport
+        async with AsyncPymarketcap() as first, \
+                AsyncPymarketcap() as second:
+            assert first.sync is not second.sync
+
+    event_loop.run_until_complete(wrapper())
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+curl = pytest.importorskip("pymarketcap.curl")
+
+BODY = b"pymarketcap"
+
+def test_server_in_same_interpreter(local_server):
+    # The server thread can only respond if the GIL is
+    # released while curl waits for the response
+    server = local_server(lambda request: request.reply(BODY))
+    response = curl.get_to_memory(server.url, 5, False, b"")
+    assert response.status_code == 200
+    assert response.text == BODY
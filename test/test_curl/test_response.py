@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pymarketcap.url import Response as UrlResponse
+
+BODY = "é".encode() * 3 + b"\x00abc"
+
+def test_empty_curl_response():
+    curl = pytest.importorskip("pymarketcap.curl")
+    response = curl.Response()
+    assert len(response) == 0
+    assert response.text == b""
+    assert response.decode() == ""
+    assert bytes(response.body) == b""
+
+def test_url_response_decode():
+    response = UrlResponse(BODY, 200, b"")
+    assert len(response) == len(BODY)
+    assert response.decode() == "ééé\x00abc"
+    assert response.decode(2) == "éé\x00abc"
+    # Offsets inside a multibyte character move to the next one
+    assert response.decode(1) == "éé\x00abc"
+    assert response.decode(100) == ""
+    assert bytes(response.body) == BODY
+
+def test_url_response_headers():
+    response = UrlResponse(b"", 304, b"", headers={"ETag": '"abc"'})
+    assert response.headers == {"etag": '"abc"'}
+    assert UrlResponse(b"", 200, b"").headers == {}
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+import pytest
+
+from pymarketcap import url as urllib_impl
+
+BODY = b"h" * 70000 + b"<tbody>rows</tbody>" + b"t" * 200000
+HEAD = 70000
+EXPECTED = b"<tbody>rows</tbody>"
+
+@pytest.fixture
+def server_url(local_server):
+    return local_server(lambda request: request.reply(BODY)).url
+
+def test_read_stream():
+    data, stopped = urllib_impl.read_stream(io.BytesIO(BODY), HEAD,
+                                            b"</tbody>", chunk_size=1000)
+    assert data == EXPECTED
+    assert stopped
+
+def test_read_stream_without_marker():
+    data, stopped = urllib_impl.read_stream(io.BytesIO(BODY), HEAD, b"</nope>")
+    assert data == BODY[HEAD:]
+    assert not stopped
+
+def test_feed_write_memory_stops():
+    curl = pytest.importorskip("pymarketcap.curl")
+    chunks = [BODY[i:i + 4096] for i in range(0, len(BODY), 4096)]
+    size, _ = curl.feed_write_memory(chunks, len(BODY), HEAD, b"</tbody>")
+    assert size == len(EXPECTED)
+
+def test_curl_streaming(server_url):
+    curl = pytest.importorskip("pymarketcap.curl")
+    response = curl.get_to_memory(server_url, 5, False, b"", None,
+                                  HEAD, b"</tbody>")
+    assert response.status_code == 200
+    assert response.stopped
+    assert response.text == EXPECTED
+
+def test_urllib_streaming(server_url):
+    response = urllib_impl.get_to_memory(server_url, 5, False, b"",
+                                         None, HEAD, b"</tbody>")
+    assert response.stopped
+    assert response.text == EXPECTED
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+curl = pytest.importorskip("pymarketcap.curl")
+
+CHUNKS = [b"a" * 4096] * 200 + [b"b" * 50000, b"c" * 500]
+SIZE = sum(len(chunk) for chunk in CHUNKS)
+
+def test_unknown_length():
+    size, reallocs = curl.feed_write_memory(CHUNKS)
+    assert size == SIZE
+    assert reallocs < 10
+
+def test_known_length():
+    size, reallocs = curl.feed_write_memory(CHUNKS, SIZE)
+    assert size == SIZE
+    assert reallocs == 1
+
+def test_wrong_known_length():
+    size, reallocs = curl.feed_write_memory(CHUNKS, 10)
+    assert size == SIZE
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from types import MethodType, SimpleNamespace
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.cache import ResponseCache, url_family
+from pymarketcap.errors import CoinmarketcapOfflineError
+from pymarketcap.pymasyncore import AsyncPymarketcap
+from pymarketcap.singleflight import AsyncSingleFlight
+from pymarketcap.transport import ReplayTransport
+
+TICKER = b"https://api.coinmarketcap.com/v2/ticker/?start=1"
+DAY = 86400
+
+class Clock:
+    def __init__(self):
+        self.now = 1500000000.
+
+    def __call__(self):
+        return self.now
+
+class CountingTransport(ReplayTransport):
+    def __init__(self, responses):
+        super().__init__(responses)
+        self.requests = []
+
+    def response(self, url, offset=0, until=b"", debug=False):
+        self.requests.append(url)
+        return super().response(url, offset, until, debug)
+
+def test_ttls_by_family():
+    clock = Clock()
+    cache = ResponseCache(ttls={"listings": 10}, clock=clock)
+    assert url_family("https://coinmarketcap.com/gainers-losers/") == "default"
+    assert cache.ttl(TICKER) == 60
+    assert cache.ttl(b"https://api.coinmarketcap.com/v2/listings/") == 10
+
+    graph = "https://graphs2.coinmarketcap.com/currencies/bitcoin/%d/%d/"
+    past, recent = (clock.now - 3 * DAY) * 1000, clock.now * 1000
+    assert cache.ttl(graph % (past - DAY * 1000, past)) is None
+    assert cache.ttl(graph % (past, recent)) == 300
+
+    historical = ("https://coinmarketcap.com/currencies/bitcoin/"
+                  "historical-data/?start=20130428&end=%s")
+    assert cache.ttl(historical % "20170101") is None
+    assert cache.ttl(historical % "20170714") == 3600
+
+def test_expiration_and_eviction():
+    clock = Clock()
+    cache = ResponseCache(max_entries=2, clock=clock)
+    cache.put(TICKER, "first")
+    assert cache.get(TICKER) == "first"
+    assert cache.get(TICKER, 20000) is None
+
+    clock.now += 61
+    assert cache.get(TICKER) is None
+    assert cache.get(TICKER, stale=True) == "first"
+
+    cache.put(b"https://coinmarketcap.com/new/", "new")
+    cache.put(b"https://coinmarketcap.com/tokens/views/all/", "tokens")
+    assert cache.get(TICKER, stale=True) is None
+    assert cache.stats == {"memory": 2, "disk": 0, "misses": 3,
+                           "revalidated": 0}
+
+def test_disk_store(tmpdir):
+    path = str(tmpdir.join("cache"))
+    cache = ResponseCache(path, max_disk_bytes=400)
+    cache.put(TICKER, "a" * 100)
+    assert ResponseCache(path).get(TICKER) == "a" * 100
+
+    for i in range(8):
+        cache.put(b"https://coinmarketcap.com/new/?%d" % i, "b" * 100)
+    assert cache.disk.size <= 400
+    assert ResponseCache(path).get(TICKER) is None
+
+def test_clients_cache(tmpdir):
+    urls = [TICKER, b"https://api.coinmarketcap.com/v2/ticker/?start=101"]
+    transport = CountingTransport({url: b"{}" for url in urls})
+    cache = ResponseCache(str(tmpdir.join("cache")))
+    pym = Pymarketcap(transport=transport, cache=cache)
+    assert pym._get(TICKER) == "{}"
+    assert pym._get(TICKER) == "{}"
+    assert pym._get_many(urls) == ["{}", "{}"]
+    assert transport.requests == urls
+
+    pym = Pymarketcap(transport=transport, offline=True,
+                      cache=ResponseCache(str(tmpdir.join("cache"))))
+    assert pym._get_many(urls) == ["{}", "{}"]
+    with pytest.raises(CoinmarketcapOfflineError):
+        pym._get(b"https://coinmarketcap.com/new/")
+    assert len(transport.requests) == 2
+
+def test_async_offline_errors_raised():
+    cache = ResponseCache()
+    cache.put("https://coinmarketcap.com/currencies/bitcoin/", "{}")
+    client = SimpleNamespace(
+        cache=cache, offline=True, single_flight=AsyncSingleFlight(),
+        queue_size=10, connector_limit=10, progress_bar=False,
+    )
+    for name in ("_get", "_async_multiget", "_producer", "_consumer"):
+        setattr(client, name,
+                MethodType(getattr(AsyncPymarketcap, name), client))
+
+    async def build_url(slug):
+        return "https://coinmarketcap.com/currencies/%s/" % slug
+
+    # Urls not cached don't leave the queue waiting forever
+    with pytest.raises(CoinmarketcapOfflineError):
+        asyncio.new_event_loop().run_until_complete(asyncio.wait_for(
+            client._async_multiget(["bitcoin", "ethereum"], build_url), 3
+        ))
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from time import perf_counter
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.cassette import Cassette
+from pymarketcap.transport import RecordingTransport, ReplayTransport
+
+BODY = b'{"data": [{"id": 1, "symbol": "BTC"}]}'
+
+@pytest.fixture
+def server(local_server):
+    return local_server(
+        lambda request: request.reply(BODY, headers={"ETag": '"btc"'})
+    ).url
+
+def test_cassette_roundtrip(tmpdir):
+    path = str(tmpdir.join("responses.cassette"))
+    with Cassette(path) as cassette:
+        cassette.add(b"https://a/", 200, {"etag": '"a"'}, b"a" * 1000)
+        cassette.add(b"https://b/", 404, {}, b"")
+
+    cassette = Cassette(path)
+    assert len(cassette) == 2
+    assert cassette.get(b"https://a/") == (200, {"etag": '"a"'}, b"a" * 1000)
+    assert cassette.get(b"https://b/")[0] == 404
+
+    # Responses added after loading are appended on save
+    cassette.add(b"https://c/", 200, {}, b"c")
+    cassette.save()
+    assert Cassette(path).urls() == {b"https://a/", b"https://b/",
+                                     b"https://c/"}
+
+    with pytest.raises(ValueError):
+        Cassette().save()
+
+def test_record_and_replay(server, tmpdir):
+    path = str(tmpdir.join("responses.cassette"))
+    recording = RecordingTransport(path, transport="urllib")
+    pym = Pymarketcap(transport=recording)
+    assert pym._get(server, 10) == BODY[10:].decode()
+    recording.save()
+
+    pym = Pymarketcap(transport=ReplayTransport(cassette=path))
+    # Full bodies are recorded, so any offset can be replayed
+    assert pym._get(server) == BODY.decode()
+    assert pym._get(server, 0, b'"id"') == '{"data": [{"id"'
+    assert pym.transport.response(server).headers["etag"] == '"btc"'
+
+def test_replay_latency():
+    transport = ReplayTransport({b"https://a/": BODY}, latency=.05)
+    pym = Pymarketcap(transport=transport)
+    start = perf_counter()
+    pym._get_many([b"https://a/"] * 4, max_parallel=4)
+    # Latencies of parallel requests overlap
+    assert perf_counter() - start < .05 * 4
+
+def test_replay_async():
+    transport = ReplayTransport({b"https://a/": BODY}, latency=.01)
+    response = asyncio.new_event_loop().run_until_complete(
+        transport.aget(b"https://a/", 15, 10)
+    )
+    assert response.text == BODY[10:]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from pymarketcap import Pymarketcap
+
+BODY = b'{"data": []}'
+ETAG = '"pymarketcap"'
+
+def test_not_modified_reuses_body(local_server):
+    conditional = []
+
+    def respond(request):
+        conditional.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == ETAG:
+            request.reply(status=304, headers={"ETag": ETAG})
+        else:
+            request.reply(BODY, headers={"ETag": ETAG})
+
+    url = local_server(respond).url
+    pym = Pymarketcap(timeout=5)
+    first = pym._get_conditional(url)
+    second = pym._get_conditional(url)
+    assert first == second == BODY.decode()
+    assert conditional == [None, ETAG]
+    assert pym._validators[url][0] == ETAG
+
+def test_validators_bounded(local_server):
+    server = local_server(lambda request: request.reply(
+        BODY, headers={"ETag": ETAG}
+    ))
+    pym = Pymarketcap(timeout=5, validators_size=2)
+    urls = [server.url + b"?start=%d" % i for i in range(3)]
+    for url in urls:
+        pym._get_conditional(url)
+    # Only the validators of the last urls requested are kept
+    assert list(pym._validators) == urls[1:]
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.errors import CoinmarketcapError
+pym = Pymarketcap(timeout=5)
+
+CLOSED_PORT_URL = b"http://127.0.0.1:1/"
+
+def test_empty():
+    assert pym._get_many([]) == []
+
+def test_return_exceptions():
+    response = pym._get_many([CLOSED_PORT_URL] * 3, return_exceptions=True)
+    assert len(response) == 3
+    for res in response:
+        assert isinstance(res, CoinmarketcapError)
+
+def test_raise_first_error():
+    with pytest.raises(CoinmarketcapError):
+        pym._get_many([CLOSED_PORT_URL])
+
+def test_order_kept(local_server):
+    def respond(request):
+        # The first urls are answered last
+        number = int(request.path[1:])
+        time.sleep((3 - number) * .1)
+        request.reply(str(number).encode())
+
+    url = local_server(respond).url
+    start = time.time()
+    response = pym._get_many([url + str(i).encode() for i in range(4)])
+    assert response == ["0", "1", "2", "3"]
+    # Transfers run in parallel: .3 seconds instead of .6
+    assert time.time() - start < .55
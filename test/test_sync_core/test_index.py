@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.index import FieldIndex, SearchIndex
+from pymarketcap.pymasyncore import AsyncPymarketcap
+from pymarketcap.transport import ReplayTransport
+
+LISTINGS = b"https://api.coinmarketcap.com/v2/listings/"
+CURRENCIES = [
+    {"id": 1, "name": "Bitcoin", "symbol": "BTC", "website_slug": "bitcoin"},
+    {"id": 1027, "name": "Ethereum", "symbol": "ETH",
+     "website_slug": "ethereum"},
+    {"id": 2, "name": "Bitcoin Fake", "symbol": "BTC",
+     "website_slug": "bitcoin-fake"},
+]
+
+def listings(currencies):
+    return json.dumps({"data": currencies, "metadata": {}}).encode()
+
+def test_field_index():
+    index = FieldIndex(CURRENCIES, ("id", "symbol"))
+    assert index.get("id", 1027)["name"] == "Ethereum"
+    # The first currency of a shared symbol is returned
+    assert index.get("symbol", "BTC")["id"] == 1
+    assert index.get("id", "1") is None
+    assert index.get("id", [1]) is None
+    # Fields not indexed are scanned
+    assert index.get("website_slug", "bitcoin-fake")["id"] == 2
+
+def test_indexes_rebuilt_on_refresh():
+    transport = ReplayTransport({LISTINGS: listings(CURRENCIES)})
+    pym = Pymarketcap(transport=transport)
+    assert pym.cryptocurrency_by_field_value("website_slug",
+                                             "ethereum")["id"] == 1027
+    assert pym.cryptocurrency_by_field_value("name", "Litecoin") is None
+
+    transport.record(LISTINGS, listings(CURRENCIES + [
+        {"id": 2, "name": "Litecoin", "symbol": "LTC",
+         "website_slug": "litecoin"}
+    ]))
+    pym._cryptocurrencies.invalidate()
+    assert pym.cryptocurrency_by_field_value("name", "Litecoin")["id"] == 2
+
+def test_exchanges_normalized():
+    quick_search = b"https://s2.coinmarketcap.com/generated/search/" \
+                   b"quick_search_exchanges.json"
+    transport = ReplayTransport({quick_search: json.dumps([
+        {"id": 270, "name": "Binance", "slug": "binance"},
+        {"id": 89, "name": "Coinbase Pro", "slug": "gdax"},
+    ]).encode()})
+    pym = Pymarketcap(transport=transport)
+    assert pym.exchange_by_field_value("id", 89)["name"] == "Coinbase Pro"
+    assert pym.exchange_by_field_value("name", "BINANCE")["id"] == 270
+    assert pym.exchange_by_field_value("name", " coinbase_pro")["id"] == 89
+    assert pym.exchange_by_field_value("website_slug", "GDAX")["id"] == 89
+    assert pym.exchange_by_field_value("name", "kraken") is None
+
+def test_search_index():
+    index = SearchIndex(CURRENCIES, ("name", "symbol", "website_slug"),
+                        ranks={1027: 1, 2: 2, 1: 3})
+    # Exact matches go first, then by rank
+    assert [c["id"] for c in index.prefix("bitcoin")] == [1, 2]
+    assert [c["id"] for c in index.prefix("BTC")] == [2, 1]
+    assert [c["id"] for c in index.prefix("e")] == [1027]
+    assert index.prefix("x") == []
+    assert [c["id"] for c in index.search("etherium")] == [1027]
+    assert [c["id"] for c in index.search("bitcion fake", 1)] == [2]
+
+def test_search():
+    quick_search = b"https://s2.coinmarketcap.com/generated/search/" \
+                   b"quick_search.json"
+    transport = ReplayTransport({
+        LISTINGS: listings(CURRENCIES),
+        quick_search: json.dumps([{"id": c["id"], "rank": c["id"]}
+                                  for c in CURRENCIES]).encode()
+    })
+    pym = Pymarketcap(transport=transport)
+    assert [c["id"] for c in pym.search("bit")] == [1, 2]
+    assert pym.search("ethreum", 1)[0]["website_slug"] == "ethereum"
+
+def test_resolve_many():
+    transport = ReplayTransport({LISTINGS: listings(CURRENCIES)})
+    pym = Pymarketcap(transport=transport)
+    response = pym.resolve_many([1027, "2", "bitcoin", "btc", "ETHEREUM",
+                                 "Bitcoin fake", "doge"])
+    assert {identifier: currency["website_slug"] for identifier, currency
+            in response["resolved"].items()} == {
+        1027: "ethereum", "2": "bitcoin-fake", "bitcoin": "bitcoin",
+        "btc": "bitcoin", "ETHEREUM": "ethereum",
+        "Bitcoin fake": "bitcoin-fake"
+    }
+    assert [c["id"] for c in response["ambiguous"]["btc"]] == [1, 2]
+    assert response["unknown"] == ["doge"]
+
+def test_resolve_symbol_before_folded_slug():
+    transport = ReplayTransport({LISTINGS: listings(CURRENCIES + [
+        {"id": 1697, "name": "Basic Attention Token", "symbol": "BAT",
+         "website_slug": "basic-attention-token"},
+        {"id": 3000, "name": "Bat Coin", "symbol": "BATC",
+         "website_slug": "bat"},
+    ])})
+    pym = Pymarketcap(transport=transport)
+    response = pym.resolve_many(["BAT", "bat", "BAT COIN"])
+    assert {identifier: currency["id"] for identifier, currency
+            in response["resolved"].items()} == {
+        "BAT": 1697, "bat": 3000, "BAT COIN": 3000
+    }
+
+def test_currencies_lookup_exact():
+    transport = ReplayTransport({LISTINGS: listings(CURRENCIES)})
+    pym = Pymarketcap(transport=transport)
+    assert pym.cryptocurrency_by_field_value("name", "Ethereum")["id"] == 1027
+    assert pym.cryptocurrency_by_field_value("name", "ETHEREUM") is None
+    assert pym.cryptocurrency_by_field_value("website_slug",
+                                             "Bitcoin Fake") is None
+
+def test_async_producers_resolve():
+    transport = ReplayTransport({LISTINGS: listings(CURRENCIES)})
+    client = SimpleNamespace(sync=Pymarketcap(transport=transport))
+    assert list(AsyncPymarketcap._resolve(client, ["ETH", "bitcoin"])) == \
+        ["ethereum", "bitcoin"]
+    assert len(AsyncPymarketcap._resolve(client)) == 3
+    assert len(AsyncPymarketcap._resolve(client, [])) == 3
+    assert AsyncPymarketcap._resolve(client, [], exchanges=True) == {}
+    with pytest.raises(ValueError):
+        AsyncPymarketcap._resolve(client, ["doge"])
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+from time import monotonic
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.errors import CoinmarketcapTooManyRequestsError
+from pymarketcap.ratelimit import RateLimiter, parse_retry_after
+
+URL = b"https://api.coinmarketcap.com/v2/listings/"
+
+class Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:10 GMT", now=4) == 6
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+def test_requests_spaced():
+    limiter = RateLimiter(rate=2, clock=Clock())
+    waits = [limiter.reserve(URL) for _ in range(4)]
+    assert waits == [0, .5, 1, 1.5]
+    # Buckets are independent by host
+    assert limiter.reserve(b"https://coinmarketcap.com/") == 0
+
+def test_backoff_on_too_many_requests():
+    clock = Clock()
+    limiter = RateLimiter(rate=4, increase=1, clock=clock)
+    limiter.reserve(URL)
+    limiter.feedback(URL, 429, "2")
+    limiter.feedback(URL, 429, "2")
+    # Only the first response of a backoff reduces the rate
+    assert limiter.rate_of(URL) == 2
+    assert limiter.reserve(URL) == 2
+
+    clock.now = 10
+    for _ in range(5):
+        limiter.feedback(URL, 200)
+    assert limiter.rate_of(URL) == 4
+
+def test_shared_with_clients(standin):
+    server = standin(responses={URL: b"{}"}, too_many_requests_rate=1,
+                     retry_after=0)
+    limiter = RateLimiter(rate=100)
+    pym = Pymarketcap(transport=server.transport("urllib"),
+                      rate_limiter=limiter)
+    with pytest.raises(CoinmarketcapTooManyRequestsError):
+        pym._get(URL)
+    assert limiter.rate_of(URL) == 50
+
+@pytest.mark.parametrize("transport", ["curl-multi", "urllib"])
+def test_parallel_transfers_spaced(local_server, transport):
+    if transport == "curl-multi":
+        pytest.importorskip("pymarketcap.curl")
+    arrivals = []
+
+    def respond(request):
+        arrivals.append(monotonic())
+        request.reply(b"{}")
+
+    url = local_server(respond).url
+    urls = [url + b"?page=%d" % i for i in range(5)]
+    pym = Pymarketcap(transport=transport, rate_limiter=RateLimiter(rate=20))
+    assert pym._get_many(urls) == ["{}"] * 5
+    # Each transfer waits for its token instead of starting all at once
+    gaps = [b - a for a, b in zip(sorted(arrivals), sorted(arrivals)[1:])]
+    assert min(gaps) > .03
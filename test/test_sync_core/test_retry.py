@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.errors import (
+    CoinmarketcapHTTPError,
+    CoinmarketcapTooManyRequestsError
+)
+from pymarketcap.retry import RetryPolicy
+from pymarketcap.transport import ReplayTransport
+from pymarketcap.url import Response
+
+URL = b"https://api.coinmarketcap.com/v2/listings/"
+
+class Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+class FlakyTransport(ReplayTransport):
+    """Responds ``503`` the first times each url is requested,
+    as many as its value in ``failures``."""
+    def __init__(self, responses, failures):
+        super().__init__(responses)
+        self.failures = failures
+        self.requests = []
+
+    def response(self, url, offset=0, until=b"", debug=False):
+        self.requests.append(url)
+        if self.requests.count(url) <= self.failures.get(url, 0):
+            return Response(b"", 503, url)
+        return super().response(url, offset, until, debug)
+
+def test_backoff_delays():
+    clock = Clock()
+    policy = RetryPolicy(max_attempts=4, budget=10, base=1, cap=2,
+                         seed=0, clock=clock)
+    backoff = policy.backoff()
+    failed = [Response(b"", 503, URL)]
+    delays = [backoff.next_delay(failed) for _ in range(4)]
+    assert all(1 <= delay <= 2 for delay in delays[:3])
+    assert delays[3] is None
+
+    # Retry-After is honoured, but not beyond the budget of the call
+    backoff = policy.backoff()
+    assert backoff.next_delay([Response(b"", 429, URL, headers={
+        "Retry-After": "5"})]) == 5
+    assert backoff.next_delay([Response(b"", 429, URL, headers={
+        "Retry-After": "11"})]) is None
+    assert backoff.next_delay([Response(b"", 404, URL)]) is None
+    assert policy.retryable(CoinmarketcapHTTPError("timeout"))
+
+def test_get_retried():
+    other = URL + b"?start=1"
+    transport = FlakyTransport({URL: b"{}", other: b"{}"},
+                               {URL: 1, other: 5})
+    pym = Pymarketcap(transport=transport,
+                      retry=RetryPolicy(base=0, cap=0))
+    assert pym._get(URL) == "{}"
+    assert transport.requests == [URL, URL]
+
+    pym.retry = RetryPolicy(max_attempts=2, base=0, cap=0)
+    with pytest.raises(CoinmarketcapHTTPError):
+        pym._get(other)
+
+def test_only_failed_pages_retried():
+    urls = [URL + b"?start=%d" % i for i in range(4)]
+    transport = FlakyTransport({url: b"{}" for url in urls}, {urls[2]: 2})
+    pym = Pymarketcap(transport=transport,
+                      retry=RetryPolicy(base=0, cap=0))
+    assert pym._get_many(urls) == ["{}"] * 4
+    assert transport.requests == urls + [urls[2], urls[2]]
+
+def test_standin_too_many_requests(standin):
+    server = standin(responses={URL: b"{}"}, too_many_requests_rate=1,
+                     retry_after=0)
+    pym = Pymarketcap(transport=server.transport("urllib"),
+                      retry=RetryPolicy(max_attempts=3, base=0, cap=0))
+    with pytest.raises(CoinmarketcapTooManyRequestsError):
+        pym._get(URL)
+    assert server.stats[429] == 3
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pymarketcap import Pymarketcap
+
+def test_default_session():
+    pym = Pymarketcap()
+    assert pym.session is not None
+    assert len(pym.session) == 0
+
+def test_shared_session():
+    pym = Pymarketcap()
+    other = Pymarketcap(session=pym.session)
+    assert other.session is pym.session
+
+def test_session_stats():
+    stats = Pymarketcap().session.stats
+    for key in ("requests", "connections_created",
+                "connections_reused", "tls_handshakes"):
+        assert stats[key] == 0
+
+def test_http2_opt_in():
+    curl = pytest.importorskip("pymarketcap.curl")
+    assert not curl.Session().http2
+    assert curl.Session(http2=True).http2
+
+def test_connection_reused(local_server):
+    curl = pytest.importorskip("pymarketcap.curl")
+    url = local_server(lambda request: request.reply(b"{}")).url
+    session = curl.Session()
+    for _ in range(2):
+        assert curl.get_to_memory(url, 5, False, b"", session).text == b"{}"
+    assert session.stats["connections_created"] == 1
+    assert session.stats["connections_reused"] == 1
+
+def test_connections_reused_by_threads(local_server):
+    curl = pytest.importorskip("pymarketcap.curl")
+    url = local_server(lambda request: request.reply(b"{}")).url
+    session = curl.Session(max_handles=8)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(
+            lambda _: curl.get_to_memory(url, 5, False, b"", session),
+            range(200)
+        ))
+    # Each thread keeps reusing the connection of its handle
+    assert session.stats["connections_created"] <= 8
+    assert session.stats["connections_reused"] >= 192
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from pymarketcap import Pymarketcap
+from pymarketcap.transport import ReplayTransport
+
+URL = b"https://api.coinmarketcap.com/v2/listings/"
+
+def test_concurrent_calls_coalesced():
+    transport = ReplayTransport({URL: b"{}"}, latency=.2)
+    pym = Pymarketcap(transport=transport)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        bodies = list(executor.map(lambda _: pym._get(URL), range(4)))
+    assert bodies == ["{}"] * 4
+    assert pym.single_flight.stats == {"requests": 1, "coalesced": 3}
+
+    # Sequential calls are not coalesced
+    pym._get(URL)
+    assert pym.single_flight.stats["requests"] == 2
+
+def test_async_single_flight():
+    from pymarketcap.singleflight import AsyncSingleFlight
+    group, calls = AsyncSingleFlight(), []
+
+    async def fetch(url):
+        calls.append(url)
+        await asyncio.sleep(.05)
+        return url.upper()
+
+    async def main():
+        return await asyncio.gather(*[group.do(url, fetch, url)
+                                      for url in ("a", "a", "b", "a")])
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(main()) == ["A", "A", "B", "A"]
+    finally:
+        loop.close()
+    assert calls == ["a", "b"]
+    assert group.stats == {"requests": 2, "coalesced": 2}
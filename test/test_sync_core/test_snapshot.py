@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+from pymarketcap import Pymarketcap
+from pymarketcap.snapshot import Snapshot
+from pymarketcap.transport import ReplayTransport
+
+LISTINGS = b"https://api.coinmarketcap.com/v2/listings/"
+CURRENCIES = [
+    {"id": 1, "name": "Bitcoin", "symbol": "BTC", "website_slug": "bitcoin"},
+    {"id": 1027, "name": "Ethereum", "symbol": "ETH",
+     "website_slug": "ethereum"},
+]
+
+def listings(currencies):
+    return json.dumps({"data": currencies, "metadata": {}}).encode()
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(.01)
+
+def test_snapshot(tmpdir):
+    snapshot = Snapshot(str(tmpdir.join("snapshot")))
+    assert snapshot.load() == {}
+    snapshot.save({"cryptoexchanges": (1500000000., [{"id": 270}])})
+    assert snapshot.load() == {"cryptoexchanges": (1500000000.,
+                                                   [{"id": 270}])}
+    assert tmpdir.listdir() == [tmpdir.join("snapshot")]
+
+    tmpdir.join("snapshot").write_binary(b"PYMSNAP1garbage")
+    assert snapshot.load() == {}
+
+def test_cold_start_from_snapshot(tmpdir):
+    path = str(tmpdir.join("snapshot"))
+    pym = Pymarketcap(transport=ReplayTransport({LISTINGS: listings(
+        CURRENCIES
+    )}), snapshot=path)
+    assert pym.cryptocurrencies == CURRENCIES
+
+    # A new instance reads them from the snapshot, without requests
+    pym = Pymarketcap(transport=ReplayTransport({}), snapshot=path)
+    assert pym.cryptocurrency_by_field_value("symbol", "ETH")["id"] == 1027
+    assert pym.single_flight.stats["requests"] == 0
+
+def test_old_snapshot_refreshed(tmpdir):
+    path = str(tmpdir.join("snapshot"))
+    Snapshot(path).save({"cryptocurrencies": (
+        time.time() - 100, {"data": CURRENCIES[:1], "metadata": {}}
+    )})
+    pym = Pymarketcap(transport=ReplayTransport({LISTINGS: listings(
+        CURRENCIES
+    )}, latency=.1), snapshot=path, snapshot_max_age=60)
+    # Served at once while refreshed in background
+    assert pym.cryptocurrencies == CURRENCIES[:1]
+    wait_for(lambda: pym.cryptocurrencies == CURRENCIES)
+    updated, value = Snapshot(path).load()["cryptocurrencies"]
+    assert value["data"] == CURRENCIES
+    assert updated > time.time() - 5
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymarketcap import Pymarketcap
+from pymarketcap.cache import CachedValue, ResponseCache, expires_early
+from pymarketcap.transport import ReplayTransport
+
+TICKER = b"https://api.coinmarketcap.com/v2/ticker/?start=1"
+
+class Clock:
+    def __init__(self):
+        self.now = 1500000000.
+
+    def __call__(self):
+        return self.now
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(.01)
+
+def test_expires_early():
+    assert not expires_early(100, 0, 1, 99)
+    assert expires_early(100, 0, 1, 100)
+    assert not expires_early(None, 10, 1, 10 ** 10)
+    # The longer the computation, the earlier it's refreshed
+    assert not expires_early(100, 1, 1, 90, rnd=lambda: .9)
+    assert expires_early(100, 5, 1, 90, rnd=lambda: .9)
+
+def test_cached_value_refreshed_in_background():
+    clock, calls = Clock(), []
+
+    def compute():
+        calls.append(clock.now)
+        time.sleep(.1)
+        return len(calls)
+
+    value = CachedValue(compute, ttl=10, beta=0, clock=clock)
+    assert value.get() == 1
+    clock.now += 11
+    # Every caller gets the stale value, and only one refresh runs
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(lambda _: value.get(), range(8))) == [1] * 8
+    wait_for(lambda: value.get() == 2)
+    assert len(calls) == 2
+
+    value.max_stale = 5
+    clock.now += 20
+    assert value.get() == 3
+
+def test_stale_responses_served():
+    clock = Clock()
+    transport = ReplayTransport({TICKER: b"{}"}, latency=.1)
+    pym = Pymarketcap(transport=transport, cache=ResponseCache(
+        stale_while_revalidate=30, beta=0, clock=clock
+    ))
+    pym._get(TICKER)
+    transport.record(TICKER, b"[]")
+
+    clock.now += 70
+    assert pym._get(TICKER) == "{}"
+    assert pym._get(TICKER) == "{}"
+    wait_for(lambda: pym.cache.get(TICKER) == "[]")
+    assert pym.single_flight.stats["requests"] == 2
+    assert pym.cache.stats["revalidated"] == 2
+
+    clock.now += 100
+    assert pym.cache.lookup(TICKER) == (None, False)
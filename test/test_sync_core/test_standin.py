@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from time import perf_counter
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.errors import (
+    CoinmarketcapHTTPError,
+    CoinmarketcapHTTPError404,
+    CoinmarketcapTooManyRequestsError
+)
+from pymarketcap.standin import StandinProcess, url_pattern
+
+BITCOIN = b"https://coinmarketcap.com/currencies/bitcoin/"
+LISTINGS = b"https://api.coinmarketcap.com/v2/listings/"
+
+def test_url_pattern():
+    assert url_pattern("https://coinmarketcap.com/currencies/bitcoin/") \
+        == url_pattern("https://coinmarketcap.com/currencies/ethereum/")
+    assert url_pattern("https://api.coinmarketcap.com/v2/ticker/?start=1") \
+        == url_pattern("https://api.coinmarketcap.com/v2/ticker/?start=101")
+    assert url_pattern("https://graphs2.coinmarketcap.com/currencies/" \
+                       "bitcoin/1367174841000/1530000000000/") \
+        == "https://graphs2.coinmarketcap.com/currencies/{slug}/{start}/{end}/"
+
+def test_recorded_pages(standin):
+    server = standin(responses={BITCOIN: b"<html>bitcoin</html>",
+                                LISTINGS: b'{"data": []}'})
+    pym = Pymarketcap(transport=server.transport("urllib"))
+    assert pym.listings() == {"data": []}
+    assert pym._get(BITCOIN) == "<html>bitcoin</html>"
+    # Not recorded pages of the same type are served from others
+    assert pym._get(b"https://coinmarketcap.com/currencies/ethereum/") \
+        == "<html>bitcoin</html>"
+    with pytest.raises(CoinmarketcapHTTPError404):
+        pym._get(b"https://coinmarketcap.com/unknown/")
+    assert server.stats == {200: 3, 404: 1}
+
+def test_default_body_in_process():
+    with StandinProcess(default=b"pymarketcap") as server:
+        pym = Pymarketcap(transport="urllib")
+        assert pym._get(server.url.encode() + b"?page=2") == "pymarketcap"
+
+def test_injected_errors(standin):
+    server = standin(responses={LISTINGS: b"{}"}, error_rate=1)
+    pym = Pymarketcap(transport=server.transport("urllib"))
+    with pytest.raises(CoinmarketcapHTTPError):
+        pym._get(LISTINGS)
+
+    server = standin(responses={LISTINGS: b"{}"}, too_many_requests_rate=1,
+                     retry_after=3)
+    transport = server.transport("urllib")
+    with pytest.raises(CoinmarketcapTooManyRequestsError):
+        Pymarketcap(transport=transport)._get(LISTINGS)
+    assert transport.get(LISTINGS, 5, False, b"").headers["retry-after"] == "3"
+
+def test_latency_and_bandwidth(standin):
+    server = standin(responses={LISTINGS: b"x" * 2000},
+                     latency=lambda rnd: .05, bandwidth=10000)
+    pym = Pymarketcap(transport=server.transport("urllib"))
+    start = perf_counter()
+    pym._get(LISTINGS)
+    # 50 ms of latency and 200 ms sending the body
+    assert perf_counter() - start >= .2
+
+def test_async_client(standin):
+    server = standin(responses={LISTINGS: b'{"data": []}'})
+    transport = server.transport("urllib")
+    response = asyncio.new_event_loop().run_until_complete(
+        transport.aget(LISTINGS, 5)
+    )
+    assert response.text == b'{"data": []}'
+
+def test_stop_with_connections_kept_alive(standin, caplog):
+    server = standin(responses={LISTINGS: b"{}"})
+    pym = Pymarketcap(transport=server.transport("urllib"))
+    pym._get(LISTINGS)
+    server.stop()
+    # The handler of the connection kept alive is cancelled silently
+    assert not [record for record in caplog.records
+                if record.name == "asyncio"]
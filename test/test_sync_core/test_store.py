@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from pymarketcap.store import SegmentStore
+
+def key(i):
+    return b"https://coinmarketcap.com/currencies/coin-%d/ 0 " % i
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma"])
+def test_segments(tmpdir, compression):
+    path = str(tmpdir)
+    store = SegmentStore(path, segment_bytes=4096, compression=compression)
+    page = "<html>%s</html>" % ("<tr><td>1.0</td></tr>" * 500)
+    for i in range(1000):
+        store.put(key(i), None if i % 2 else 10. + i, .5, page)
+    store.put(key(0), 20., .25, "updated")
+    store.close()
+
+    names = os.listdir(path)
+    assert 1 < len(names) < 100
+    assert store.size < len(page) * 1000 / 20
+
+    store = SegmentStore(path, compression=compression)
+    assert len(store) == 1000
+    assert store.get(key(0)) == (20., .25, "updated")
+    assert store.get(key(1)) == (None, .5, page)
+    assert store.get(key(2)) == (12., .5, page)
+    assert store.get(b"missing") is None
+    store.close()
+
+def test_eviction_and_recovery(tmpdir):
+    path = str(tmpdir)
+    store = SegmentStore(path, max_bytes=2000, segment_bytes=500)
+    for i in range(50):
+        store.put(key(i), None, 0, os.urandom(50).hex())
+    assert store.size <= 2000
+    assert key(0) not in store and key(49) in store
+    store.close()
+
+    # A record truncated by an interrupted write is discarded
+    last = sorted(os.listdir(path))[-1]
+    with open(os.path.join(path, last), "ab") as f:
+        f.write(b"PYMR\x01")
+    store = SegmentStore(path, max_bytes=2000, segment_bytes=500)
+    assert store.get(key(49))[2]
+    store.put(key(50), None, 0, "new")
+    store.close()
+    assert SegmentStore(path).get(key(50)) == (None, 0, "new")
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from pymarketcap import Pymarketcap
+from pymarketcap.util import endpoint, percentile
+
+BODY = b"{}"
+
+def test_endpoint():
+    assert endpoint(b"https://api.coinmarketcap.com/v2/ticker/?start=1") \
+        == "api.coinmarketcap.com/v2/ticker"
+    assert endpoint("https://coinmarketcap.com/currencies/bitcoin/") \
+        == "coinmarketcap.com/currencies"
+    assert endpoint(b"https://coinmarketcap.com") == "coinmarketcap.com"
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) is None
+
+def test_timings_history(local_server):
+    server = local_server(lambda request: request.reply(BODY))
+    url = server.url + b"v1/ping/"
+    pym = Pymarketcap(timeout=5, timings_size=3)
+    for _ in range(5):
+        pym._get(url)
+
+    key = endpoint(url)
+    history = pym.timings[key]
+    assert len(history) == 3
+    assert history[-1]["total_time"] >= history[-1]["starttransfer_time"]
+
+    latencies = pym.latencies()[key]
+    assert latencies["count"] == 3
+    assert latencies["p50"] <= latencies["p99"]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pymarketcap import Pymarketcap
+from pymarketcap.errors import CoinmarketcapHTTPError404
+from pymarketcap.transport import (
+    ReplayTransport,
+    UrllibTransport,
+    get_transport,
+    TRANSPORTS
+)
+
+LISTINGS_URL = b"https://api.coinmarketcap.com/v2/listings/"
+LISTINGS = b'{"data": [{"id": 1, "symbol": "BTC"}]}'
+
+def test_transports_by_name():
+    for name in ("urllib", "replay"):
+        assert get_transport(name).name == name
+    assert set(TRANSPORTS) == {"curl", "curl-multi", "urllib", "replay"}
+    with pytest.raises(ValueError):
+        get_transport("unknown")
+    # Recordings can't be saved without the file of their cassette
+    with pytest.raises(ValueError):
+        get_transport("record")
+
+def test_default_transport():
+    transport = Pymarketcap().transport
+    assert transport.name in ("curl-multi", "urllib")
+
+def test_transport_instance():
+    transport = UrllibTransport()
+    pym = Pymarketcap(transport=transport)
+    assert pym.transport is transport
+    assert pym.session is transport.session
+    with pytest.raises(ValueError):
+        Pymarketcap(transport=transport, session=transport.session)
+
+def test_replay_transport():
+    pym = Pymarketcap(transport=ReplayTransport({LISTINGS_URL: LISTINGS}))
+    assert pym.listings()["data"][0]["symbol"] == "BTC"
+    assert pym._get(LISTINGS_URL, 10) == LISTINGS[10:].decode()
+    assert pym._get(LISTINGS_URL, 0, b'"id"') == '{"data": [{"id"'
+
+def test_replay_not_recorded():
+    pym = Pymarketcap(transport="replay")
+    with pytest.raises(CoinmarketcapHTTPError404):
+        pym._get(LISTINGS_URL)
+    responses = pym._get_many([LISTINGS_URL], return_exceptions=True)
+    assert isinstance(responses[0], CoinmarketcapHTTPError404)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import zlib
+
+import pytest
+
+from pymarketcap.url import Session, get_to_memory
+
+BODY = b"pymarketcap" * 100
+
+def respond(request):
+    body, headers = BODY, {}
+    if request.path == "/gzip":
+        body, headers = gzip.compress(BODY), {"Content-Encoding": "gzip"}
+    elif request.path == "/deflate":
+        body, headers = zlib.compress(BODY), {"Content-Encoding": "deflate"}
+    request.reply(body, headers=headers)
+    if request.path == "/close":
+        # Close without announcing it, like an idle timeout of the server
+        request.close_connection = True
+
+@pytest.fixture
+def server(local_server):
+    return local_server(respond).url.decode().rstrip("/")
+
+def get(url, session):
+    return get_to_memory(url.encode(), 5, False, b"", session)
+
+def test_connection_reused(server):
+    session = Session()
+    first, second = get(server, session), get(server, session)
+    assert first.text == second.text == BODY
+    assert not first.connection_reused
+    assert second.connection_reused
+    assert session.stats["connections_created"] == 1
+    assert session.stats["connections_reused"] == 1
+    assert len(session) == 1
+
+def test_content_decoding(server):
+    session = Session()
+    for path in ("/gzip", "/deflate"):
+        response = get(server + path, session)
+        assert response.text == BODY
+        assert response.headers["content-encoding"] == path[1:]
+
+def test_reconnect_on_reset(server):
+    session = Session()
+    get(server + "/close", session)
+    response = get(server, session)
+    assert response.text == BODY
+    assert session.stats["connections_created"] == 2
+
+def test_idle_timeout(server):
+    session = Session(idle_timeout=0)
+    get(server, session)
+    response = get(server, session)
+    assert not response.connection_reused
+
+def test_pool_bound(server):
+    session = Session(max_handles=0)
+    get(server, session)
+    assert len(session) == 0